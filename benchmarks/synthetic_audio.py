@@ -0,0 +1,71 @@
+import contextlib
+import wave
+import numpy as np
+
+PATTERNS = ["tone", "noise", "silence", "speech", "dead_air"]
+
+def generate_pcm(seconds, sample_rate = 16000, pattern = "speech", seed = 0):
+    """Generates deterministic mono 16 bit PCM audio.
+
+    Args:
+      seconds: Length of the audio.
+      sample_rate: Sample rate. (Default value = 16000)
+      pattern: tone, noise, silence, speech or dead_air. speech alternates voiced bursts of
+        varying length with pauses, so the VAD has something to segment. dead_air is speech
+        in the first 20 seconds of every 80 seconds and silence otherwise. (Default value = "speech")
+      seed: Seed of the random generator. (Default value = 0)
+
+    Returns:
+      The PCM data as bytes.
+    """
+
+    random = np.random.RandomState(seed)
+    length = int(seconds * sample_rate)
+
+    if pattern == "dead_air":
+        speech = np.frombuffer(generate_pcm(seconds, sample_rate, "speech", seed), dtype=np.int16)
+        voiced = (np.arange(length) // (20 * sample_rate)) % 4 == 0
+        return (speech * voiced).astype(np.int16).tobytes()
+    t = np.arange(length) / float(sample_rate)
+
+    if pattern == "silence":
+        signal = np.zeros(length)
+    elif pattern == "tone":
+        signal = 0.5 * np.sin(2 * np.pi * 440 * t)
+    elif pattern == "noise":
+        signal = 0.3 * random.standard_normal(length)
+    elif pattern == "speech":
+        signal = np.zeros(length)
+        position = 0
+        while position < length:
+            burst = int(random.uniform(0.5, 6.0) * sample_rate)
+            pause = int(random.uniform(0.2, 2.0) * sample_rate)
+            end = min(position + burst, length)
+            part = t[position:end]
+            pitch = random.uniform(90, 250)
+            # harmonics with a syllable like envelope and a bit of noise
+            voiced = sum(np.sin(2 * np.pi * pitch * k * part) / k for k in range(1, 6))
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * random.uniform(3, 6) * part)
+            signal[position:end] = 0.25 * voiced * envelope + 0.02 * random.standard_normal(end - position)
+            position = end + pause
+        signal += 0.002 * random.standard_normal(length)
+    else:
+        raise ValueError("unknown pattern " + pattern)
+
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+def write_wave(path, pcm, sample_rate = 16000):
+    """Writes mono 16 bit PCM audio into a .wav file.
+
+    Args:
+      path: Path of the file.
+      pcm: The PCM data.
+      sample_rate: Sample rate. (Default value = 16000)
+
+    """
+
+    with contextlib.closing(wave.open(path, 'wb')) as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
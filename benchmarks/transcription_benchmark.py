@@ -0,0 +1,184 @@
+"""Benchmarks the stages of the transcription pipeline with synthetic audio and a stub model.
+
+Run from the root directory, e.g.:
+    python -m benchmarks.transcription_benchmark --seconds 600 --output bench.json
+
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import webrtcvad
+from benchmarks.synthetic_audio import PATTERNS, generate_pcm, write_wave
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber, MemoryWindow, SILENCE_RMS
+from src.transcription.format_handler import FormatHandler
+
+class StubToken(object):
+    """Replaces a DeepSpeech token."""
+    def __init__(self, text, start_time):
+        self.text = text
+        self.start_time = start_time
+
+class StubTranscript(object):
+    """Replaces a DeepSpeech candidate transcript."""
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+class StubMetadata(object):
+    """Replaces the DeepSpeech metadata."""
+    def __init__(self, transcripts):
+        self.transcripts = transcripts
+
+class StubModel(object):
+    """Replaces the DeepSpeech model, so the pipeline can be measured without the inference.
+
+    Returns one deterministic word every word_duration seconds of audio.
+
+    """
+    def __init__(self, sample_rate = 16000, word_duration = 0.4):
+        self.sample_rate = sample_rate
+        self.word_duration = word_duration
+
+    def sampleRate(self):
+        return self.sample_rate
+
+    def sttWithMetadata(self, audio, num_results = 1):
+        duration = len(audio) / float(self.sample_rate)
+        tokens = []
+        for i in range(int(duration / self.word_duration)):
+            start = i * self.word_duration
+            if i > 0:
+                tokens.append(StubToken(" ", start))
+            word = "w" + str(int(np.abs(audio[int(start * self.sample_rate)])) % 1000)
+            for j, character in enumerate(word):
+                tokens.append(StubToken(character, start + j * 0.02))
+        return StubMetadata([StubTranscript(tokens)])
+
+    def stt(self, audio):
+        tokens = self.sttWithMetadata(audio).transcripts[0].tokens
+        return "".join([t.text for t in tokens])
+
+def measure(function, repeat):
+    """Measures the fastest run time and the peak of the python allocations of a function.
+
+    Args:
+      function: The function without arguments.
+      repeat: Number of timed runs.
+
+    Returns:
+      The result of the function, the seconds and the peak memory in bytes.
+    """
+
+    seconds = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+def run(seconds, pattern, seed, aggressiveness, repeat, folder):
+    """Runs all stages on one synthetic recording.
+
+    Args:
+      seconds: Length of the audio.
+      pattern: Pattern of the synthetic audio.
+      seed: Seed of the synthetic audio.
+      aggressiveness: Voice-activation aggressiveness.
+      repeat: Number of timed runs per stage.
+      folder: Folder for the temporary files.
+
+    Returns:
+      The results as dict.
+    """
+
+    sample_rate = 16000
+    transcriber = DeepSpeechTranscriber()
+    transcriber.model = StubModel(sample_rate)
+    transcriber.language = None
+    stages = {}
+
+    def add(name, seconds_needed, peak, **extra):
+        stages[name] = dict(seconds=seconds_needed, real_time_factor=seconds_needed / seconds, peak_bytes=peak, **extra)
+
+    source_path = os.path.join(folder, "source.wav")
+    write_wave(source_path, generate_pcm(seconds, 44100, pattern, seed), 44100)
+    wav_file_path = os.path.join(folder, "converted.wav")
+    try:
+        _, needed, peak = measure(lambda: FormatHandler().convert(source_path, wav_file_path, sample_rate), repeat)
+        add("convert", needed, peak)
+    except OSError as e:
+        stages["convert"] = dict(skipped=str(e))
+
+    write_wave(wav_file_path, generate_pcm(seconds, sample_rate, pattern, seed), sample_rate)
+
+    (audio, _), needed, peak = measure(lambda: transcriber.read_wave(wav_file_path), repeat)
+    add("read_wave", needed, peak)
+
+    frames, needed, peak = measure(lambda: list(transcriber.frame_generator(30, audio, sample_rate)), repeat)
+    add("frame_generator", needed, peak, frames=len(frames))
+
+    segments, needed, peak = measure(
+        lambda: list(transcriber.vad_collector(sample_rate, 30, 300, webrtcvad.Vad(aggressiveness), frames)), repeat)
+    add("vad_collector", needed, peak, segments=len(segments))
+
+    # the path of the transcription: speech flags per chunk, with and without skipping the silent frames
+    window = MemoryWindow(None, 1, sample_rate, 30)
+    for name, silence_rms in [("vad_collector_batch", SILENCE_RMS), ("vad_collector_batch_without_silence", 0)]:
+        batch_segments, needed, peak = measure(lambda: list(transcriber.vad_collector_batch(
+            sample_rate, 30, 300, transcriber.speech_chunk_generator(
+                30, transcriber.read_wave_chunks(wav_file_path, window.chunk_size), sample_rate,
+                webrtcvad.Vad(aggressiveness), silence_rms=silence_rms),
+            window.max_segment_frames, window.overlap_frames, window.search_frames)), repeat)
+        add(name, needed, peak, segments=len(batch_segments))
+
+    (text, meta_data), needed, peak = measure(lambda: transcriber.stt(segments), repeat)
+    add("stt", needed, peak, words=len(meta_data))
+
+    tokens = [transcriber.model.sttWithMetadata(np.frombuffer(s.bytes, dtype=np.int16)).transcripts[0].tokens for s in segments]
+    _, needed, peak = measure(
+        lambda: [transcriber.get_meta_data_result(t, s.timestamp) for t, s in zip(tokens, segments)], repeat)
+    add("get_meta_data_result", needed, peak)
+
+    _, needed, peak = measure(lambda: transcriber.transcribe_wav(wav_file_path, aggressiveness), repeat)
+    add("transcribe_wav", needed, peak)
+
+    return dict(seconds=seconds, pattern=pattern, seed=seed, aggressiveness=aggressiveness, stages=stages)
+
+def main():
+    """Runs the benchmark and prints or saves the results as json."""
+
+    parser = argparse.ArgumentParser(description="Benchmarks the transcription pipeline with synthetic audio.")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[60.0], help="Lengths of the synthetic audio.")
+    parser.add_argument("--pattern", choices=PATTERNS, nargs="+", default=["speech"], help="Patterns of the synthetic audio.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic audio.")
+    parser.add_argument("--aggressiveness", type=int, default=3, help="Voice-activation aggressiveness.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage, the fastest is reported.")
+    parser.add_argument("--output", help="File for the json results, otherwise they are printed.")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as folder:
+        for seconds in args.seconds:
+            for pattern in args.pattern:
+                runs.append(run(seconds, pattern, args.seed, args.aggressiveness, args.repeat, folder))
+
+    result = dict(python=platform.python_version(), machine=platform.machine(), processor=platform.processor(),
+                  created=time.strftime("%Y-%m-%dT%H:%M:%S"), runs=runs)
+    if args.output is None:
+        print(json.dumps(result, indent=2))
+    else:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == '__main__':
+    main()
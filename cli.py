@@ -0,0 +1,141 @@
+import argparse
+import contextlib
+import glob
+import os
+import sys
+import threading
+import time
+import wave
+from src.transcription.format_handler import FormatHandler
+from src.transcription.transcription_worker import TranscriptionWorker
+from src.util.file_util import get_file
+import src.util.const as c
+
+def find_files(patterns):
+    """Expands the given files and glob patterns.
+
+    Args:
+      patterns: Paths or glob patterns of the source material.
+
+    Returns:
+      The found files without duplicates, in the given order.
+    """
+
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            match = os.path.normpath(match)
+            if os.path.isfile(match) and match not in files:
+                files.append(match)
+    return files
+
+def get_duration(project_folder_path):
+    """Returns the duration of the converted audio in the project.
+
+    Args:
+      project_folder_path: The project folder.
+
+    Returns:
+      The duration in seconds or 0 if there is no converted file.
+    """
+
+    wav_file_path = get_file(project_folder_path, c.CON_COPY_POSTFIX)
+    if wav_file_path is None:
+        return 0
+    with contextlib.closing(wave.open(wav_file_path, 'rb')) as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+class CliWorker(TranscriptionWorker):
+    """Creates the projects with the same code as the editor, but prints the messages instead of sending them."""
+
+    def __init__(self, options):
+        super(CliWorker, self).__init__(None, threading.Event(), threading.Event(), options)
+        self.project_folder_path = None
+        self.status = ""
+
+    def send(self, kind, *values):
+        """Prints the status and remembers the result of the creation.
+
+        Args:
+          kind: The kind of the message.
+          *values: The values of the message.
+
+        """
+
+        if kind == "status":
+            self.status = values[0]
+            if sys.stdout.isatty():
+                print("\r" + self.status.ljust(79), end="", flush=True)
+        elif kind == "done":
+            self.project_folder_path = values[0]
+            if sys.stdout.isatty():
+                print("\r" + " " * 79 + "\r", end="", flush=True)
+
+    def get_word_count(self):
+        """Returns the number of transcribed words.
+
+        Returns:
+          The number of words of the created project.
+        """
+
+        return len(self.checkpoint.transcription_list)
+
+def main():
+    """Creates a project for every given file without the user interface."""
+
+    parser = argparse.ArgumentParser(description="Creates LazyTranscript projects without the user interface.")
+    parser.add_argument("files", nargs="+", help="Media files or glob patterns.")
+    parser.add_argument("-l", "--language", required=True, help="Language tag, has to exist as folder in the models folder.")
+    parser.add_argument("-w", "--workspace", default=os.getcwd(), help="Folder in which the project folders are created.")
+    parser.add_argument("-n", "--name", help="Project name, only for a single file. Defaults to the file name.")
+    parser.add_argument("-p", "--preset", default=c.PRESET_BALANCED, choices=[c.PRESET_FAST, c.PRESET_BALANCED, c.PRESET_ACCURATE],
+                        help="fast uses a .tflite model without scorer, accurate a wide beam.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes for the decoding.")
+    parser.add_argument("--memory-limit", type=int, default=0, help="Audio memory limit in MB, 0 for no limit.")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Size of the transcription cache in MB, 0 disables it.")
+    parser.add_argument("--cache-folder", help="Folder of the transcription cache, can be shared by several workspaces.")
+    args = parser.parse_args()
+
+    files = find_files(args.files)
+    if len(files) == 0:
+        parser.error("no files found")
+    if args.name is not None and len(files) != 1:
+        parser.error("--name can only be used with a single file")
+    if not os.path.isdir(os.path.join(c.MODEL_PATH, args.language)):
+        parser.error("no model for language " + args.language)
+
+    options = {"stream": False, "workers": args.workers,
+               "memory_limit": args.memory_limit * 1024 * 1024 if args.memory_limit > 0 else None,
+               "cache_folder": args.cache_folder, "cache_size": args.cache_size * 1024 * 1024, "preset": args.preset}
+    format_handler = FormatHandler()
+    failed = 0
+
+    for file_path in files:
+        type, extension = format_handler.get_type_extension(file_path)
+        if type not in ["video", "audio"]:
+            print("Skipped {}: unsupported format".format(file_path))
+            failed += 1
+            continue
+
+        project_name = args.name if args.name is not None else os.path.splitext(os.path.basename(file_path))[0]
+        start = time.monotonic()
+        # an interrupted project is resumed after its last saved segment
+        worker = CliWorker(options)
+        worker.create_project(file_path, args.workspace, project_name, args.language)
+        if worker.project_folder_path is None:
+            print("Failed {}: {}".format(file_path, worker.status))
+            failed += 1
+            continue
+
+        elapsed = time.monotonic() - start
+        duration = get_duration(worker.project_folder_path)
+        # the processing time divided by the audio duration, like in the progress of the editor and the project log
+        real_time_factor = "{:.2f}".format(elapsed / duration) if duration > 0 else "-"
+        print("{}: {:.1f}s audio in {:.1f}s ({}x real time, {} words) -> {}".format(
+            file_path, duration, elapsed, real_time_factor, worker.get_word_count(), worker.project_folder_path))
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,9 +1,14 @@
 from PySide2.QtCore import QSettings
 
+from src.threads.create_new_project_thread import prepare_worker, stop_prepared_worker
+from src.threads.job_scheduler import JobScheduler
+from src.threads.warm_up_thread import WarmUpThread
+from src.util.model_registry import registry
 from src.windows.create_new_project import CreateNewProjectWindow
 from src.windows.editor import EditorWindow
 from src.windows.start import StartWindow
 from PySide2.QtWidgets import QApplication
+import os
 import qtmodern.styles
 import qtmodern.windows
 import src.util.const as c
@@ -15,11 +20,24 @@ class WindowHandler():
         """Initialize all windows and the pyside app itself."""
         self.app = QApplication()
         self.get_style()
+        # the models are shared by the transcriber and the plug-ins
+        registry.memory_budget = self.settings.value(c.MODEL_MEMORY_BUDGET, defaultValue=4096, type=int) * 1024 * 1024
+        self.job_scheduler = JobScheduler()
         self.create_new_project_window = CreateNewProjectWindow(self)
         self.editor_window = EditorWindow(self)
         self.start_window = StartWindow(self)
         self.start_window.show()
+        self.warm_up_thread = None
+        self.warm_up()
+        # continue the jobs which were queued before the last exit
+        self.job_scheduler.schedule()
         self.app.exec_()
+        # stop the running transcriptions, their checkpoints are resumed on the next start
+        self.create_new_project_window.widget.stop()
+        self.job_scheduler.stop_all()
+        stop_prepared_worker()
+        if self.warm_up_thread is not None:
+            self.warm_up_thread.wait()
 
     def get_style(self):
         """Returns the current saved style."""
@@ -29,6 +47,23 @@ class WindowHandler():
         else:
             qtmodern.styles.light(self.app)
 
+    def warm_up(self):
+        """Loads the model of the last used language in the background, if it is enabled in the settings.
+
+        The model is loaded for the re-transcription and the plug-ins and by a prepared worker process,
+        which creates the next project with this language and preset.
+
+        """
+
+        language = self.settings.value(c.LAST_LANGUAGE, defaultValue="")
+        if not self.settings.value(c.MODEL_WARM_UP, defaultValue=True, type=bool) or language == "" \
+                or not os.path.isdir(os.path.join(c.MODEL_PATH, language)):
+            return
+        preset = self.settings.value(c.LAST_PRESET, defaultValue=c.PRESET_BALANCED)
+        self.warm_up_thread = WarmUpThread(language, preset)
+        self.warm_up_thread.start()
+        prepare_worker(language, preset)
+
     def switch_to_editor(self, project_folder_path):
         """Hides the project-window and shows the editor-window.
 
@@ -41,6 +76,16 @@ class WindowHandler():
         self.editor_window.show()
         self.editor_window.open_project(project_folder_path)
 
+    def resume_project(self, project_folder_path):
+        """Shows the create_new_project-window and resumes the interrupted transcription of the project.
+
+        Args:
+          project_folder_path: Path of the project-folder
+
+        """
+        self.open_create_new_project_window()
+        self.create_new_project_window.widget.resume_project(project_folder_path)
+
     def open_create_new_project_window(self):
         """Hides all other windows and opens the create_new_project-window."""
         self.start_window.hide()
@@ -1,15 +1,13 @@
-from os import listdir
-from os.path import isfile, join
 from typing import List
 from PySide2.QtCore import QThread, QObject, Signal
 from PySide2.QtWidgets import QPushButton
 from src.util import file_util
 from src.util.plugin_abstract import IPlugin
-from deepspeech import Model
+from src.util.word_timings import WordTimings
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber
 from pydub import AudioSegment
 from src.util.time_util import convert_ms
 import src.util.const as c
-import os
 import numpy
 
 class ReplaceButton(QPushButton):
@@ -25,15 +23,24 @@ class ReplaceButton(QPushButton):
 
 class DeepSpeechThread(QThread):
 
-    def __init__(self, parent, meta_data, project_folder_path):
+    def __init__(self, parent, meta_data, project_folder_path, segmentation = None):
         super(DeepSpeechThread, self).__init__()
         self.parent = parent
         self.project_folder_path = project_folder_path
         self.meta_data = meta_data
+        self.segmentation = segmentation
 
     def run(self):
-        self.model = self.get_model()
+        self.transcriber = self.get_transcriber()
+        if self.transcriber.get_model(self.parent.plugin_manager.get_language()) is None:
+            return
+        try:
+            self.find_alternatives()
+        finally:
+            # the model stays in the registry, but it can be released when the memory is needed
+            self.transcriber.release_model()
 
+    def find_alternatives(self):
         media_file = file_util.get_file(self.project_folder_path, c.CON_COPY_POSTFIX)
         full = AudioSegment.from_file(media_file)
 
@@ -41,10 +48,19 @@ class DeepSpeechThread(QThread):
             current_word = item.get(c.WORD)
             org_start_time = item.get(c.START_TIME)
             start_time = max(org_start_time - 0.5, 0)
-            clip = full[start_time * 1000:start_time * 1000 + 1000]
+            end_time = start_time + 1
+            if self.segmentation is not None:
+                # the clip should not reach into the neighbouring segments
+                index = self.segmentation.find(org_start_time)
+                if index >= 0:
+                    segment_start, segment_end = self.segmentation.bounds[index] / float(self.segmentation.sample_rate)
+                    start_time = max(start_time, segment_start)
+                    end_time = min(end_time, segment_end)
+            clip = full[start_time * 1000:end_time * 1000]
             buffer = clip.raw_data
             data = numpy.frombuffer(buffer, dtype=numpy.int16)
-            result = self.model.sttWithMetadata(data, num_results=3)
+            # the model is shared with running transcriptions, decode holds its lock
+            result = self.transcriber.decode(data, num_results=3)
 
             possible_words = []
             for candidate in result.transcripts:
@@ -59,22 +75,10 @@ class DeepSpeechThread(QThread):
                         word = ""
             self.parent.signal.done.emit({org_start_time: possible_words})
 
-    def get_model(self):
-        model_path = os.path.join(c.MODEL_PATH, self.parent.plugin_manager.get_language())
-        files = [f for f in listdir(model_path) if isfile(join(model_path, f))]
-
-        model_files = [s for s in files if ".pbmm" in s]
-
-        if len(model_files) != 1:
-            return None
-
-        model = Model(os.path.join(model_path, model_files[0]))
-
-        scorer_files = [s for s in files if ".scorer" in s]
-        if len(scorer_files) == 1:
-            model.enableExternalScorer(model_path + os.path.sep + scorer_files[0])
-
-        return model
+    def get_transcriber(self):
+        # the model is shared with the transcriber, so it is only loaded once
+        preset = file_util.get_value_from_shelve(self.project_folder_path, c.PRESET, c.PRESET_BALANCED)
+        return DeepSpeechTranscriber(preset)
 
 class Plugin(IPlugin):
 
@@ -88,8 +92,9 @@ class Plugin(IPlugin):
         self.signal.done.connect(self.add_alternatives)
 
     def project_loaded(self):
-        meta_data = file_util.get_value_from_shelve(self.plugin_manager.get_project_folder_path(), c.TRANSCRIPTION_META_DATA)
-        self.thread = DeepSpeechThread(self, meta_data, self.plugin_manager.get_project_folder_path())
+        meta_data = WordTimings.load(self.plugin_manager.get_project_folder_path(), mmap=False)
+        self.thread = DeepSpeechThread(self, meta_data, self.plugin_manager.get_project_folder_path(),
+                                       self.plugin_manager.get_segmentation())
         self.thread.start()
 
     def get_word_action(self, word: str, word_meta_data: List[dict], word_pos: int):
@@ -3,6 +3,8 @@ from PySide2.QtCore import QThread, QObject, Signal
 from PySide2.QtWidgets import QPushButton
 from src.util import file_util
 from src.util.plugin_abstract import IPlugin
+from src.util.word_timings import WordTimings
+from src.util.model_registry import registry, get_size
 from vosk import Model, KaldiRecognizer, SetLogLevel
 from bisect import bisect
 from src.util.time_util import convert_ms
@@ -34,28 +36,25 @@ class VoskThread(QThread):
         result = {}
         media_file = file_util.get_file(self.project_folder_path, c.CON_COPY_POSTFIX)
         wf = wave.open(media_file)
-        self.rec = self.get_recognizer(wf.getframerate())
-
-
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            if self.rec.AcceptWaveform(data):
-                for r in json.loads(self.rec.Result())["result"]:
-                    result[r["start"]] = r["word"]
-
-        for r in json.loads(self.rec.FinalResult())["result"]:
-            result[r["start"]] = r["word"]
+        SetLogLevel(-1)
+        model_path = os.path.join(c.PLUGIN_PATH, "vosk_alternatives", "model")
+        # the model is checked out while it is used, so the registry does not release it in the meantime
+        with registry.use(("vosk", model_path), lambda: Model(model_path), get_size(model_path)) as model:
+            self.rec = KaldiRecognizer(model, wf.getframerate())
+
+            while True:
+                data = wf.readframes(4000)
+                if len(data) == 0:
+                    break
+                if self.rec.AcceptWaveform(data):
+                    for r in json.loads(self.rec.Result())["result"]:
+                        result[r["start"]] = r["word"]
+
+            for r in json.loads(self.rec.FinalResult())["result"]:
+                result[r["start"]] = r["word"]
 
         self.parent.signal.done.emit(result)
 
-    def get_recognizer(self, framerate):
-        SetLogLevel(-1)
-        model = Model(os.path.join(c.PLUGIN_PATH, "vosk_alternatives", "model"))
-        rec = KaldiRecognizer(model, framerate)
-        return rec
-
 class Plugin(IPlugin):
 
     def __init__(self, plugin_manager):
@@ -68,7 +67,7 @@ class Plugin(IPlugin):
         self.signal.done.connect(self.set_alternatives)
 
     def project_loaded(self):
-        meta_data = file_util.get_value_from_shelve(self.plugin_manager.get_project_folder_path(), c.TRANSCRIPTION_META_DATA)
+        meta_data = WordTimings.load(self.plugin_manager.get_project_folder_path(), mmap=False)
         self.thread = VoskThread(self, meta_data, self.plugin_manager.get_project_folder_path())
         self.thread.start()
 
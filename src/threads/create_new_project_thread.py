@@ -1,28 +1,117 @@
-import os
-import shutil
+import multiprocessing
 import src.util.const as c
-from PySide2.QtCore import QThread, Signal, QObject
-from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber
-from src.transcription.format_handler import FormatHandler
-from src.util.file_util import save_to_shelve, write_text_file
+from PySide2.QtCore import QThread, Signal, QObject, QSettings
+from src.transcription.transcription_worker import run_worker, run_prepared_worker
 
 class ProgressSignal(QObject):
     """Simple class to hold the Signals.
 
     The progress-signal is used to display the progress in the main-thread.
     The done-signal is used to notify the main-thread that the work is done.
+    The started-signal is used in the streaming mode to notify the main-thread that the project can be opened.
+    The segment-signal contains the project folder path, the text and meta_data of each finished segment in the streaming mode.
+    The status-signal contains the processed duration, the real-time factor and the estimated finish time.
 
     """
     progress = Signal(int)
+    status = Signal(str)
     done = Signal(str)
+    started = Signal(str)
+    segment = Signal(str, str, list)
+
+class PreparedWorker():
+    """A worker process which is started before a project is created and loads the model in the meantime.
+
+    The first CreateThread with the same language and preset sends its project to this process instead of
+    starting a new one. Only the model of this process is warm, the worker pool of a transcription with several
+    workers loads its own models, but finds the model files in the page cache.
+
+    """
+
+    def __init__(self, language, preset):
+        self.language = language
+        self.preset = preset
+        self.prepared_worker = take_prepared_worker(language, preset)
+        if self.prepared_worker is not None:
+            self.context = self.prepared_worker.context
+            self.editor_ready = self.prepared_worker.editor_ready
+            self.interrupted = self.prepared_worker.interrupted
+        else:
+            self.context = multiprocessing.get_context("spawn")
+            self.editor_ready = self.context.Event()
+            self.interrupted = self.context.Event()
+        self.connection, worker_connection = self.context.Pipe()
+        # not a daemon, the worker starts the processes of its pool
+        self.process = self.context.Process(target=run_prepared_worker, args=(worker_connection, self.interrupted,
+                                                                              self.editor_ready, language, preset))
+        self.process.start()
+        # the pipe is closed when the worker exits
+        worker_connection.close()
+
+    def stop(self):
+        """Stops the worker if it has not received a project, it has no state which could be lost."""
+
+        self.connection.close()
+        self.process.terminate()
+        self.process.join()
+
+prepared_worker = None
+
+def prepare_worker(language, preset):
+    """Starts a worker process for the next project, a worker which was prepared before is stopped.
+
+    Args:
+      language: The language of the model which is loaded in advance.
+      preset: The preset of the model which is loaded in advance.
+
+    """
+
+    global prepared_worker
+    stop_prepared_worker()
+    prepared_worker = PreparedWorker(language, preset)
+
+def take_prepared_worker(language, preset):
+    """Returns the prepared worker if it has loaded the model of the given language and preset.
+
+    The worker is only used once. A worker with another model is stopped, so it does not keep its model in memory.
+
+    Args:
+      language: The language of the project.
+      preset: The preset of the project.
+
+    Returns:
+      The PreparedWorker or None.
+    """
+
+    global prepared_worker
+    worker = prepared_worker
+    if worker is None:
+        return None
+    prepared_worker = None
+    if worker.language != language or worker.preset != preset or not worker.process.is_alive():
+        worker.stop()
+        return None
+    return worker
+
+def stop_prepared_worker():
+    """Stops the prepared worker if it has not been used."""
+
+    global prepared_worker
+    if prepared_worker is not None:
+        prepared_worker.stop()
+        prepared_worker = None
 
 class CreateThread(QThread):
     """This thread create a new project.
 
-    Here the first transcription is started and the files are copied into the project directory.
+    The project is created by a TranscriptionWorker in a separate process, so neither the decoding nor a crash of
+    the decoder can affect the user interface. The thread receives the messages of the worker and emits them as signals.
+    The number of worker processes and the streaming mode are read from the settings, if they are not given.
+    If a worker process with the model of the project has been prepared, the project is sent to it.
 
     """
-    def __init__(self, file_path, folder_path, project_name, language):
+    def __init__(self, file_path, folder_path, project_name, language, workers = None, stream = None,
+                 preset = c.PRESET_BALANCED):
         QThread.__init__(self, None)
         self.signal = ProgressSignal()
 
@@ -30,52 +119,84 @@ class CreateThread(QThread):
         self.folder_path = folder_path
         self.project_name = project_name
         self.language = language
+        self.preset = preset
+        self.settings = QSettings(c.SETTINGS_PATH, QSettings.IniFormat)
+        self.stream = self.settings.value(c.STREAM_TRANSCRIPTION, defaultValue=False, type=bool) if stream is None else stream
+        self.workers = self.settings.value(c.TRANSCRIPTION_WORKERS, defaultValue=1, type=int) if workers is None else workers
+        self.prepared_worker = take_prepared_worker(language, preset)
+        if self.prepared_worker is not None:
+            self.context = self.prepared_worker.context
+            self.editor_ready = self.prepared_worker.editor_ready
+            self.interrupted = self.prepared_worker.interrupted
+        else:
+            self.context = multiprocessing.get_context("spawn")
+            self.editor_ready = self.context.Event()
+            self.interrupted = self.context.Event()
 
     def run(self):
         """Method that is executed in the background.
 
-        Here the create_project process is executed.
+        Starts the worker process or sends the project to the prepared one and emits its messages until the
+        process has finished. If the process ends without a result and was not interrupted, the creation has failed.
 
         """
-        self.create_project(self.file_path, self.folder_path, self.project_name, self.language)
-        self.signal.progress.emit(0)
 
-    def create_project(self, file_path, folder_path, project_name, language):
-        """Creates the Project.
+        if self.prepared_worker is not None:
+            connection, process = self.prepared_worker.connection, self.prepared_worker.process
+            try:
+                connection.send((self.get_options(), self.file_path, self.folder_path, self.project_name,
+                                 self.language))
+            except OSError:
+                # the worker has exited, this is reported below
+                pass
+        else:
+            connection, worker_connection = self.context.Pipe(duplex=False)
+            process = self.context.Process(target=run_worker, args=(worker_connection, self.interrupted,
+                                                                    self.editor_ready, self.get_options(),
+                                                                    self.file_path, self.folder_path,
+                                                                    self.project_name, self.language))
+            process.start()
+            # only the worker writes into the pipe, so it is closed when the worker exits
+            worker_connection.close()
+
+        done = False
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message[0] == "done":
+                done = True
+            getattr(self.signal, message[0]).emit(*message[1:])
+        connection.close()
+        process.join()
+
+        if not done and not self.interrupted.is_set():
+            self.signal.status.emit("The transcription process has stopped unexpectedly (exit code {})".format(process.exitcode))
+            self.signal.done.emit(None)
+        self.signal.progress.emit(0)
 
-        In order to do this:
-            1. The project-folder will be created.
-            2. The source-material will be copied and converted
-            3. The converted version will be transcribed.
-            4. The results will be saved.
+    def interrupt(self):
+        """Stops the transcription after the current segment.
 
-        Args:
-          file_path: The path of the source material.
-          folder_path: The folder in which the project folder should be created.
-          project_name: The project-name.
-          language: The project language, e.g. en, de or other language tags.
+        The finished segments are kept in the checkpoint, so the project can be resumed later.
 
         """
-        type, extension = FormatHandler().get_type_extension(file_path)
-        if type is None or type not in ["video", "audio"]:
-            self.signal.done.emit(None)
 
-        try:
-            project_folder_path = os.path.join(folder_path, project_name)
-            os.mkdir(project_folder_path)
-            self.signal.progress.emit(20)
-            new_file_name = os.path.basename(file_path).replace(".", c.ORIGNAL_POSTFIX)
-            new_file_path = os.path.join(project_folder_path, new_file_name)
-            shutil.copyfile(file_path, new_file_path)
-            self.signal.progress.emit(40)
-            save_to_shelve(project_folder_path, c.LANGUAGE, language)
-            self.signal.progress.emit(60)
-            text, transcription_list = DeepSpeechTranscriber().transcribe(new_file_path, language)
-            self.signal.progress.emit(80)
-            write_text_file(project_folder_path, text, c.TRANSCRIPTION)
-            save_to_shelve(project_folder_path, c.TRANSCRIPTION_META_DATA, transcription_list)
-            self.signal.progress.emit(100)
-        except OSError:
-            self.signal.done.emit(None)
+        self.interrupted.set()
+        # a worker in the streaming mode could still wait for the editor
+        self.editor_ready.set()
+
+    def get_options(self):
+        """Returns the options of the worker from the settings.
+
+        Returns:
+          The dict with the workers, the streaming mode, the memory limit, the folder and size of the cache and the preset.
+        """
 
-        self.signal.done.emit(project_folder_path)
\ No newline at end of file
+        memory_limit = self.settings.value(c.TRANSCRIPTION_MEMORY_LIMIT, defaultValue=0, type=int)
+        cache_size = self.settings.value(c.TRANSCRIPTION_CACHE_SIZE, defaultValue=1024, type=int)
+        return {"workers": self.workers, "stream": self.stream,
+                "memory_limit": memory_limit * 1024 * 1024 if memory_limit > 0 else None,
+                "cache_folder": self.settings.value(c.TRANSCRIPTION_CACHE_FOLDER, defaultValue=""),
+                "cache_size": cache_size * 1024 * 1024, "preset": self.preset}
@@ -0,0 +1,300 @@
+import os
+from functools import partial
+import src.util.const as c
+from PySide2.QtCore import Signal, QObject, QSettings
+from src.threads.create_new_project_thread import CreateThread
+from src.util.job_queue import JobQueue
+
+class SchedulerSignal(QObject):
+    """Simple class to hold the Signals.
+
+    The changed-signal is used to notify the main-thread that the queue or the progress of a job has changed.
+    The done-signal contains the project folder path of each finished job.
+
+    """
+    changed = Signal()
+    done = Signal(str)
+
+class JobScheduler():
+    """Runs the queued creations of projects in the background.
+
+    Up to the configured number of jobs run at once, as long as the sum of their worker processes
+    fits into the cpu budget. The worker processes of creations outside the queue, e.g. of the Open button,
+    are counted into the budget as well. Pausing or cancelling a running job stops it after the current segment;
+    its checkpoint is kept, so a paused job continues where it stopped when it is resumed.
+
+    """
+
+    def __init__(self, queue = None):
+        self.signal = SchedulerSignal()
+        self.settings = QSettings(c.SETTINGS_PATH, QSettings.IniFormat)
+        self.queue = queue if queue is not None else JobQueue()
+        self.queue.load()
+        self.threads = {}
+        self.external_threads = []
+        self.stopping = {}
+        self.results = {}
+        self.progress = {}
+        self.status = {}
+
+    def get_limits(self):
+        """Returns the maximum number of running jobs and the cpu budget from the settings.
+
+        Returns:
+          The number of jobs and the number of worker processes.
+        """
+
+        cpu_count = os.cpu_count() or 1
+        max_jobs = self.settings.value(c.QUEUE_JOBS, defaultValue=1, type=int)
+        cpu_budget = self.settings.value(c.QUEUE_CPU_BUDGET, defaultValue=cpu_count, type=int)
+        return max(max_jobs, 1), max(cpu_budget, 1)
+
+    def add_job(self, file_path, folder_path, project_name, language, preset = c.PRESET_BALANCED):
+        """Queues the creation of a project and starts it if the limits allow it.
+
+        Args:
+          file_path: The path of the source material.
+          folder_path: The folder in which the project folder should be created.
+          project_name: The project-name.
+          language: The project language.
+          preset: The preset of the model. (Default value = c.PRESET_BALANCED)
+
+        Returns:
+          The job or None if the project is created already or exists.
+        """
+
+        if self.is_external(os.path.join(folder_path, project_name)):
+            return None
+        workers = self.settings.value(c.TRANSCRIPTION_WORKERS, defaultValue=1, type=int)
+        job = self.queue.add(file_path, folder_path, project_name, language, workers, preset)
+        if job is not None:
+            self.schedule()
+        return job
+
+    def add_external(self, thread):
+        """Counts a creation outside the queue into the cpu budget until its thread has finished.
+
+        Args:
+          thread: The CreateThread, which is started by the caller.
+
+        """
+
+        self.external_threads.append(thread)
+        thread.finished.connect(partial(self.on_external_finished, thread))
+
+    def is_external(self, project_folder_path):
+        """Returns whether a running creation outside the queue creates a project folder.
+
+        Args:
+          project_folder_path: The project folder path.
+
+        Returns:
+          True if the folder is created outside the queue.
+        """
+
+        return any(os.path.normpath(os.path.join(thread.folder_path, thread.project_name)) == os.path.normpath(project_folder_path)
+                   for thread in self.external_threads)
+
+    def is_used(self, project_folder_path):
+        """Returns whether a project folder is created by a job or outside the queue.
+
+        Args:
+          project_folder_path: The project folder path.
+
+        Returns:
+          True if the folder is in use.
+        """
+
+        return self.queue.find(project_folder_path) is not None or self.is_external(project_folder_path)
+
+    def on_external_finished(self, thread):
+        """Releases the cpu budget of a creation outside the queue and starts the next jobs.
+
+        Args:
+          thread: The finished CreateThread.
+
+        """
+
+        self.external_threads.remove(thread)
+        self.schedule()
+
+    def schedule(self):
+        """Starts the queued jobs which fit into the limits."""
+
+        max_jobs, cpu_budget = self.get_limits()
+        reserved = sum(max(min(thread.workers, cpu_budget), 1) for thread in self.external_threads)
+        for job in self.queue.get_startable(max_jobs, cpu_budget, reserved):
+            thread = CreateThread(job["file_path"], job["folder_path"], job["project_name"], job["language"],
+                                  self.queue.get_workers(job, cpu_budget), False,
+                                  job.get("preset", c.PRESET_BALANCED))
+            thread.signal.progress.connect(partial(self.on_job_progress, job["id"]))
+            thread.signal.status.connect(partial(self.on_job_status, job["id"]))
+            thread.signal.done.connect(partial(self.on_job_done, job["id"]))
+            thread.finished.connect(partial(self.on_job_finished, job["id"]))
+            self.threads[job["id"]] = thread
+            self.queue.set_state(job["id"], c.JOB_RUNNING)
+            thread.start()
+        self.signal.changed.emit()
+
+    def pause(self, job_id):
+        """Pauses a job, a running job is stopped after the current segment.
+
+        Args:
+          job_id: The id of the job.
+
+        """
+
+        job = self.queue.get(job_id)
+        if job is None:
+            return
+        if job_id in self.threads:
+            self.stop(job_id, c.JOB_PAUSED)
+        elif job["state"] == c.JOB_QUEUED:
+            self.queue.set_state(job_id, c.JOB_PAUSED)
+            self.signal.changed.emit()
+
+    def resume(self, job_id):
+        """Queues a paused or failed job again.
+
+        Args:
+          job_id: The id of the job.
+
+        """
+
+        job = self.queue.get(job_id)
+        if job is None or job_id in self.threads:
+            return
+        if job["state"] in [c.JOB_PAUSED, c.JOB_FAILED]:
+            self.queue.set_state(job_id, c.JOB_QUEUED)
+            self.schedule()
+
+    def cancel(self, job_id):
+        """Removes a job from the queue, a running job is stopped after the current segment.
+
+        The project folder of a started job is kept and can be resumed by opening it.
+
+        Args:
+          job_id: The id of the job.
+
+        """
+
+        if job_id in self.threads:
+            self.stop(job_id, None)
+            return
+        self.queue.remove(job_id)
+        self.signal.changed.emit()
+
+    def move(self, job_id, offset):
+        """Changes the priority of a job.
+
+        Args:
+          job_id: The id of the job.
+          offset: Number of positions, negative values move the job to the front.
+
+        """
+
+        self.queue.move(job_id, offset)
+        self.schedule()
+
+    def stop(self, job_id, state):
+        """Interrupts a running job.
+
+        Args:
+          job_id: The id of the job.
+          state: The state of the job after it has stopped, None to remove it.
+
+        """
+
+        self.stopping[job_id] = state
+        self.threads[job_id].interrupt()
+        self.status[job_id] = "Stopping after the current segment"
+        self.signal.changed.emit()
+
+    def stop_all(self):
+        """Stops all running jobs after their current segment and waits for them.
+
+        The jobs stay running in the saved queue, so they are continued on the next start.
+
+        """
+
+        for thread in self.threads.values():
+            thread.interrupt()
+        for thread in self.threads.values():
+            thread.wait()
+
+    def on_job_progress(self, job_id, value):
+        """Remembers the progress of a job.
+
+        Args:
+          job_id: The id of the job.
+          value: Current %
+
+        """
+
+        self.progress[job_id] = value
+        self.signal.changed.emit()
+
+    def on_job_status(self, job_id, status):
+        """Remembers the status text of a job.
+
+        Args:
+          job_id: The id of the job.
+          status: The status text.
+
+        """
+
+        if job_id not in self.stopping:
+            self.status[job_id] = status
+            self.signal.changed.emit()
+
+    def on_job_done(self, job_id, project_folder_path):
+        """Remembers the result of a job.
+
+        Args:
+          job_id: The id of the job.
+          project_folder_path: The project folder path if the project was successfully created, otherwise none
+
+        """
+
+        self.results[job_id] = project_folder_path
+
+    def on_job_finished(self, job_id):
+        """Updates the state of a job when its thread has finished and starts the next jobs.
+
+        Args:
+          job_id: The id of the job.
+
+        """
+
+        self.threads.pop(job_id)
+        self.progress.pop(job_id, None)
+        self.status.pop(job_id, None)
+        project_folder_path = self.results.pop(job_id, None)
+        if project_folder_path:
+            # the job can be complete before it notices the interruption
+            state = c.JOB_DONE if self.stopping.pop(job_id, c.JOB_DONE) is not None else None
+            self.signal.done.emit(project_folder_path)
+        else:
+            state = self.stopping.pop(job_id, c.JOB_FAILED)
+        if state is None:
+            self.queue.remove(job_id)
+        else:
+            self.queue.set_state(job_id, state)
+        self.schedule()
+
+    def get_text(self, job):
+        """Returns the description of a job for the queue list.
+
+        Args:
+          job: The job.
+
+        Returns:
+          The text.
+        """
+
+        text = "{} ({}) - {}".format(job["project_name"], job["language"], job["state"])
+        if job["id"] in self.progress:
+            text += " {}%".format(self.progress[job["id"]])
+        if job["id"] in self.status:
+            text += ", " + self.status[job["id"]]
+        return text
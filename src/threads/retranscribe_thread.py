@@ -0,0 +1,51 @@
+from PySide2.QtCore import QThread, Signal, QObject
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber
+import src.util.const as c
+import wave
+
+class RetranscribeSignal(QObject):
+    """Simple class to hold the Signals.
+
+    The done-signal contains the time range, the new transcription and its meta_data.
+    The failed-signal contains the reason, if the range could not be transcribed.
+
+    """
+    done = Signal(float, float, str, list)
+    failed = Signal(str)
+
+class RetranscribeThread(QThread):
+    """This thread transcribes a time range of a project again."""
+
+    def __init__(self, wav_file_path, language, start_time, end_time, aggressiveness, segmentation = None,
+                 preset = c.PRESET_BALANCED):
+        QThread.__init__(self, None)
+        self.signal = RetranscribeSignal()
+
+        self.wav_file_path = wav_file_path
+        self.language = language
+        self.start_time = start_time
+        self.end_time = end_time
+        self.aggressiveness = aggressiveness
+        self.segmentation = segmentation
+        self.preset = preset
+
+    def run(self):
+        """Method that is executed in the background.
+
+        Loads the model and transcribes the range of the converted file.
+
+        """
+
+        transcriber = DeepSpeechTranscriber(self.preset)
+        if transcriber.load_model(self.language) is None:
+            self.signal.failed.emit("No model for " + self.language)
+            return
+        try:
+            text, meta_data = transcriber.transcribe_range(self.wav_file_path, self.start_time, self.end_time,
+                                                           self.aggressiveness, self.segmentation)
+        except (OSError, EOFError, wave.Error) as e:
+            self.signal.failed.emit(str(e))
+            return
+        finally:
+            transcriber.release_model()
+        self.signal.done.emit(self.start_time, self.end_time, text, meta_data)
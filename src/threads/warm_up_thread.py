@@ -0,0 +1,26 @@
+from PySide2.QtCore import QThread
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber
+
+class WarmUpThread(QThread):
+    """This thread loads the model of the last used language while the start window is shown.
+
+    The model stays in the model registry, so the re-transcription and the plug-ins use it without loading it again.
+
+    """
+
+    def __init__(self, language, preset):
+        QThread.__init__(self, None)
+        self.language = language
+        self.preset = preset
+
+    def run(self):
+        """Method that is executed in the background.
+
+        Loads and primes the model, a missing or broken model is ignored.
+
+        """
+
+        try:
+            DeepSpeechTranscriber(self.preset).warm_up(self.language)
+        except (OSError, RuntimeError):
+            pass
@@ -2,82 +2,506 @@ import os
 from os import listdir
 from os.path import isfile, join
 import numpy as np
-from deepspeech import Model
 import collections
 import contextlib
+import hashlib
+import multiprocessing
+import threading
 import wave
 import webrtcvad
 import src.util.const as c
-from pydub import AudioSegment
 from src.transcription.format_handler import FormatHandler
+from src.util.model_registry import registry, get_size, read_ahead
+from src.util.segmentation import Segmentation
 from definitions import ROOT_DIR
 
+# the model types in the order of preference, whether the scorer is used and the beam width (None keeps the default)
+PRESETS = {
+    c.PRESET_FAST: {"models": [".tflite", ".pbmm"], "scorer": False, "beam_width": 100},
+    c.PRESET_BALANCED: {"models": [".pbmm", ".tflite"], "scorer": True, "beam_width": None},
+    c.PRESET_ACCURATE: {"models": [".pbmm", ".tflite"], "scorer": True, "beam_width": 1024},
+}
+# frames with a lower RMS energy are not checked by the VAD, except for the given number of frames after a loud frame
+SILENCE_RMS = 100
+HANGOVER_FRAMES = 20
+
 class DeepSpeechTranscriber():
     """Creates the Transcription via DeepSpeech.
 
     Based on: https://github.com/mozilla/DeepSpeech-examples/tree/r0.8/vad_transcriber
 
+    The preset chooses between speed and accuracy: fast prefers a .tflite model without scorer and
+    with a small beam, balanced is a .pbmm model with the scorer and accurate additionally widens the beam.
+
     """
 
-    def transcribe(self, file_path, language, aggressiveness = 3):
+    def __init__(self, preset = c.PRESET_BALANCED):
+        self.preset = preset if preset in PRESETS else c.PRESET_BALANCED
+        self.model_key = None
+        # set by get_model, a model which is assigned directly is not shared
+        self.model_lock = threading.Lock()
+        self.beam_width = None
+
+    def transcribe(self, file_path, language, aggressiveness = 3, workers = 1, on_segment = None, memory_limit = None,
+                   cache = None, start_time = 0.0):
         """Creates the segments and transcribes the given file.
 
+        With a cache, the source file is looked up first and only transcribed if it is not cached.
+        The decoded audio is hashed while it is transcribed and the result is stored at the end.
+
         Args:
           file_path: Path of the file which should be transcribed.
           language: Language in which the file should be transcribed.
           aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes which decode the segments in parallel. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+          cache: The TranscriptionCache, None to always transcribe. It is not used for a start time after 0. (Default value = None)
+          start_time: The audio before this second is skipped, e.g. to resume an interrupted transcription. It is rounded to whole frames. (Default value = 0.0)
 
         Returns:
           the transcription and the meta_data
         """
 
+        wav_file_path = self.prepare(file_path, language)
+        if wav_file_path is None:
+            return "", []
+
+        if cache is None or start_time > 0:
+            result = self.transcribe_stream(file_path, aggressiveness, workers, on_segment, memory_limit, start_time)
+            self.wait_for_conversion()
+            return result
+
+        source_key, result = self.lookup_cache(cache, file_path, aggressiveness, workers, memory_limit)
+        if result is not None:
+            text, transcription_list = result
+            if on_segment is not None and text:
+                on_segment(text, list(transcription_list), transcription_list[-1][c.END_TIME])
+            self.wait_for_conversion()
+            return result
+
+        content_hash = hashlib.sha256()
+        result = self.transcribe_stream(file_path, aggressiveness, workers, on_segment, memory_limit,
+                                        content_hash=content_hash)
+        self.wait_for_conversion()
+        self.store_cache(cache, content_hash, source_key, *result, aggressiveness, workers, memory_limit)
+        return result
+
+    def lookup_cache(self, cache, file_path, aggressiveness = 3, workers = 1, memory_limit = None):
+        """Looks up the transcription of a source file with the model loaded by prepare.
+
+        The source file is only read and hashed, which is much faster than decoding it.
+
+        Args:
+          cache: The TranscriptionCache.
+          file_path: Path of the source file.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes. (Default value = 1)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+
+        Returns:
+          The key of the source file and the cached transcription and meta_data or None if it is not cached.
+        """
+
+        source_key = cache.get_key(cache.hash_file(file_path), self.get_model_files(self.language),
+                                   self.get_cache_parameters(aggressiveness, workers, memory_limit))
+        key = cache.get_alias(source_key)
+        return source_key, cache.get(key) if key is not None else None
+
+    def store_cache(self, cache, content_hash, source_key, text, transcription_list, aggressiveness = 3, workers = 1,
+                    memory_limit = None):
+        """Stores a finished transcription under the hash of its decoded audio and the key of its source file.
+
+        Args:
+          cache: The TranscriptionCache.
+          content_hash: The hash object which was updated with the decoded audio.
+          source_key: The key of the source file from lookup_cache.
+          text: The transcription.
+          transcription_list: The meta_data of the words.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes. (Default value = 1)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+
+        """
+
+        key = cache.get_key(content_hash.hexdigest(), self.get_model_files(self.language),
+                            self.get_cache_parameters(aggressiveness, workers, memory_limit))
+        cache.put(key, text, transcription_list, source_key)
+
+    def get_cache_parameters(self, aggressiveness = 3, workers = 1, memory_limit = None):
+        """Returns the parameters which change the result of a transcription, so they are part of the cache key.
+
+        Args:
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes. (Default value = 1)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+
+        Returns:
+          Dict with the preset and the parameters of the VAD and the segment splitting.
+        """
+
+        window = MemoryWindow(memory_limit, workers, self.model.sampleRate(), 30)
+        return {"preset": self.preset, "aggressiveness": int(aggressiveness),
+                "max_segment_frames": window.max_segment_frames, "search_frames": window.search_frames,
+                "overlap_frames": window.overlap_frames, "silence_rms": SILENCE_RMS, "hangover_frames": HANGOVER_FRAMES}
+
+    def prepare(self, file_path, language):
+        """Loads the model and starts the conversion of the given file into a wav file which fits the model.
+
+        The wav file is only needed for the playback, so the conversion runs in the background.
+
+        Args:
+          file_path: Path of the file which should be transcribed.
+          language: Language in which the file should be transcribed.
+
+        Returns:
+          The path of the converted wav file or None if the file or the language is not supported.
+        """
+
         format_handler = FormatHandler()
         type, extension = format_handler.get_type_extension(file_path)
         if type is None:
-            return ""
+            return None
 
-        self.model = self.get_model(language)
-        if self.model is None:
-            return ""
+        if self.load_model(language) is None:
+            return None
 
         wav_file_path = file_path.replace(c.ORIGNAL_POSTFIX + extension, c.CON_COPY_POSTFIX + "wav")
-        format_handler.convert(file_path, wav_file_path, self.model.sampleRate())
+        self.conversion = format_handler.convert_in_background(file_path, wav_file_path, self.model.sampleRate())
+        return wav_file_path
+
+    def load_model(self, language):
+        """Loads the model of the given language, which is used by the transcribe methods until release_model is called.
+
+        Args:
+          language: Language-Tag which should exists as folder in the models folder.
+
+        Returns:
+          The DeepSpeech-Model or None if there is no model for the language.
+        """
+
+        self.language = language
+        self.model = self.get_model(language)
+        return self.model
+
+    def wait_for_conversion(self):
+        """Waits until the background conversion of prepare has written the wav file.
+
+        Raises an OSError if the conversion has failed.
+
+        """
+
+        conversion = getattr(self, "conversion", None)
+        self.conversion = None
+        if conversion is not None:
+            conversion.wait()
+
+    def transcribe_stream(self, file_path, aggressiveness = 3, workers = 1, on_segment = None, memory_limit = None,
+                          start_time = 0.0, content_hash = None):
+        """Transcribes the file while it is decoded through a ffmpeg pipe, with the model loaded by prepare.
+
+        Args:
+          file_path: Path of the file which should be transcribed.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes which decode the segments in parallel. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+          start_time: The audio before this second is skipped. (Default value = 0.0)
+          content_hash: A hash object which is updated with the decoded audio, e.g. for the cache key. (Default value = None)
+
+        Returns:
+          the transcription and the meta_data
+        """
+
+        sample_rate = self.model.sampleRate()
+        window = MemoryWindow(memory_limit, workers, sample_rate, 30)
+        start_time, start_frame = self.align_to_frames(start_time, sample_rate)
+        chunks = FormatHandler().read_pcm(file_path, sample_rate, window.chunk_size)
+        if content_hash is not None:
+            chunks = self.hash_chunks(chunks, content_hash)
+        chunks = self.skip_bytes(chunks, start_frame * 2)
+        return self.transcribe_chunks(chunks, sample_rate, window, aggressiveness, workers, on_segment, start_time)
+
+    def transcribe_wav(self, wav_file_path, aggressiveness = 3, workers = 1, on_segment = None, memory_limit = None,
+                       start_time = 0.0):
+        """Transcribes a converted wav file with the model loaded by prepare.
+
+        Args:
+          wav_file_path: Path of the converted wav file.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes which decode the segments in parallel. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+          start_time: The audio before this second is skipped. (Default value = 0.0)
+
+        Returns:
+          the transcription and the meta_data
+        """
+
+        sample_rate = self.read_wave_info(wav_file_path)
+        window = MemoryWindow(memory_limit, workers, sample_rate, 30)
+        start_time, start_frame = self.align_to_frames(start_time, sample_rate)
+        chunks = self.read_wave_chunks(wav_file_path, window.chunk_size, start_frame)
+        return self.transcribe_chunks(chunks, sample_rate, window, aggressiveness, workers, on_segment, start_time)
+
+    def transcribe_range(self, wav_file_path, start_time, end_time, aggressiveness = 3, segmentation = None):
+        """Transcribes only a time range of a converted wav file with the model loaded by load_model.
+
+        The VAD runs only over the range, so a short passage can be transcribed again in a few seconds.
+        If the stored segmentation was found with the same parameters, its segments are used instead.
+
+        Args:
+          wav_file_path: Path of the converted wav file.
+          start_time: Start of the range in seconds.
+          end_time: End of the range in seconds.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          segmentation: The Segmentation of the project or None. (Default value = None)
+
+        Returns:
+          the transcription and the meta_data of the range
+        """
+
+        sample_rate = self.read_wave_info(wav_file_path)
+        if segmentation is not None and segmentation.matches(sample_rate, aggressiveness):
+            return self.transcribe_segmentation(wav_file_path, segmentation.get_range(start_time, end_time))
+
+        window = MemoryWindow(None, 1, sample_rate, 30)
+        start_time, start_frame = self.align_to_frames(start_time, sample_rate)
+        end_frame = int(round(end_time * sample_rate))
+        chunks = self.read_wave_chunks(wav_file_path, window.chunk_size, start_frame, end_frame)
+        return self.transcribe_chunks(chunks, sample_rate, window, aggressiveness, 1, None, start_time)
+
+    def transcribe_segmentation(self, wav_file_path, segmentation, workers = 1, on_segment = None, memory_limit = None):
+        """Transcribes the stored segments of a converted wav file without running the VAD again.
+
+        Args:
+          wav_file_path: Path of the converted wav file.
+          segmentation: The Segmentation of the audio.
+          workers: Number of worker processes which decode the segments in parallel. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          memory_limit: Upper bound in bytes for the audio which is held in memory, None for no limit. (Default value = None)
+
+        Returns:
+          the transcription and the meta_data
+        """
+
+        window = MemoryWindow(memory_limit, workers, segmentation.sample_rate, segmentation.frame_duration_ms)
+        self.segmentation = segmentation
+        return self.stt(self.read_segments(wav_file_path, segmentation), workers, on_segment, window.max_pending)
+
+    def read_segments(self, wav_file_path, segmentation):
+        """Reads the segments of a Segmentation from a wav file.
+
+        Args:
+          wav_file_path: Path of the converted wav file.
+          segmentation: The Segmentation of the audio.
+
+        Returns:
+          Yields the segments.
+        """
+
+        segmentation.consolidate()
+        with contextlib.closing(wave.open(wav_file_path, 'rb')) as wf:
+            for start, end in segmentation.bounds.tolist():
+                wf.setpos(start)
+                data = wf.readframes(end - start)
+                yield Segment(data, start, start / float(segmentation.sample_rate), (end - start) / float(segmentation.sample_rate))
+
+    def align_to_frames(self, start_time, sample_rate, frame_duration_ms = 30):
+        """Rounds a start time to whole frames, so the timestamps stay on the frame grid of the whole audio.
+
+        Args:
+          start_time: The start time in seconds.
+          sample_rate: The sample rate of the audio.
+          frame_duration_ms: The frame duration in milliseconds. (Default value = 30)
+
+        Returns:
+          The rounded start time and its position in samples.
+        """
+
+        frame_count = int(round(max(start_time, 0) * 1000 / frame_duration_ms))
+        return frame_count * (frame_duration_ms / 1000.0), frame_count * int(sample_rate * (frame_duration_ms / 1000.0))
+
+    def transcribe_chunks(self, chunks, sample_rate, window, aggressiveness = 3, workers = 1, on_segment = None,
+                          start_time = 0.0):
+        """Runs the frames, the VAD and the decoding lazily over the PCM chunks.
+
+        Only the current chunk, the segment which is collected and the segments which are decoded are in memory.
+
+        Args:
+          chunks: The PCM chunks of the audio.
+          sample_rate: The sample rate of the audio.
+          window: The MemoryWindow which bounds the chunks and segments.
+          aggressiveness: Voice-activation aggressiveness. (Default value = 3)
+          workers: Number of worker processes which decode the segments in parallel. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          start_time: The timestamp of the first chunk. (Default value = 0.0)
+
+        Returns:
+          the transcription and the meta_data
+        """
 
-        audio, sample_rate = self.read_wave(wav_file_path)
         vad = webrtcvad.Vad(int(aggressiveness))
-        frames = list(self.frame_generator(30, audio, sample_rate))
-        segments = self.vad_collector(sample_rate, 30, 300, vad, frames)
+        # silent frames are found for a whole chunk at once, only the others are checked by the VAD
+        speech_chunks = self.speech_chunk_generator(30, chunks, sample_rate, vad, start_time)
+        segments = self.vad_collector_batch(sample_rate, 30, 300, speech_chunks, window.max_segment_frames,
+                                            window.overlap_frames, window.search_frames)
+
+        # the segments are recorded, so they can be saved in the project and reused
+        self.segmentation = Segmentation(sample_rate, int(aggressiveness), 300, 30)
+        segments = self.record_segments(segments, self.segmentation)
+
+        return self.stt(segments, workers, on_segment, window.max_pending)
 
-        return self.stt(segments, wav_file_path)
+    def record_segments(self, segments, segmentation):
+        """Adds the bounds of the segments to a Segmentation while they are passed on.
 
-    def stt(self, segments, file_path):
+        Split segments are recorded without their overlap, so they touch at the cut.
+
+        Args:
+          segments: The segments.
+          segmentation: The Segmentation.
+
+        Returns:
+          Yields the segments.
+        """
+
+        for segment in segments:
+            start = segment.offset
+            end = segment.offset + len(segment.bytes) // 2
+            if segment.keep_from is not None:
+                start = int(round(segment.keep_from * segmentation.sample_rate))
+            if segment.keep_until is not None:
+                end = int(round(segment.keep_until * segmentation.sample_rate))
+            segmentation.add(start, end)
+            yield segment
+
+    def hash_chunks(self, chunks, content_hash):
+        """Updates a hash with the PCM chunks while they are passed on.
+
+        Args:
+          chunks: The PCM chunks of the audio.
+          content_hash: The hash object, e.g. from hashlib.
+
+        Returns:
+          Yields the chunks.
+        """
+
+        for chunk in chunks:
+            content_hash.update(chunk)
+            yield chunk
+
+    def skip_bytes(self, chunks, count):
+        """Drops the first bytes of the PCM chunks.
+
+        Args:
+          chunks: The PCM chunks of the audio.
+          count: Number of bytes which should be dropped.
+
+        Returns:
+          Yields the remaining chunks.
+        """
+
+        for chunk in chunks:
+            if count >= len(chunk):
+                count -= len(chunk)
+                continue
+            yield chunk[count:] if count > 0 else chunk
+            count = 0
+
+    def stt(self, segments, workers = 1, on_segment = None, max_pending = None):
         """Execute the transcription for each segment.
 
+        With more than one worker, the segments are decoded by a pool of processes which load the model once.
+        The results are collected in the order of the segments, so the result is the same as in the serial run.
+
         Args:
           segments: List of segments from the audio
-          file_path: Path of the file which should be transcribed.
+          workers: Number of worker processes. (Default value = 1)
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+          max_pending: Maximum number of segments which are handed to the pool at once, None for twice the workers. (Default value = None)
 
         Returns:
           The transcription iteself and the meta_data which contain the timestamps for the words.
         """
 
-        output_string = ""
+        if workers > 1:
+            # Pool.imap would read all segments ahead, so the pool gets only a few at once even without a memory limit
+            if max_pending is None:
+                max_pending = 2 * workers
+            with multiprocessing.get_context("spawn").Pool(workers, init_worker, (self.language, self.preset)) as pool:
+                return self.collect_results(self.bounded_imap(pool, segments, max_pending), on_segment)
+
+        return self.collect_results(map(self.decode_segment, segments), on_segment)
+
+    def bounded_imap(self, pool, segments, max_pending):
+        """Hands the segments to the pool, but never more than max_pending at once.
+
+        Pool.imap reads the whole input ahead, which would keep all segments in memory.
+
+        Args:
+          pool: The worker pool.
+          segments: The segments which should be decoded.
+          max_pending: Maximum number of segments in the pool.
+
+        Returns:
+          Yields the results in the order of the segments.
+        """
+
+        pending = collections.deque()
+        for segment in segments:
+            pending.append(pool.apply_async(decode_in_worker, (segment,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def collect_results(self, results, on_segment = None):
+        """Joins the decoded segments to the transcription.
+
+        Args:
+          results: The text, the meta_data and the end time of each segment in the order of the segments.
+          on_segment: Called with the text, the meta_data and the end time of each finished segment, the text can be empty. (Default value = None)
+
+        Returns:
+          The transcription iteself and the meta_data which contain the timestamps for the words.
+        """
+
+        texts = []
         token_meta_data_list = []
 
-        sound = AudioSegment.from_file(file_path)
-        sound_byte = sound.raw_data
+        for text, meta_data, end_time in results:
+            if text:
+                texts.append(text)
+            token_meta_data_list.extend(meta_data)
+            if on_segment is not None:
+                on_segment(text, meta_data, end_time)
+
+        return " ".join(texts), token_meta_data_list
 
-        for i, segment in enumerate(segments):
-            audio_before_byte = sound_byte[0:sound_byte.find(segment)]
-            audio_before = AudioSegment(data=audio_before_byte, sample_width=2, frame_rate=16000, channels=1)
+    def decode_segment(self, segment):
+        """Decodes a single segment with one inference pass.
 
-            audio = np.frombuffer(segment, dtype=np.int16)
-            output_string = output_string + " " + self.model.stt(audio)
-            meta_data = self.model.sttWithMetadata(audio)
-            transcripts = meta_data.transcripts[0].tokens
-            token_meta_data_list = token_meta_data_list + self.get_meta_data_result(transcripts, audio_before.duration_seconds)
+        The text is built from the metadata tokens, so the model does not have to run stt and sttWithMetadata.
+
+        Args:
+          segment: The segment which should be decoded.
+
+        Returns:
+          The text of the segment, the meta_data of its words and the end time of the segment.
+        """
 
-        return output_string.strip(), token_meta_data_list
+        audio = np.frombuffer(segment.bytes, dtype=np.int16)
+        transcripts = self.decode(audio).transcripts[0].tokens
+        meta_data = self.get_meta_data_result(transcripts, segment.timestamp)
+        end_time = segment.timestamp + segment.duration
+        # the overlap of a split segment is decoded twice, each word is kept by the segment which owns its start
+        if segment.keep_from is not None:
+            meta_data = [m for m in meta_data if m[c.START_TIME] >= segment.keep_from]
+        if segment.keep_until is not None:
+            meta_data = [m for m in meta_data if m[c.START_TIME] < segment.keep_until]
+            end_time = segment.keep_until
+        return " ".join([m[c.WORD] for m in meta_data]), meta_data, end_time
 
     def get_meta_data_result(self, transcripts, segment_start_time):
         """Sets the correct start_time and end_time for the words in the transcripts.
@@ -100,7 +524,7 @@ class DeepSpeechTranscriber():
                 current_word = current_word + character
                 if start_time_stamp is None:
                     start_time_stamp = transcripts[i].start_time
-            if character == " " or i == (len(transcripts) - 1):
+            if (character == " " or i == (len(transcripts) - 1)) and current_word:
                 temp = {}
                 temp[c.START_TIME] = segment_start_time + start_time_stamp
                 temp[c.END_TIME] = segment_start_time + transcripts[i].start_time
@@ -132,6 +556,53 @@ class DeepSpeechTranscriber():
             pcm_data = wf.readframes(frames)
             return pcm_data, sample_rate
 
+    def read_wave_info(self, path):
+        """Checks the format of a .wav file without reading the audio.
+
+        Raises an OSError if the file is no mono 16 bit .wav file with a sample rate of the VAD.
+
+        Args:
+          path: path of the file.
+
+        Returns:
+          sample rate
+        """
+
+        try:
+            with contextlib.closing(wave.open(path, 'rb')) as wf:
+                channels, sample_width, sample_rate = wf.getnchannels(), wf.getsampwidth(), wf.getframerate()
+        except (wave.Error, EOFError) as e:
+            raise OSError("{}: not a valid .wav file".format(path)) from e
+        if channels != 1 or sample_width != 2 or sample_rate not in (8000, 16000, 32000):
+            raise OSError("{}: unsupported format, {} channels, {} bytes per sample, {} Hz".format(
+                path, channels, sample_width, sample_rate))
+        return sample_rate
+
+    def read_wave_chunks(self, path, chunk_size = 1 << 20, start_frame = 0, end_frame = None):
+        """Reads a .wav file in chunks.
+
+        Args:
+          path: path of the file.
+          chunk_size: Size of the chunks in bytes. (Default value = 1 << 20)
+          start_frame: The first sample which is read. (Default value = 0)
+          end_frame: The sample after the last sample which is read, None for the end of the file. (Default value = None)
+
+        Returns:
+          Yields the pcm audio data in chunks.
+        """
+
+        with contextlib.closing(wave.open(path, 'rb')) as wf:
+            frames_per_chunk = max(chunk_size // wf.getsampwidth(), 1)
+            end_frame = wf.getnframes() if end_frame is None else min(end_frame, wf.getnframes())
+            position = min(start_frame, end_frame)
+            wf.setpos(position)
+            while position < end_frame:
+                chunk = wf.readframes(min(frames_per_chunk, end_frame - position))
+                if not chunk:
+                    break
+                position += len(chunk) // wf.getsampwidth()
+                yield chunk
+
     def frame_generator(self, frame_duration_ms, audio, sample_rate):
         """Generates audio frames from PCM audio data.
 
@@ -141,19 +612,77 @@ class DeepSpeechTranscriber():
           sample_rate: The sample rate of the audio
 
         Returns:
-          Yields Frames of the requested duration.
+          Yields Frames of the requested duration, which are views into the audio.
         """
 
         n = int(sample_rate * (frame_duration_ms / 1000.0) * 2)
         offset = 0
         timestamp = 0.0
         duration = (float(n) / sample_rate) / 2.0
+        view = memoryview(audio)
         while offset + n < len(audio):
-            yield Frame(audio[offset:offset + n], timestamp, duration)
+            yield Frame(view[offset:offset + n], timestamp, duration, offset)
             timestamp += duration
             offset += n
 
-    def vad_collector(self, sample_rate, frame_duration_ms, padding_duration_ms, vad, frames):
+    def speech_chunk_generator(self, frame_duration_ms, chunks, sample_rate, vad, start_time = 0.0,
+                               silence_rms = SILENCE_RMS, hangover_frames = HANGOVER_FRAMES):
+        """Generates the frames of each PCM chunk together with their speech flags.
+
+        The RMS energy of all frames of a chunk is computed at once. Frames below silence_rms
+        are clearly silent and marked as unvoiced without a call to the VAD, which saves most
+        of the calls in recordings with long pauses. The default of 100 is about -50 dBFS.
+        The VAD still gets the silent frames shortly after a loud frame, because it keeps
+        reporting speech for a while after the speech has ended.
+
+        Args:
+          frame_duration_ms: Desired frame duration in miliseconds.
+          chunks: The PCM chunks of the audio.
+          sample_rate: The sample rate of the audio
+          vad: An instance of webrtcvad.Vad.
+          start_time: Timestamp of the first frame. (Default value = 0.0)
+          silence_rms: Frames with a lower RMS energy are silent, 0 to check every frame with the VAD. (Default value = SILENCE_RMS)
+          hangover_frames: Number of silent frames after a loud frame which are still checked by the VAD. (Default value = HANGOVER_FRAMES)
+
+        Returns:
+          Yields the Frames of each chunk, which are views into the chunk, and their speech flags as boolean numpy array.
+        """
+
+        n = int(sample_rate * (frame_duration_ms / 1000.0) * 2)
+        timestamp = start_time
+        duration = (float(n) / sample_rate) / 2.0
+        last_loud_before = -hangover_frames - 1
+        rest = b''
+        for chunk in chunks:
+            # Chunks which are a multiple of the frame size are used without a copy.
+            audio = rest + chunk if rest else chunk
+            view = memoryview(audio)
+            count = len(audio) // n
+            rest = bytes(view[count * n:])
+            if count == 0:
+                continue
+
+            frames = []
+            for offset in range(0, count * n, n):
+                frames.append(Frame(view[offset:offset + n], timestamp, duration, offset))
+                timestamp += duration
+
+            samples = np.frombuffer(view[:count * n], dtype=np.int16).reshape(count, n // 2)
+            samples = samples.astype(np.float32)
+            # the mean square is compared with the squared threshold, which saves the square root
+            loud = np.einsum("ij,ij->i", samples, samples) / (n // 2) >= silence_rms * silence_rms
+            # index of the last loud frame at each frame, relative to this chunk
+            positions = np.arange(count)
+            last_loud = np.maximum.accumulate(np.where(loud, positions, last_loud_before))
+            candidates = np.flatnonzero(positions - last_loud <= hangover_frames)
+            last_loud_before = int(last_loud[-1]) - count
+
+            is_speech = np.zeros(count, dtype=bool)
+            is_speech[candidates] = [vad.is_speech(frames[i].bytes, sample_rate) for i in candidates.tolist()]
+            yield frames, is_speech
+
+    def vad_collector(self, sample_rate, frame_duration_ms, padding_duration_ms, vad, frames, max_segment_frames = None,
+                      overlap_frames = 0, search_frames = 0):
         """Filters out non-voiced audio frames.
 
         Given a webrtcvad.Vad and a source of audio frames, yields only
@@ -175,25 +704,42 @@ class DeepSpeechTranscriber():
           padding_duration_ms: The amount to pad the window, in milliseconds.
           vad: An instance of webrtcvad.Vad.
           frames: a source of audio frames (sequence or generator).
+          max_segment_frames: A segment is split when it reaches this number of frames, None for no limit. (Default value = None)
+          overlap_frames: Number of frames by which split segments overlap. (Default value = 0)
+          search_frames: Number of frames before the limit in which the quietest frame is searched for the split. (Default value = 0)
 
         Returns:
-          A generator that yields PCM audio data.
+          A generator that yields Segments with the PCM audio data and their position in the audio.
         """
 
         num_padding_frames = int(padding_duration_ms / frame_duration_ms)
         # We use a deque for our sliding window/ring buffer.
         ring_buffer = collections.deque(maxlen=num_padding_frames)
+        # The voiced and unvoiced frames in the ring buffer are counted while
+        # they enter and leave it, instead of recounting the whole window.
+        num_voiced = 0
+        num_unvoiced = 0
         # We have two states: TRIGGERED and NOTTRIGGERED. We start in the
         # NOTTRIGGERED state.
         triggered = False
 
         voiced_frames = []
+        keep_from = None
         for frame in frames:
             is_speech = vad.is_speech(frame.bytes, sample_rate)
 
+            if len(ring_buffer) == ring_buffer.maxlen:
+                if ring_buffer[0][1]:
+                    num_voiced -= 1
+                else:
+                    num_unvoiced -= 1
+            ring_buffer.append((frame, is_speech))
+            if is_speech:
+                num_voiced += 1
+            else:
+                num_unvoiced += 1
+
             if not triggered:
-                ring_buffer.append((frame, is_speech))
-                num_voiced = len([f for f, speech in ring_buffer if speech])
                 # If we're NOTTRIGGERED and more than 90% of the frames in
                 # the ring buffer are voiced frames, then enter the
                 # TRIGGERED state.
@@ -205,57 +751,448 @@ class DeepSpeechTranscriber():
                     for f, s in ring_buffer:
                         voiced_frames.append(f)
                     ring_buffer.clear()
+                    num_voiced = 0
+                    num_unvoiced = 0
             else:
                 # We're in the TRIGGERED state, so collect the audio data
-                # and add it to the ring buffer.
+                # which was already added to the ring buffer.
                 voiced_frames.append(frame)
-                ring_buffer.append((frame, is_speech))
-                num_unvoiced = len([f for f, speech in ring_buffer if not speech])
+                # Keep the segments short during long continuous speech.
+                if max_segment_frames is not None and len(voiced_frames) >= max_segment_frames:
+                    segment, voiced_frames, keep_from = self.cut_voiced_frames(voiced_frames, sample_rate, keep_from,
+                                                                               overlap_frames, search_frames)
+                    yield segment
                 # If more than 90% of the frames in the ring buffer are
                 # unvoiced, then enter NOTTRIGGERED and yield whatever
                 # audio we've collected.
                 if num_unvoiced > 0.9 * ring_buffer.maxlen:
                     triggered = False
-                    yield b''.join([f.bytes for f in voiced_frames])
+                    if voiced_frames:
+                        yield Segment.from_frames(voiced_frames, sample_rate, keep_from)
                     ring_buffer.clear()
+                    num_voiced = 0
+                    num_unvoiced = 0
                     voiced_frames = []
+                    keep_from = None
 
-        if triggered:
-            pass
         # If we have any leftover voiced audio when we run out of input,
         # yield it.
         if voiced_frames:
-            yield b''.join([f.bytes for f in voiced_frames])
+            yield Segment.from_frames(voiced_frames, sample_rate, keep_from)
+
+    def vad_collector_batch(self, sample_rate, frame_duration_ms, padding_duration_ms, chunks, max_segment_frames = None,
+                            overlap_frames = 0, search_frames = 0):
+        """Filters out non-voiced audio frames with precomputed speech flags.
+
+        Works like vad_collector, but gets the is_speech results of a whole chunk as numpy array.
+        The voiced counts of all full windows are computed with one convolution per chunk and the
+        trigger and detrigger points are found with a binary search in these counts.
+        The ring buffer of the last chunk is carried into the next one.
+
+        Args:
+          sample_rate: The audio sample rate, in Hz.
+          frame_duration_ms: The frame duration in milliseconds.
+          padding_duration_ms: The amount to pad the window, in milliseconds.
+          chunks: a source of (frames, is_speech) pairs, where is_speech is a boolean numpy array with one value per frame.
+          max_segment_frames: A segment is split when it reaches this number of frames, None for no limit. (Default value = None)
+          overlap_frames: Number of frames by which split segments overlap. (Default value = 0)
+          search_frames: Number of frames before the limit in which the quietest frame is searched for the split. (Default value = 0)
+
+        Returns:
+          A generator that yields Segments with the PCM audio data and their position in the audio.
+        """
+
+        n = int(padding_duration_ms / frame_duration_ms)
+        threshold = 0.9 * n
+        window = np.ones(n, dtype=np.int32)
+        triggered = False
+        ring_frames = []
+        ring_speech = np.zeros(0, dtype=np.int32)
+        voiced_frames = []
+        keep_from = None
+
+        for chunk_frames, chunk_speech in chunks:
+            frames = ring_frames + list(chunk_frames)
+            speech = np.concatenate([ring_speech, np.asarray(chunk_speech, dtype=np.int32)])
+            length = len(frames)
+            cumsum = np.concatenate([[0], np.cumsum(speech)])
+            # voiced[j] is the number of voiced frames in the full window which ends at frame j + n - 1
+            voiced = np.convolve(speech, window, "valid") if length >= n else np.zeros(0, dtype=np.int32)
+            trigger_ends = np.flatnonzero(voiced > threshold) + n - 1
+            detrigger_ends = np.flatnonzero(n - voiced > threshold) + n - 1
+
+            # frames before i are already processed, the ring buffer was cleared before frame cleared
+            i = len(ring_frames)
+            cleared = 0
+            while i < length:
+                end = self.find_vad_switch(cumsum, cleared, i, length, n, threshold, not triggered,
+                                           trigger_ends if not triggered else detrigger_ends)
+                if not triggered:
+                    if end is None:
+                        break
+                    triggered = True
+                    start = max(end - n + 1, cleared)
+                    voiced_frames = frames[start:end + 1]
+                else:
+                    last = length - 1 if end is None else end
+                    keep_from = yield from self.split_voiced_frames(voiced_frames, frames[i:last + 1], max_segment_frames,
+                                                                    sample_rate, keep_from, overlap_frames, search_frames)
+                    if end is None:
+                        break
+                    triggered = False
+                    if voiced_frames:
+                        yield Segment.from_frames(voiced_frames, sample_rate, keep_from)
+                    voiced_frames = []
+                    keep_from = None
+                cleared = end + 1
+                i = end + 1
+
+            ring_start = max(length - n, cleared)
+            ring_frames = frames[ring_start:]
+            ring_speech = speech[ring_start:]
+
+        if voiced_frames:
+            yield Segment.from_frames(voiced_frames, sample_rate, keep_from)
+
+    def find_vad_switch(self, cumsum, cleared, start, length, n, threshold, voiced, full_window_ends):
+        """Finds the first frame at which the batched vad collector triggers or detriggers.
+
+        Windows which overlap the last clearing of the ring buffer are only counted from the clearing on.
+
+        Args:
+          cumsum: Cumulative sum of the speech flags, starting with 0.
+          cleared: Index of the first frame after the last clearing of the ring buffer.
+          start: Index of the first frame which should be checked.
+          length: Number of frames.
+          n: Size of the ring buffer.
+          threshold: The number of frames which has to be exceeded.
+          voiced: True to count the voiced frames, false to count the unvoiced frames.
+          full_window_ends: Sorted end indices of the full windows which exceed the threshold.
+
+        Returns:
+          The index of the frame or None if there is none.
+        """
+
+        # windows which start before the clearing
+        partial_end = min(cleared + n - 1, length)
+        if start < partial_end:
+            ends = np.arange(start, partial_end)
+            counts = cumsum[ends + 1] - cumsum[cleared]
+            if not voiced:
+                counts = ends - cleared + 1 - counts
+            hits = np.flatnonzero(counts > threshold)
+            if len(hits) > 0:
+                return int(ends[hits[0]])
+
+        position = np.searchsorted(full_window_ends, max(start, cleared + n - 1))
+        if position < len(full_window_ends):
+            return int(full_window_ends[position])
+        return None
+
+    def split_voiced_frames(self, voiced_frames, new_frames, max_segment_frames, sample_rate, keep_from = None,
+                            overlap_frames = 0, search_frames = 0):
+        """Adds frames to the voiced frames and splits a segment off whenever they reach the maximum length.
+
+        Args:
+          voiced_frames: The collected voiced frames, they are changed in place.
+          new_frames: The frames which should be added.
+          max_segment_frames: Maximum number of frames of a segment, None for no limit.
+          sample_rate: The audio sample rate, in Hz.
+          keep_from: The time of the last split of the voiced frames, None if they were not split. (Default value = None)
+          overlap_frames: Number of frames by which split segments overlap. (Default value = 0)
+          search_frames: Number of frames before the limit in which the quietest frame is searched for the split. (Default value = 0)
+
+        Returns:
+          Yields the split segments and returns the time of the last split.
+        """
+
+        if max_segment_frames is None:
+            voiced_frames.extend(new_frames)
+            return keep_from
+
+        position = 0
+        while position < len(new_frames):
+            take = max(max_segment_frames - len(voiced_frames), 1)
+            voiced_frames.extend(new_frames[position:position + take])
+            position += take
+            if len(voiced_frames) >= max_segment_frames:
+                segment, remaining, keep_from = self.cut_voiced_frames(voiced_frames, sample_rate, keep_from,
+                                                                       overlap_frames, search_frames)
+                voiced_frames[:] = remaining
+                yield segment
+        return keep_from
+
+    def cut_voiced_frames(self, voiced_frames, sample_rate, keep_from = None, overlap_frames = 0, search_frames = 0):
+        """Splits voiced frames which reached the maximum length at the quietest frame near their end.
+
+        The frame with the lowest energy among the last search_frames frames is the first frame after the cut.
+        The segment reaches overlap_frames past the cut and the remaining frames start overlap_frames before it,
+        so a word at the cut is complete in one of them. The cut time tells the decoder which words belong to which side.
+
+        Args:
+          voiced_frames: The collected voiced frames.
+          sample_rate: The audio sample rate, in Hz.
+          keep_from: The time of the previous split of the voiced frames, None if they were not split. (Default value = None)
+          overlap_frames: Number of frames by which the segments overlap. (Default value = 0)
+          search_frames: Number of frames in which the quietest frame is searched, 0 to cut at the end. (Default value = 0)
+
+        Returns:
+          The segment before the cut, the remaining frames and the time of the cut.
+        """
+
+        length = len(voiced_frames)
+        overlap = min(overlap_frames, length // 4)
+        end = length - overlap
+        start = max(end - min(search_frames, length // 2), 1)
+        cut = end
+        if start < end:
+            energy = [np.mean(np.square(np.frombuffer(f.bytes, dtype=np.int16), dtype=np.float64))
+                      for f in voiced_frames[start:end]]
+            cut = start + int(np.argmin(energy))
+        if cut >= length:
+            # nothing remains, the segment is not split
+            return Segment.from_frames(voiced_frames, sample_rate, keep_from), [], None
+
+        cut_time = voiced_frames[cut].timestamp
+        segment = Segment.from_frames(voiced_frames[:cut + overlap], sample_rate, keep_from, cut_time)
+        return segment, voiced_frames[cut - overlap:], cut_time
+
+    def decode(self, audio, num_results = 1):
+        """Runs one inference pass of the model with the beam width of the preset.
+
+        The model of get_model is shared with other threads and presets and it is not thread-safe,
+        so its lock is held while the beam width is set and the audio is decoded.
+
+        Args:
+          audio: The samples as 16 bit integers.
+          num_results: The number of candidate transcripts. (Default value = 1)
+
+        Returns:
+          The metadata of sttWithMetadata.
+        """
+
+        with self.model_lock:
+            if self.beam_width is not None:
+                self.model.setBeamWidth(self.beam_width)
+            return self.model.sttWithMetadata(audio, num_results)
 
     def get_model(self, language):
-        """Returns the DeepSpeech model.
+        """Returns the DeepSpeech model of the preset and checks it out until release_model is called.
+
+        The model is loaded once per process by the model registry and shared with the plug-ins. It is
+        shared by all presets with the same files, so the model must be run with decode, which sets the
+        beam width of the preset and holds the lock of the model.
+
+        Args:
+          language: Language-Tag which should exists as folder in the models folder.
+
+        Returns:
+          The DeepSpeech-Model.
+        """
+
+        self.release_model()
+        model_file, scorer_file = self.get_model_files(language)
+        if model_file is None:
+            return None
+
+        key = ("deepspeech", model_file, scorer_file)
+        model = registry.acquire(key, lambda: self.load_model_files(model_file, scorer_file), get_size(model_file, scorer_file))
+        if model is not None:
+            self.model_key = key
+            self.model = model
+            self.model_lock = registry.get_lock(key)
+            beam_width = PRESETS[self.preset]["beam_width"]
+            self.beam_width = beam_width if beam_width is not None else model.default_beam_width
+        return model
+
+    def release_model(self):
+        """Returns the model of get_model to the model registry, which may release it when the memory is needed."""
+
+        if self.model_key is not None:
+            registry.release(self.model_key)
+            self.model_key = None
+
+    def warm_up(self, language):
+        """Loads the model of the preset in advance and primes it with one inference pass.
+
+        The model files are read into the page cache as well, so the worker processes
+        of a transcription also load them without waiting for the disk. The model stays
+        in the model registry, but it is not checked out.
 
         Args:
           language: Language-Tag which should exists as folder in the models folder.
 
+        Returns:
+          The DeepSpeech-Model or None if there is no model for the language.
+        """
+
+        read_ahead(*self.get_model_files(language))
+        model = self.get_model(language)
+        if model is not None:
+            try:
+                self.decode(np.zeros(model.sampleRate() // 2, dtype=np.int16))
+            finally:
+                self.release_model()
+        return model
+
+    def load_model_files(self, model_file, scorer_file):
+        """Loads a DeepSpeech model.
+
+        Args:
+          model_file: The path of the model.
+          scorer_file: The path of the scorer or None.
+
         Returns:
           The DeepSpeech-Model.
         """
 
+        # imported here, so the pipeline can run with a stub model without DeepSpeech, e.g. in the benchmark
+        from deepspeech import Model
+
+        model = Model(model_file)
+        # the presets change the beam width of the shared model, this restores the one of the model file
+        model.default_beam_width = model.beamWidth()
+
+        if scorer_file is not None:
+            model.enableExternalScorer(scorer_file)
+
+        return model
+
+    def get_model_files(self, language):
+        """Returns the paths of the DeepSpeech model and scorer of the preset.
+
+        The first model type of the preset which exists exactly once in the folder is used.
+
+        Args:
+          language: Language-Tag which should exists as folder in the models folder.
+
+        Returns:
+          The path of the model and the path of the scorer, each None if there is not exactly one or the preset uses no scorer.
+        """
+
         model_path = os.path.join(ROOT_DIR, "models", language)
         files = [f for f in listdir(model_path) if isfile(join(model_path, f))]
+        preset = PRESETS[self.preset]
 
-        model_files = [s for s in files if ".pbmm" in s]
+        model_file = None
+        for model_type in preset["models"]:
+            model_files = [s for s in files if model_type in s]
+            if len(model_files) == 1:
+                model_file = os.path.join(model_path, model_files[0])
+                break
 
-        if len(model_files) != 1:
-            return None
+        scorer_files = [s for s in files if ".scorer" in s]
+        scorer_file = os.path.join(model_path, scorer_files[0]) if len(scorer_files) == 1 and preset["scorer"] else None
+        return model_file, scorer_file
 
-        model = Model(os.path.join(model_path,model_files[0]))
+class MemoryWindow(object):
+    """Splits a memory limit for the audio into the sizes of the sliding window.
 
-        scorer_files = [s for s in files if ".scorer" in s]
-        if len(scorer_files) == 1:
-            model.enableExternalScorer(model_path + os.path.sep + scorer_files[0])
+    The limit is shared by the current chunk, the segment which is collected and the segments in the worker pool.
+    Independent of the limit, segments are split after max_segment_duration seconds, so long continuous speech
+    is decoded in evenly sized parts. The split is searched in the last search_duration seconds before the limit
+    and the parts overlap by overlap_duration seconds. At most twice the number of workers segments wait in the pool.
 
-        return model
+    """
+    def __init__(self, memory_limit, workers, sample_rate, frame_duration_ms, max_segment_duration = 20,
+                 search_duration = 3, overlap_duration = 0.3):
+        frame_bytes = int(sample_rate * (frame_duration_ms / 1000.0) * 2)
+        chunk_size = 1 << 20
+        self.max_segment_frames = max(int(max_segment_duration * 1000 / frame_duration_ms), 1)
+        self.search_frames = int(search_duration * 1000 / frame_duration_ms)
+        self.overlap_frames = int(overlap_duration * 1000 / frame_duration_ms)
+        self.max_pending = 2 * max(workers, 1)
+        if memory_limit is not None:
+            segment_bytes = memory_limit // (self.max_pending + 2)
+            chunk_size = min(chunk_size, segment_bytes)
+            self.max_segment_frames = min(self.max_segment_frames, max(segment_bytes // frame_bytes, 1))
+
+        # a multiple of the frame size, so the frames are views into the chunks
+        self.chunk_size = max(chunk_size // frame_bytes, 1) * frame_bytes
+
+worker_transcriber = None
+
+def init_worker(language, preset = c.PRESET_BALANCED):
+    """Loads the model once for each worker process of the pool.
+
+    Args:
+      language: Language of the model.
+      preset: The preset of the model. (Default value = c.PRESET_BALANCED)
+
+    """
+
+    global worker_transcriber
+    worker_transcriber = DeepSpeechTranscriber(preset)
+    worker_transcriber.language = language
+    worker_transcriber.model = worker_transcriber.get_model(language)
+
+def decode_in_worker(segment):
+    """Decodes a segment with the model of the worker process.
+
+    Args:
+      segment: The segment which should be decoded.
+
+    Returns:
+      The text of the segment, the meta_data of its words and the end time of the segment.
+    """
+
+    return worker_transcriber.decode_segment(segment)
 
 class Frame(object):
-    """Represents a "frame" of audio data."""
-    def __init__(self, bytes, timestamp, duration):
+    """Represents a "frame" of audio data.
+
+    The bytes are a memoryview into the PCM buffer, position is the byte offset of the frame in this buffer.
+
+    """
+    __slots__ = ("bytes", "timestamp", "duration", "position")
+
+    def __init__(self, bytes, timestamp, duration, position = 0):
+        self.bytes = bytes
+        self.timestamp = timestamp
+        self.duration = duration
+        self.position = position
+
+class Segment(object):
+    """Represents a voiced segment of audio data and its position in the audio.
+
+    The bytes can be a memoryview into the PCM buffer, they are only copied when the segment is pickled.
+    A split segment overlaps its neighbours, it only keeps the words which start between keep_from and keep_until.
+
+    """
+    __slots__ = ("bytes", "offset", "timestamp", "duration", "keep_from", "keep_until")
+
+    def __init__(self, bytes, offset, timestamp, duration, keep_from = None, keep_until = None):
         self.bytes = bytes
+        self.offset = offset
         self.timestamp = timestamp
         self.duration = duration
+        self.keep_from = keep_from
+        self.keep_until = keep_until
+
+    def __reduce__(self):
+        return Segment, (bytes(self.bytes), self.offset, self.timestamp, self.duration, self.keep_from, self.keep_until)
+
+    @classmethod
+    def from_frames(cls, frames, sample_rate, keep_from = None, keep_until = None):
+        """Creates a segment from consecutive frames.
+
+        Args:
+          frames: The consecutive frames of the segment.
+          sample_rate: The sample rate of the audio.
+          keep_from: Words which start before this time belong to the previous segment, None for all. (Default value = None)
+          keep_until: Words which start at or after this time belong to the next segment, None for all. (Default value = None)
+
+        Returns:
+          The segment, which starts at the timestamp of the first frame.
+        """
+
+        first = frames[0]
+        last = frames[-1]
+        timestamp = first.timestamp
+        duration = last.timestamp + last.duration - timestamp
+        if isinstance(first.bytes, memoryview) and isinstance(last.bytes, memoryview) and first.bytes.obj is last.bytes.obj:
+            # All frames are consecutive views into the same buffer, so the segment is a view as well.
+            data = memoryview(first.bytes.obj)[first.position:last.position + len(last.bytes)]
+        else:
+            data = b''.join([f.bytes for f in frames])
+        return cls(data, int(round(timestamp * sample_rate)), timestamp, duration, keep_from, keep_until)
\ No newline at end of file
@@ -1,4 +1,8 @@
-from moviepy import tools, editor
+import subprocess
+import tempfile
+from moviepy import tools
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
 
 class FormatHandler():
@@ -14,14 +18,87 @@ class FormatHandler():
 
         """
 
-        type, extension = self.get_type_extension(file_path)
-        if type == "video":
-            clip = editor.VideoFileClip(file_path)
-            clip.audio.write_audiofile(wav_file_path, ffmpeg_params=["-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate)])
-        if type == "audio":
-            audio = editor.AudioFileClip(file_path)
-            audio.write_audiofile(wav_file_path, ffmpeg_params=["-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate)])
+        self.convert_in_background(file_path, wav_file_path, sample_rate).wait()
 
+    def convert_in_background(self, file_path, wav_file_path, sample_rate):
+        """Starts the conversion to a DeepSpeech suitable (wav) format without waiting for it.
+
+        Args:
+          file_path: Path of the file which should be converted.
+          wav_file_path: Path of the converted wav.
+          sample_rate: Sample rate.
+
+        Returns:
+          The running Conversion, its wait method raises an OSError if ffmpeg fails.
+        """
+
+        command = self.get_ffmpeg_command(file_path, sample_rate) + ["-y", wav_file_path]
+        return Conversion(command, file_path)
+
+    def read_pcm(self, file_path, sample_rate, chunk_size = 1 << 20):
+        """Decodes the file through a ffmpeg pipe into mono 16 bit PCM chunks.
+
+        No video clip is created and the decoded audio is never held in memory as a whole.
+        The error output of ffmpeg is written into a temporary file, so it can not block the pipe.
+
+        Args:
+          file_path: Path of the file which should be decoded.
+          sample_rate: Sample rate.
+          chunk_size: Size of the chunks in bytes. (Default value = 1 << 20)
+
+        Returns:
+          Yields the PCM chunks. Raises an OSError after the last chunk if ffmpeg has failed.
+        """
+
+        command = self.get_ffmpeg_command(file_path, sample_rate) + ["-f", "s16le", "-"]
+        with tempfile.TemporaryFile() as errors:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+            finished = False
+            try:
+                while True:
+                    chunk = process.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+                finished = True
+            finally:
+                process.stdout.close()
+                if not finished:
+                    # the reader has stopped early
+                    process.kill()
+                process.wait()
+            check_ffmpeg(process, errors, file_path)
+
+    def get_ffmpeg_command(self, file_path, sample_rate):
+        """Returns the ffmpeg command which extracts the audio as mono 16 bit PCM.
+
+        The output has to be appended to the command.
+
+        Args:
+          file_path: Path of the file which should be decoded.
+          sample_rate: Sample rate.
+
+        Returns:
+          The command as list.
+        """
+
+        return [get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", file_path, "-vn",
+                "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate)]
+
+    def get_duration(self, file_path):
+        """Returns the duration of the file, which ffmpeg reads from its header.
+
+        Args:
+          file_path: The file.
+
+        Returns:
+          The duration in seconds or None if it is unknown.
+        """
+
+        try:
+            return ffmpeg_parse_infos(file_path).get("duration")
+        except (IOError, KeyError, ValueError):
+            return None
 
     def get_type_extension(self, file_path):
         """Returns the type (e.g. video or audio) and the extension of the file.
@@ -37,4 +114,46 @@ class FormatHandler():
         dict_value = tools.extensions_dict.get(extension)
         if dict_value is not None:
             return dict_value.get("type"), extension
-        return None, extension
\ No newline at end of file
+        return None, extension
+
+class Conversion():
+    """A ffmpeg conversion which runs in the background.
+
+    The error output of ffmpeg is collected in a temporary file, so a failed conversion can be reported.
+
+    """
+
+    def __init__(self, command, file_path):
+        self.file_path = file_path
+        self.errors = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=self.errors)
+
+    def wait(self):
+        """Waits until the conversion has finished.
+
+        Raises an OSError if ffmpeg has failed.
+
+        """
+
+        self.process.wait()
+        try:
+            check_ffmpeg(self.process, self.errors, self.file_path)
+        finally:
+            self.errors.close()
+
+def check_ffmpeg(process, errors, file_path, tail_size = 1000):
+    """Raises an OSError with the end of the error output if a finished ffmpeg process has failed.
+
+    Args:
+      process: The finished ffmpeg process.
+      errors: The file with the error output of the process.
+      file_path: Path of the file which was converted.
+      tail_size: Number of characters of the error output in the message. (Default value = 1000)
+
+    """
+
+    if process.returncode == 0:
+        return
+    errors.seek(0)
+    tail = errors.read().decode(errors="replace").strip()[-tail_size:]
+    raise OSError("ffmpeg could not convert {} (exit code {}): {}".format(file_path, process.returncode, tail))
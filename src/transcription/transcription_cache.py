@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import shutil
+import src.util.const as c
+from src.util.project_util import save_transcription
+from src.util.word_timings import WordTimings
+
+# is increased whenever a change of the transcription pipeline changes its results, so older entries are not used
+PIPELINE_VERSION = 2
+
+class TranscriptionCache():
+    """Stores finished transcriptions, so the same audio is not transcribed twice.
+
+    The key is the hash of the decoded PCM, the model, the scorer and the parameters of the pipeline,
+    so the cache does not depend on the project and can be shared by all workspaces on the machine.
+    The PCM is only known after the transcription, so every entry also gets an alias with the hash
+    of its source file, which is used for the lookup.
+    Every entry is a folder with the transcription and its meta_data, like in a project folder.
+    The modification time of the folder is the last use, the least recently used entries are removed
+    when the cache is larger than its size limit.
+
+    """
+
+    def __init__(self, folder_path = None, max_size = 1 << 30):
+        self.folder_path = folder_path if folder_path else c.CACHE_PATH
+        self.max_size = max_size
+        os.makedirs(self.folder_path, exist_ok=True)
+
+    def get_key(self, content_hash, model_files, parameters):
+        """Returns the key of a transcription.
+
+        Args:
+          content_hash: The hash of the decoded audio or of the source file as hex string.
+          model_files: The paths of the model and scorer files, None for a missing scorer.
+          parameters: Dict with the preset and the parameters of the VAD and the segment splitting.
+
+        Returns:
+          The key as hex string.
+        """
+
+        key = hashlib.sha256()
+        key.update(content_hash.encode())
+        for file_path in model_files:
+            key.update(self.get_file_hash(file_path).encode() if file_path is not None else b"-")
+        key.update(json.dumps(parameters, sort_keys=True).encode())
+        key.update(str(PIPELINE_VERSION).encode())
+        return key.hexdigest()
+
+    def hash_file(self, file_path):
+        """Returns the hash of a file, e.g. of the source file of a transcription.
+
+        Args:
+          file_path: Path of the file.
+
+        Returns:
+          The hash as hex string.
+        """
+
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def get_file_hash(self, file_path):
+        """Returns the hash of a model file.
+
+        The hashes are remembered with the size and modification time of the files,
+        so the large model files are only read again after they were changed.
+
+        Args:
+          file_path: Path of the file.
+
+        Returns:
+          The hash as hex string.
+        """
+
+        stat = os.stat(file_path)
+        hashes_path = os.path.join(self.folder_path, "file_hashes.json")
+        hashes = {}
+        if os.path.isfile(hashes_path):
+            try:
+                with open(hashes_path, "r") as f:
+                    hashes = json.load(f)
+            except ValueError:
+                hashes = {}
+
+        known = hashes.get(os.path.abspath(file_path))
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        file_hash = self.hash_file(file_path)
+        hashes[os.path.abspath(file_path)] = [stat.st_size, stat.st_mtime_ns, file_hash]
+        self.write_atomic(hashes_path, hashes)
+        return file_hash
+
+    def get_alias(self, alias):
+        """Returns the key of the entry which an alias points to.
+
+        Args:
+          alias: The alias, e.g. the key of a source file.
+
+        Returns:
+          The key or None if the alias is unknown.
+        """
+
+        try:
+            with open(os.path.join(self.folder_path, alias + ".alias"), "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def get(self, key):
+        """Returns the cached transcription and marks it as used.
+
+        Args:
+          key: The key of the transcription.
+
+        Returns:
+          The transcription and the meta_data or None if the key is not cached.
+        """
+
+        entry_path = os.path.join(self.folder_path, key)
+        transcription_path = os.path.join(entry_path, c.TRANSCRIPTION + ".txt")
+        if not os.path.isfile(transcription_path):
+            return None
+        try:
+            with open(transcription_path, "r") as f:
+                text = f.read()
+            transcription_list = WordTimings.load(entry_path, mmap=False)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return text, transcription_list
+
+    def put(self, key, text, transcription_list, alias = None):
+        """Adds a transcription and removes the least recently used entries if the cache is too large.
+
+        The entry is written into a temporary folder first, so other processes never see a partial entry.
+
+        Args:
+          key: The key of the transcription.
+          text: The transcription.
+          transcription_list: The meta_data of the words, as list of dicts or WordTimings.
+          alias: Another key which points to the entry, e.g. the key of the source file. (Default value = None)
+
+        """
+
+        entry_path = os.path.join(self.folder_path, key)
+        temporary_path = entry_path + ".tmp" + str(os.getpid())
+        os.makedirs(temporary_path, exist_ok=True)
+        try:
+            save_transcription(temporary_path, text, transcription_list)
+            os.replace(temporary_path, entry_path)
+        except OSError:
+            # another process has added the same entry in the meantime
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        if alias is not None:
+            alias_path = os.path.join(self.folder_path, alias + ".alias")
+            temporary_path = alias_path + ".tmp" + str(os.getpid())
+            with open(temporary_path, "w") as f:
+                f.write(key)
+            os.replace(temporary_path, alias_path)
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits into its size limit."""
+
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.folder_path):
+            entry_path = os.path.join(self.folder_path, name)
+            if not os.path.isdir(entry_path) or ".tmp" in name:
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(entry_path, f)) for f in os.listdir(entry_path))
+                entries.append((os.path.getmtime(entry_path), size, entry_path))
+            except OSError:
+                continue
+            total_size += size
+
+        for last_used, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+
+        # the aliases of removed entries
+        for name in os.listdir(self.folder_path):
+            if name.endswith(".alias"):
+                key = self.get_alias(name[:-len(".alias")])
+                if key is None or not os.path.isdir(os.path.join(self.folder_path, key)):
+                    try:
+                        os.remove(os.path.join(self.folder_path, name))
+                    except OSError:
+                        pass
+
+    def write_atomic(self, file_path, value):
+        """Writes a value as json file, which is replaced atomically.
+
+        Args:
+          file_path: Path of the file.
+          value: The value.
+
+        """
+
+        temporary_path = file_path + ".tmp" + str(os.getpid())
+        with open(temporary_path, "w") as f:
+            json.dump(value, f)
+        os.replace(temporary_path, file_path)
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import src.util.const as c
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber
+from src.transcription.format_handler import FormatHandler
+from src.transcription.transcription_cache import TranscriptionCache
+from src.util.file_util import save_to_shelve, get_file
+from src.util.project_util import copy_source, get_checkpoint, is_other_source, ProjectCheckpoint
+from src.util.transcription_progress import TranscriptionProgress
+
+class TranscriptionInterrupted(Exception):
+    """Is raised after a finished segment to stop an interrupted transcription."""
+
+class TranscriptionWorker():
+    """Creates a project in a separate process, so the decoding does not slow down the user interface.
+
+    The worker does not use Qt. It sends its messages through a connection to the CreateThread,
+    which emits them as signals. Every message is a tuple of its kind and its values:
+    ("progress", value), ("status", text), ("started", project_folder_path),
+    ("segment", project_folder_path, text, meta_data) and ("done", project_folder_path), where the path of the
+    done-message is None if the project could not be created.
+
+    """
+
+    def __init__(self, connection, interrupted, editor_ready, options):
+        self.connection = connection
+        self.interrupted = interrupted
+        self.editor_ready = editor_ready
+        self.stream = options["stream"]
+        self.workers = options["workers"]
+        self.memory_limit = options["memory_limit"]
+        self.cache_folder = options["cache_folder"]
+        self.cache_size = options["cache_size"]
+        self.preset = options["preset"]
+
+    def send(self, kind, *values):
+        """Sends a message to the CreateThread.
+
+        Args:
+          kind: The kind of the message.
+          *values: The values of the message.
+
+        """
+
+        self.connection.send((kind,) + values)
+
+    def create_project(self, file_path, folder_path, project_name, language):
+        """Creates the Project.
+
+        In order to do this:
+            1. The project-folder will be created.
+            2. The source-material will be copied and converted
+            3. The converted version will be transcribed.
+            4. The results will be saved.
+
+        The finished segments are saved while the transcription is running. If the project folder contains
+        an interrupted transcription, it is resumed after the last saved segment instead of starting over.
+
+        Args:
+          file_path: The path of the source material.
+          folder_path: The folder in which the project folder should be created.
+          project_name: The project-name.
+          language: The project language, e.g. en, de or other language tags.
+
+        """
+        type, extension = FormatHandler().get_type_extension(file_path)
+        if type is None or type not in ["video", "audio"]:
+            self.send("done", None)
+            return
+
+        try:
+            transcriber = DeepSpeechTranscriber(self.preset)
+            # without a model the project would be created without a transcription
+            if transcriber.load_model(language) is None:
+                raise OSError("No model for " + language)
+            project_folder_path = os.path.join(folder_path, project_name)
+            checkpoint = get_checkpoint(project_folder_path)
+            if checkpoint is None:
+                os.mkdir(project_folder_path)
+            elif is_other_source(checkpoint, file_path):
+                raise OSError("{} is an interrupted transcription of {}, it can only be resumed with this file".format(
+                    project_folder_path, checkpoint["source"]))
+            self.checkpoint = ProjectCheckpoint(project_folder_path, file_path)
+            self.send("progress", 20)
+            if self.checkpoint.is_resumed():
+                new_file_path = get_file(project_folder_path, c.ORIGNAL_POSTFIX)
+            else:
+                new_file_path = copy_source(project_folder_path, file_path)
+            self.send("progress", 40)
+            save_to_shelve(project_folder_path, c.LANGUAGE, language)
+            save_to_shelve(project_folder_path, c.PRESET, self.preset)
+            self.send("progress", 60)
+            self.transcription_progress = TranscriptionProgress(project_folder_path,
+                                                                FormatHandler().get_duration(new_file_path),
+                                                                self.checkpoint.offset, self.workers)
+            if self.stream:
+                self.stream_transcription(transcriber, new_file_path, project_folder_path, language, self.workers)
+            else:
+                # a resumed transcription is incomplete, so it can neither be looked up nor stored in the cache
+                transcriber.transcribe(new_file_path, language, workers=self.workers, on_segment=self.on_segment,
+                                       memory_limit=self.memory_limit,
+                                       cache=None if self.checkpoint.is_resumed() else self.get_cache(),
+                                       start_time=self.checkpoint.offset)
+            self.checkpoint.finish(getattr(transcriber, "segmentation", None))
+            self.transcription_progress.finish()
+            self.send("progress", 100)
+        except TranscriptionInterrupted:
+            self.transcription_progress.finish(interrupted=True)
+            return
+        except OSError as e:
+            self.send("status", str(e))
+            self.send("done", None)
+            return
+
+        self.send("done", project_folder_path)
+
+    def get_cache(self):
+        """Returns the transcription cache.
+
+        Returns:
+          The TranscriptionCache or None if the cache is disabled or its folder can not be created.
+        """
+
+        if self.cache_size <= 0:
+            return None
+        try:
+            return TranscriptionCache(self.cache_folder, self.cache_size)
+        except OSError:
+            return None
+
+    def stream_transcription(self, transcriber, file_path, project_folder_path, language, workers):
+        """Transcribes the file and delivers every finished segment while the transcription is running.
+
+        The project is opened as soon as the file is converted. Afterwards each finished segment is saved
+        and sent to the editor.
+        A cached transcription is saved at once and the project is opened normally.
+
+        Args:
+          transcriber: The DeepSpeechTranscriber.
+          file_path: The path of the copied source material.
+          project_folder_path: The project folder.
+          language: The project language.
+          workers: Number of worker processes.
+
+        """
+
+        wav_file_path = transcriber.prepare(file_path, language)
+        if wav_file_path is None:
+            return
+        # the editor needs the converted file for the playback
+        transcriber.wait_for_conversion()
+
+        cache = None if self.checkpoint.is_resumed() else self.get_cache()
+        if cache is not None:
+            source_key, result = transcriber.lookup_cache(cache, file_path, workers=workers,
+                                                          memory_limit=self.memory_limit)
+            if result is not None:
+                text, transcription_list = result
+                if text:
+                    self.checkpoint.add(text, list(transcription_list), transcription_list[-1][c.END_TIME])
+                return
+
+        # wait until the editor has opened the project, otherwise segments could be shown twice
+        self.editor_ready.clear()
+        self.send("started", project_folder_path)
+        self.editor_ready.wait()
+
+        # the decoded audio is hashed while it is transcribed, it is the key of the cache entry
+        content_hash = hashlib.sha256() if cache is not None else None
+        text, _ = transcriber.transcribe_stream(file_path, workers=workers, on_segment=self.on_segment,
+                                                memory_limit=self.memory_limit, start_time=self.checkpoint.offset,
+                                                content_hash=content_hash)
+        if cache is not None:
+            transcriber.store_cache(cache, content_hash, source_key, text, self.checkpoint.transcription_list,
+                                    workers=workers, memory_limit=self.memory_limit)
+
+    def on_segment(self, text, meta_data, end_time):
+        """Saves a finished segment, sends it to the editor in the streaming mode and reports the progress.
+
+        The transcription covers the progress from 60 to 95%.
+
+        Args:
+          text: The text of the segment.
+          meta_data: The meta_data of the words in the segment.
+          end_time: The end time of the segment.
+
+        """
+
+        self.checkpoint.add(text, meta_data, end_time)
+        if self.interrupted.is_set():
+            self.checkpoint.save(end_time)
+            raise TranscriptionInterrupted()
+        if self.stream and text:
+            self.send("segment", self.checkpoint.project_folder_path, text, meta_data)
+
+        self.transcription_progress.update(end_time)
+        fraction = self.transcription_progress.get_fraction()
+        if fraction is not None:
+            self.send("progress", 60 + int(35 * fraction))
+        self.send("status", self.transcription_progress.get_text())
+
+def run_worker(connection, interrupted, editor_ready, options, file_path, folder_path, project_name, language):
+    """Creates a project in the worker process.
+
+    Args:
+      connection: The connection to the CreateThread.
+      interrupted: Event which is set to stop the transcription after the current segment.
+      editor_ready: Event which is set in the streaming mode when the editor has opened the project.
+      options: Dict with the workers, the streaming mode, the memory limit, the folder and size of the cache and the preset.
+      file_path: The path of the source material.
+      folder_path: The folder in which the project folder should be created.
+      project_name: The project-name.
+      language: The project language.
+
+    """
+
+    try:
+        TranscriptionWorker(connection, interrupted, editor_ready, options).create_project(file_path, folder_path,
+                                                                                              project_name, language)
+    finally:
+        connection.close()
+
+def run_prepared_worker(connection, interrupted, editor_ready, language, preset):
+    """Loads the model in advance and creates the project which is sent to the worker afterwards.
+
+    The worker is started before a project is created, so the first project does not wait for the
+    start of the process and the model. It receives a tuple of the options, the file path, the folder path,
+    the project name and the language. If the connection is closed instead, the worker exits.
+
+    Args:
+      connection: The duplex connection to the CreateThread.
+      interrupted: Event which is set to stop the transcription after the current segment.
+      editor_ready: Event which is set in the streaming mode when the editor has opened the project.
+      language: The language of the model which is loaded in advance.
+      preset: The preset of the model which is loaded in advance.
+
+    """
+
+    try:
+        try:
+            DeepSpeechTranscriber(preset).warm_up(language)
+        except (OSError, RuntimeError):
+            # the project reports the missing or broken model
+            pass
+        try:
+            options, file_path, folder_path, project_name, language = connection.recv()
+        except EOFError:
+            return
+        TranscriptionWorker(connection, interrupted, editor_ready, options).create_project(file_path, folder_path,
+                                                                                              project_name, language)
+    finally:
+        connection.close()
@@ -0,0 +1,402 @@
+import hashlib
+import os
+import re
+import numpy as np
+import src.util.const as c
+
+WORD_REGEX = re.compile(r"\S+")
+NORMALIZE_REGEX = re.compile(r"[^\w']")
+
+def normalize(word):
+    """Returns the word in the form which is compared during the alignment.
+
+    Args:
+      word: The word.
+
+    Returns:
+      The lowercase word without punctuation.
+    """
+
+    return NORMALIZE_REGEX.sub("", word.lower())
+
+def align_words(doc_keys, meta_keys, band = 20):
+    """Aligns two word sequences with a banded edit distance.
+
+    The common words at the beginning and the end are matched directly, so only the changed part in between
+    is aligned by the edit distance. For an unedited document, this is nothing.
+
+    Args:
+      doc_keys: The normalized words of the document.
+      meta_keys: The normalized words of the meta_data.
+      band: Half width of the band. (Default value = 20)
+
+    Returns:
+      List of (document index, meta_data index) pairs of the matched and substituted words.
+    """
+
+    n = len(doc_keys)
+    m = len(meta_keys)
+    limit = min(n, m)
+    prefix = 0
+    while prefix < limit and doc_keys[prefix] == meta_keys[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and doc_keys[n - 1 - suffix] == meta_keys[m - 1 - suffix]:
+        suffix += 1
+
+    pairs = [(i, i) for i in range(prefix)]
+    inner = align_words_banded(doc_keys[prefix:n - suffix], meta_keys[prefix:m - suffix], band)
+    pairs.extend((i + prefix, j + prefix) for i, j in inner)
+    pairs.extend((n - suffix + k, m - suffix + k) for k in range(suffix))
+    return pairs
+
+def align_words_banded(doc_keys, meta_keys, band = 20):
+    """Aligns two word sequences with a banded edit distance.
+
+    Only the cells within band around the (scaled) diagonal are computed.
+
+    Args:
+      doc_keys: The normalized words of the document.
+      meta_keys: The normalized words of the meta_data.
+      band: Half width of the band. (Default value = 20)
+
+    Returns:
+      List of (document index, meta_data index) pairs of the matched and substituted words.
+    """
+
+    n = len(doc_keys)
+    m = len(meta_keys)
+    if n == 0 or m == 0:
+        return []
+
+    width = band + m // n + 1
+    bounds = []
+    for i in range(n + 1):
+        center = i * m // n
+        bounds.append((max(center - width, 0), min(center + width, m)))
+
+    infinity = n + m + 1
+    previous_low, previous_high = bounds[0]
+    previous = [j for j in range(previous_low, previous_high + 1)]
+    moves = [None]
+    for i in range(1, n + 1):
+        low, high = bounds[i]
+        current = []
+        row_moves = []
+        key = doc_keys[i - 1]
+        for j in range(low, high + 1):
+            # 0: match or substitution, 1: document word without timing, 2: skipped meta_data word
+            best = infinity
+            move = 1
+            if previous_low <= j - 1 <= previous_high:
+                best = previous[j - 1 - previous_low] + (0 if key == meta_keys[j - 1] else 1)
+                move = 0
+            if previous_low <= j <= previous_high and previous[j - previous_low] + 1 < best:
+                best = previous[j - previous_low] + 1
+                move = 1
+            if j > low and current[-1] + 1 < best:
+                best = current[-1] + 1
+                move = 2
+            current.append(best)
+            row_moves.append(move)
+        moves.append((low, row_moves))
+        previous, previous_low, previous_high = current, low, high
+
+    pairs = []
+    i = n
+    j = m
+    while i > 0 and j > 0:
+        low, row_moves = moves[i]
+        if not low <= j < low + len(row_moves):
+            break
+        move = row_moves[j - low]
+        if move == 0:
+            pairs.append((i - 1, j - 1))
+            i -= 1
+            j -= 1
+        elif move == 1:
+            i -= 1
+        else:
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+def get_alignment_key(meta_data, text):
+    """Returns the hash of a text and the meta_data, which identifies a saved alignment.
+
+    Args:
+      meta_data: The WordTimings.
+      text: The text of the document.
+
+    Returns:
+      The key as hex string.
+    """
+
+    meta_data.consolidate()
+    key = hashlib.sha256()
+    key.update(text.encode("utf-8", "surrogatepass"))
+    key.update(np.ascontiguousarray(meta_data.records).tobytes())
+    key.update("\n".join(meta_data.words).encode("utf-8", "surrogatepass"))
+    return key.hexdigest()
+
+class Alignment():
+    """Keeps the mapping from the words in the document to the words in the meta_data up to date.
+
+    The words are the whitespace separated parts of the document, like in get_word_at of the editor.
+    After an edit only the changed words are aligned again, between the closest aligned words around them.
+    The mapping can be saved in the project, so it is not aligned again when the project is opened.
+
+    """
+
+    def __init__(self, meta_data, text, mapping = None):
+        self.meta_data = meta_data
+        self.meta_keys = []
+        self.text_length = 0
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.ends = np.zeros(0, dtype=np.int64)
+        self.keys = []
+        self.mapping = np.zeros(0, dtype=np.int64)
+        self.update(text, 0, 0, len(text), mapping)
+
+    @classmethod
+    def load(cls, project_folder_path, meta_data, text):
+        """Creates the alignment of a project, with the saved mapping if it belongs to the text and the meta_data.
+
+        Args:
+          project_folder_path: The project folder.
+          meta_data: The WordTimings of the project.
+          text: The text of the document.
+
+        Returns:
+          The Alignment.
+        """
+
+        file_path = os.path.join(project_folder_path, c.WORD_ALIGNMENT + ".npz")
+        mapping = None
+        if os.path.isfile(file_path):
+            try:
+                with np.load(file_path) as saved:
+                    if str(saved["key"][0]) == get_alignment_key(meta_data, text):
+                        mapping = saved["mapping"]
+            except (OSError, ValueError, KeyError):
+                mapping = None
+        return cls(meta_data, text, mapping)
+
+    def save(self, project_folder_path, text):
+        """Saves the mapping together with the key of the text and the meta_data, the file is replaced atomically.
+
+        Args:
+          project_folder_path: The project folder.
+          text: The text of the document, which has to be the text of the last update.
+
+        """
+
+        self.update_meta_keys()
+        file_path = os.path.join(project_folder_path, c.WORD_ALIGNMENT + ".npz")
+        with open(file_path + ".tmp", "wb") as f:
+            np.savez(f, mapping=self.mapping, key=np.array([get_alignment_key(self.meta_data, text)]))
+        os.replace(file_path + ".tmp", file_path)
+
+    def update_meta_keys(self):
+        """Normalizes the words of the meta_data which were added since the last call."""
+
+        if len(self.meta_keys) == len(self.meta_data):
+            return
+        self.meta_data.consolidate()
+        table = [normalize(word) for word in self.meta_data.words]
+        ids = self.meta_data.records[c.WORD][len(self.meta_keys):]
+        self.meta_keys.extend([table[i] for i in ids])
+
+    def update(self, text, position, removed, added, mapping = None):
+        """Aligns the words again which were changed by an edit.
+
+        Args:
+          text: The whole text after the edit.
+          position: Position of the edit.
+          removed: Number of removed characters.
+          added: Number of added characters.
+          mapping: The known meta_data indices of the changed words, None to align them. (Default value = None)
+
+        """
+
+        self.update_meta_keys()
+        # the counts of the document can contain the last paragraph separator, so they are derived from the lengths
+        removed = max(min(removed, self.text_length - position), 0)
+        delta = len(text) - self.text_length
+        self.text_length = len(text)
+
+        # the old words which touch the edit
+        first = int(np.searchsorted(self.ends, position, "left"))
+        last = int(np.searchsorted(self.starts, position + removed, "right"))
+        span_start = position
+        span_end = position + removed
+        if first < last:
+            span_start = min(span_start, int(self.starts[first]))
+            span_end = max(span_end, int(self.ends[last - 1]))
+
+        new_starts = []
+        new_ends = []
+        new_keys = []
+        for match in WORD_REGEX.finditer(text, span_start, max(span_end + delta, span_start)):
+            new_starts.append(match.start())
+            new_ends.append(match.end())
+            new_keys.append(normalize(match.group()))
+
+        old_keys = self.keys[first:last]
+        old_mapping = self.mapping[first:last]
+        self.starts = np.concatenate([self.starts[:first], np.array(new_starts, dtype=np.int64), self.starts[last:] + delta])
+        self.ends = np.concatenate([self.ends[:first], np.array(new_ends, dtype=np.int64), self.ends[last:] + delta])
+        self.keys[first:last] = new_keys
+        new_mapping = np.full(len(new_keys), -1, dtype=np.int64)
+
+        # unchanged words at the beginning and the end keep their timings
+        prefix = 0
+        while prefix < min(len(old_keys), len(new_keys)) and old_keys[prefix] == new_keys[prefix]:
+            new_mapping[prefix] = old_mapping[prefix]
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(old_keys), len(new_keys)) - prefix
+               and old_keys[len(old_keys) - 1 - suffix] == new_keys[len(new_keys) - 1 - suffix]):
+            new_mapping[len(new_keys) - 1 - suffix] = old_mapping[len(old_keys) - 1 - suffix]
+            suffix += 1
+
+        if mapping is not None and len(mapping) == len(new_keys) and np.all(mapping < len(self.meta_keys)):
+            self.mapping = np.concatenate([self.mapping[:first], np.asarray(mapping, dtype=np.int64), self.mapping[last:]])
+            return
+        self.mapping = np.concatenate([self.mapping[:first], new_mapping, self.mapping[last:]])
+        self.realign(first + prefix, first + len(new_keys) - suffix)
+
+    def realign(self, start, end):
+        """Aligns the document words from start to end with the meta_data words between their aligned neighbours.
+
+        Args:
+          start: Index of the first document word.
+          end: Index after the last document word.
+
+        """
+
+        if start >= end:
+            return
+
+        before = np.flatnonzero(self.mapping[:start] >= 0)
+        after = np.flatnonzero(self.mapping[end:] >= 0)
+        meta_start = int(self.mapping[before[-1]]) + 1 if len(before) > 0 else 0
+        meta_end = int(self.mapping[end + after[0]]) if len(after) > 0 else len(self.meta_keys)
+
+        self.mapping[start:end] = -1
+        doc_keys = self.keys[start:end]
+        meta_keys = self.meta_keys[meta_start:meta_end]
+        if doc_keys == meta_keys:
+            self.mapping[start:end] = np.arange(meta_start, meta_end)
+            return
+        for doc_index, meta_index in align_words(doc_keys, meta_keys):
+            self.mapping[start + doc_index] = meta_start + meta_index
+
+    def get_text_range(self, first, last):
+        """Returns the characters of the document words which are aligned with a range of the meta_data.
+
+        Args:
+          first: Index of the first meta_data word.
+          last: Index after the last meta_data word.
+
+        Returns:
+          The start and end position of the characters. If no word is aligned with the range, both are the position
+          after the last word before the range.
+        """
+
+        inside = np.flatnonzero((self.mapping >= first) & (self.mapping < last))
+        if len(inside) > 0:
+            return int(self.starts[inside[0]]), int(self.ends[inside[-1]])
+        before = np.flatnonzero((self.mapping >= 0) & (self.mapping < first))
+        position = int(self.ends[before[-1]]) if len(before) > 0 else 0
+        return position, position
+
+    def replace_meta(self, first, last, count):
+        """Updates the alignment after a range of the meta_data was replaced.
+
+        The document words of the old range lose their timing and the indices after the range are moved.
+        After the text of the range was replaced as well, realign_characters aligns the new words.
+
+        Args:
+          first: Index of the first replaced meta_data word.
+          last: Index after the last replaced meta_data word, before the replacement.
+          count: Number of the new meta_data words.
+
+        """
+
+        table = [normalize(word) for word in self.meta_data.words]
+        ids = self.meta_data.records[c.WORD][first:first + count]
+        self.meta_keys[first:last] = [table[i] for i in ids]
+        self.mapping[(self.mapping >= first) & (self.mapping < last)] = -1
+        self.mapping[self.mapping >= last] += count - (last - first)
+
+    def realign_characters(self, start, end):
+        """Aligns the document words in a range of characters again.
+
+        Args:
+          start: Position of the first character.
+          end: Position after the last character.
+
+        """
+
+        self.update_meta_keys()
+        self.realign(*self.get_word_range(start, end))
+
+    def get_word_range(self, start, end):
+        """Returns the document words which overlap a range of characters.
+
+        Args:
+          start: Position of the first character.
+          end: Position after the last character.
+
+        Returns:
+          The position of the first word and the position after the last word.
+        """
+
+        first = int(np.searchsorted(self.ends, start, "right"))
+        last = int(np.searchsorted(self.starts, end, "left"))
+        return first, max(first, last)
+
+    def get_meta_index(self, word_pos):
+        """Returns the index of the meta_data of a document word.
+
+        Args:
+          word_pos: Position of the word in the document.
+
+        Returns:
+          The index or -1 if the word has no timing.
+        """
+
+        if word_pos < 0 or word_pos >= len(self.mapping):
+            return -1
+        return int(self.mapping[word_pos])
+
+    def get_word_pos(self, position):
+        """Returns the position of the document word at a character position.
+
+        Args:
+          position: The character position.
+
+        Returns:
+          The word position or -1 if there is no word at the character position.
+        """
+
+        word_pos = int(np.searchsorted(self.ends, position, "right"))
+        if word_pos < len(self.starts) and self.starts[word_pos] <= position:
+            return word_pos
+        return -1
+
+    def get_timing(self, word_pos):
+        """Returns the meta_data of a document word.
+
+        Args:
+          word_pos: Position of the word in the document.
+
+        Returns:
+          Dict with the start_time, end_time and word or None if the word has no timing.
+        """
+
+        meta_index = self.get_meta_index(word_pos)
+        if meta_index < 0:
+            return None
+        return self.meta_data[meta_index]
@@ -11,6 +11,8 @@ SETTINGS_PATH = os.path.join(ROOT_DIR, "settings", "settings")
 KEYBOARD_SETTINGS_PATH = os.path.join(ROOT_DIR, "settings", "keyboard")
 PLUGIN_PATH = os.path.join(ROOT_DIR, "plugins")
 LICENCES_PATH = os.path.join(ASSETS_PATH, "licences")
+CACHE_PATH = os.path.join(ROOT_DIR, "cache", "transcriptions")
+QUEUE_PATH = os.path.join(ROOT_DIR, "settings", "queue.json")
 
 LANGUAGE = "language"
 CHOOSE_FILE = "Choose a File"
@@ -28,6 +30,15 @@ START_TIME = "start_time"
 END_TIME = "end_time"
 WORD = "word"
 TRANSCRIPTION_META_DATA = "transcription_meta_data"
+TRANSCRIPTION_WORDS = "transcription_words"
+TRANSCRIPTION_CHECKPOINT = "transcription_checkpoint"
+VAD_SEGMENTATION = "vad_segmentation"
+WORD_ALIGNMENT = "word_alignment"
+TRANSCRIPTION_LOG = "transcription_log"
+PRESET = "preset"
+PRESET_FAST = "fast"
+PRESET_BALANCED = "balanced"
+PRESET_ACCURATE = "accurate"
 PLUGIN_POST = "lt_plugin"
 PLUGIN_NAME = "Plugin"
 HELP_KEY = "HELP_KEY"
@@ -37,4 +48,20 @@ FORWARD_KEY = "FORWARDS_KEY"
 WORD_BY_WORD_KEY_NEXT = "WORD_BY_WORD_KEY_NEXT"
 WORD_BY_WORD_KEY_PREV = "WORD_BY_WORD_KEY_PREV"
 SAVE_KEY = "SAVE_KEY"
-SHOW_EMPTY_BUTTONS = "SHOW_EMPTY_BUTTONS"
\ No newline at end of file
+SHOW_EMPTY_BUTTONS = "SHOW_EMPTY_BUTTONS"
+TRANSCRIPTION_WORKERS = "TranscriptionWorkers"
+STREAM_TRANSCRIPTION = "StreamTranscription"
+TRANSCRIPTION_MEMORY_LIMIT = "TranscriptionMemoryLimit"
+TRANSCRIPTION_CACHE_SIZE = "TranscriptionCacheSize"
+TRANSCRIPTION_CACHE_FOLDER = "TranscriptionCacheFolder"
+MODEL_MEMORY_BUDGET = "ModelMemoryBudget"
+MODEL_WARM_UP = "ModelWarmUp"
+LAST_LANGUAGE = "LastLanguage"
+LAST_PRESET = "LastPreset"
+QUEUE_JOBS = "QueueJobs"
+QUEUE_CPU_BUDGET = "QueueCpuBudget"
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
\ No newline at end of file
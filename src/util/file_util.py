@@ -17,6 +17,23 @@ def write_text_file(project_folder_path, text, file_name):
     with open(file_path, "w") as f:
         f.write(text)
 
+def append_text_file(project_folder_path, text, file_name, separator = " "):
+    """Appends the given text to a Textfile.
+
+    Args:
+      project_folder_path: Folder in which the text-file is saved.
+      text: The Text.
+      file_name: The file-name of the text-file.
+      separator: Is written before the text if the file is not empty. (Default value = " ")
+
+    """
+
+    file_path = os.path.join(project_folder_path, file_name + ".txt")
+    with open(file_path, "a") as f:
+        if f.tell() > 0:
+            f.write(separator)
+        f.write(text)
+
 def save_to_shelve(project_folder_path, key, value, shelve_name = "persistent"):
     """Saves the given key and value to a shelve.
 
@@ -31,6 +48,20 @@ def save_to_shelve(project_folder_path, key, value, shelve_name = "persistent"):
     with shelve.open(os.path.join(project_folder_path, shelve_name)) as sh:
         sh[key] = value
 
+def remove_from_shelve(project_folder_path, key, shelve_name = "persistent"):
+    """Removes the given key from a shelve.
+
+    Args:
+      project_folder_path: The project-folder where the shelve is saved.
+      key: The key.
+      shelve_name: The name of the shelve. (Default value = "persistent")
+
+    """
+
+    with shelve.open(os.path.join(project_folder_path, shelve_name)) as sh:
+        if key in sh:
+            del sh[key]
+
 def get_value_from_shelve(project_folder_path, key, default = None, shelve_name = "persistent",):
     """Returns a value for a given key from a shelve.
 
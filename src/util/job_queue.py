@@ -0,0 +1,188 @@
+import json
+import os
+import uuid
+import src.util.const as c
+from src.util.project_util import get_checkpoint, is_other_source
+
+class JobQueue():
+    """The queued creations of projects in the order of their priority.
+
+    Every job is a dict with the source file, the project folder, the project name, the language, the number of
+    worker processes, the preset of the model and its state. The queue is saved after every change, so it survives a restart of the application.
+    Jobs which were running when the application was closed are queued again and resume from their checkpoint.
+
+    """
+
+    def __init__(self, file_path = None):
+        self.file_path = file_path if file_path else c.QUEUE_PATH
+        self.jobs = []
+
+    def load(self):
+        """Loads the saved jobs, running jobs are queued again."""
+
+        if not os.path.isfile(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r") as f:
+                self.jobs = json.load(f)
+        except (OSError, ValueError):
+            self.jobs = []
+        for job in self.jobs:
+            if job["state"] == c.JOB_RUNNING:
+                job["state"] = c.JOB_QUEUED
+
+    def save(self):
+        """Saves the jobs as .json file, which is replaced atomically."""
+
+        temporary_path = self.file_path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.jobs, f)
+        os.replace(temporary_path, self.file_path)
+
+    def add(self, file_path, folder_path, project_name, language, workers = 1, preset = c.PRESET_BALANCED):
+        """Appends a job with the lowest priority.
+
+        A project folder can only be created by one job. A folder which exists already is only accepted
+        if it contains an interrupted transcription of the same file, which is resumed.
+
+        Args:
+          file_path: The path of the source material.
+          folder_path: The folder in which the project folder should be created.
+          project_name: The project-name.
+          language: The project language.
+          workers: Number of worker processes. (Default value = 1)
+          preset: The preset of the model. (Default value = c.PRESET_BALANCED)
+
+        Returns:
+          The job or None if the project is queued already or exists.
+        """
+
+        project_folder_path = os.path.join(folder_path, project_name)
+        if self.find(project_folder_path) is not None:
+            return None
+        if os.path.exists(project_folder_path):
+            checkpoint = get_checkpoint(project_folder_path)
+            if checkpoint is None or is_other_source(checkpoint, file_path):
+                return None
+        job = {"id": uuid.uuid4().hex, "file_path": file_path, "folder_path": folder_path,
+               "project_name": project_name, "language": language, "workers": workers, "preset": preset,
+               "state": c.JOB_QUEUED}
+        self.jobs.append(job)
+        self.save()
+        return job
+
+    def get(self, job_id):
+        """Returns the job with the given id.
+
+        Args:
+          job_id: The id of the job.
+
+        Returns:
+          The job or None if the id is not in the queue.
+        """
+
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def find(self, project_folder_path):
+        """Returns the job which creates a project folder.
+
+        Args:
+          project_folder_path: The project folder path.
+
+        Returns:
+          The job or None if no job creates the folder.
+        """
+
+        for job in self.jobs:
+            if os.path.normpath(os.path.join(job["folder_path"], job["project_name"])) == os.path.normpath(project_folder_path):
+                return job
+        return None
+
+    def remove(self, job_id):
+        """Removes a job from the queue.
+
+        Args:
+          job_id: The id of the job.
+
+        """
+
+        self.jobs = [job for job in self.jobs if job["id"] != job_id]
+        self.save()
+
+    def set_state(self, job_id, state):
+        """Changes the state of a job.
+
+        Args:
+          job_id: The id of the job.
+          state: The new state, one of the JOB_ constants.
+
+        """
+
+        job = self.get(job_id)
+        if job is not None:
+            job["state"] = state
+            self.save()
+
+    def move(self, job_id, offset):
+        """Changes the priority of a job.
+
+        Args:
+          job_id: The id of the job.
+          offset: Number of positions, negative values move the job to the front.
+
+        """
+
+        job = self.get(job_id)
+        if job is None:
+            return
+        index = self.jobs.index(job)
+        self.jobs.pop(index)
+        self.jobs.insert(min(max(index + offset, 0), len(self.jobs)), job)
+        self.save()
+
+    def get_startable(self, max_jobs, cpu_budget, reserved = 0):
+        """Returns the queued jobs which can be started now.
+
+        The jobs are started in the order of their priority as long as the number of running jobs and the sum of
+        their worker processes fit into the limits. A job never gets more workers than the cpu budget, so a job
+        which does not fit waits for the running jobs instead of being passed by jobs with a lower priority.
+
+        Args:
+          max_jobs: The maximum number of running jobs.
+          cpu_budget: The maximum number of worker processes of all running jobs.
+          reserved: Number of worker processes which run outside the queue. (Default value = 0)
+
+        Returns:
+          The jobs.
+        """
+
+        running = [job for job in self.jobs if job["state"] == c.JOB_RUNNING]
+        used = reserved + sum(self.get_workers(job, cpu_budget) for job in running)
+        count = len(running)
+        startable = []
+        for job in self.jobs:
+            if job["state"] != c.JOB_QUEUED:
+                continue
+            workers = self.get_workers(job, cpu_budget)
+            if count >= max_jobs or used + workers > cpu_budget:
+                break
+            startable.append(job)
+            used += workers
+            count += 1
+        return startable
+
+    def get_workers(self, job, cpu_budget):
+        """Returns the number of worker processes of a job within the cpu budget.
+
+        Args:
+          job: The job.
+          cpu_budget: The maximum number of worker processes of all running jobs.
+
+        Returns:
+          The number of worker processes.
+        """
+
+        return max(min(job["workers"], cpu_budget), 1)
@@ -0,0 +1,189 @@
+import collections
+import contextlib
+import mmap
+import os
+import threading
+
+class ModelRegistry():
+    """Loads every model once per process and shares it between the transcriber and the plug-ins.
+
+    A model is checked out with acquire (or use) and returned with release. The models are kept in the
+    order of their last use. If the estimated size of all models exceeds the memory budget, the least
+    recently used models which are not checked out are released before a new model is loaded.
+
+    A model can be checked out by several threads at once. Models which are not thread-safe are only
+    used while the lock of the model (get_lock) is held.
+
+    """
+
+    def __init__(self, memory_budget = 4 << 30):
+        self.memory_budget = memory_budget
+        # key -> [model, size, number of check-outs, lock which is held while the model is used]
+        self.models = collections.OrderedDict()
+        # key -> event which is set when the model has been loaded by another thread
+        self.loading = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, key, loader, size = 0):
+        """Returns a model and loads it if it is not loaded yet, the model is not released until release is called.
+
+        The lock is only held for the bookkeeping, so other models can be used while a model is loaded.
+        If several threads want the same model, only one of them loads it and the others wait for it.
+
+        Args:
+          key: The key of the model, e.g. the kind of the model and its files.
+          loader: Function without arguments which loads the model.
+          size: The estimated memory size of the model in bytes. (Default value = 0)
+
+        Returns:
+          The model or None if the loader has returned None, release must only be called for a model.
+        """
+
+        while True:
+            with self.lock:
+                entry = self.models.get(key)
+                if entry is not None:
+                    self.models.move_to_end(key)
+                    entry[2] += 1
+                    return entry[0]
+                loaded = self.loading.get(key)
+                if loaded is None:
+                    loaded = self.loading[key] = threading.Event()
+                    self.evict(size)
+                    break
+            # the other thread may fail, then the model is loaded by this thread
+            loaded.wait()
+
+        model = None
+        try:
+            model = loader()
+        finally:
+            with self.lock:
+                del self.loading[key]
+                if model is not None:
+                    self.models[key] = [model, size, 1, threading.Lock()]
+            loaded.set()
+        return model
+
+    def release(self, key):
+        """Returns a model which was checked out with acquire.
+
+        Args:
+          key: The key of the model.
+
+        """
+
+        with self.lock:
+            entry = self.models.get(key)
+            if entry is not None and entry[2] > 0:
+                entry[2] -= 1
+            self.evict()
+
+    def get_lock(self, key):
+        """Returns the lock of a model which is checked out, the threads hold it while they run the model.
+
+        Args:
+          key: The key of the model.
+
+        Returns:
+          The lock of the model or None if the model is not loaded.
+        """
+
+        with self.lock:
+            entry = self.models.get(key)
+            return entry[3] if entry is not None else None
+
+    @contextlib.contextmanager
+    def use(self, key, loader, size = 0):
+        """Checks a model out for the duration of a with-block.
+
+        Args:
+          key: The key of the model.
+          loader: Function without arguments which loads the model.
+          size: The estimated memory size of the model in bytes. (Default value = 0)
+
+        Returns:
+          The model or None if the loader has returned None.
+        """
+
+        model = self.acquire(key, loader, size)
+        try:
+            yield model
+        finally:
+            if model is not None:
+                self.release(key)
+
+    def evict(self, size = 0):
+        """Releases the least recently used models until a model of the given size fits into the memory budget.
+
+        Models which are checked out are kept, even if the budget is exceeded. The lock must be held by the caller.
+
+        Args:
+          size: The size of the model which will be loaded. (Default value = 0)
+
+        """
+
+        if not self.memory_budget:
+            return
+        total_size = sum(entry[1] for entry in self.models.values())
+        for key, (model, model_size, users, model_lock) in list(self.models.items()):
+            if total_size + size <= self.memory_budget:
+                break
+            if users == 0:
+                del self.models[key]
+                total_size -= model_size
+
+    def clear(self):
+        """Releases all models which are not checked out."""
+
+        with self.lock:
+            for key in [key for key, entry in self.models.items() if entry[2] == 0]:
+                del self.models[key]
+
+def get_size(*paths):
+    """Returns the size of files and folders, which is used to estimate the memory size of a model.
+
+    Args:
+      *paths: The paths of the files and folders, None is ignored.
+
+    Returns:
+      The size in bytes.
+    """
+
+    size = 0
+    for path in paths:
+        if path is None:
+            continue
+        if os.path.isdir(path):
+            for folder_path, folder_names, file_names in os.walk(path):
+                size += sum(os.path.getsize(os.path.join(folder_path, f)) for f in file_names)
+        elif os.path.isfile(path):
+            size += os.path.getsize(path)
+    return size
+
+def read_ahead(*paths):
+    """Reads files into the page cache of the operating system, so a later load or memory map does not wait for the disk.
+
+    The files are memory-mapped where possible, otherwise they are read in blocks.
+
+    Args:
+      *paths: The paths of the files, None is ignored.
+
+    """
+
+    for path in paths:
+        if path is None or not os.path.isfile(path) or os.path.getsize(path) == 0:
+            continue
+        with open(path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, "madvise"):
+                        mapped.madvise(mmap.MADV_WILLNEED)
+                    # touch every page, the advice alone does not wait for the reads
+                    for position in range(0, len(mapped), mmap.PAGESIZE):
+                        mapped[position]
+            except (OSError, ValueError):
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    pass
+
+registry = ModelRegistry()
@@ -2,6 +2,7 @@ from os import walk
 from PySide2.QtCore import QSettings
 from PySide2.QtGui import QKeySequence
 from src.util.plugin_abstract import IPlugin
+from src.util.segmentation import Segmentation
 import src.util.const as c
 import importlib.util as ilu
 import os
@@ -195,6 +196,20 @@ class PluginManager():
 
         return self.parent.get_word_at(pos)
 
+    def get_word_timing(self, pos):
+        """Gets the start_time, end_time and transcribed word of the word at the given position.
+
+        The timing follows the edits in the editor, so it is exact even if the text was changed.
+
+        Args:
+          pos: Position of the desired word.
+
+        Returns:
+          Dict with the start_time, end_time and word or None if the word has no timing.
+        """
+
+        return self.parent.get_word_timing(pos)
+
     def set_word_at(self, word, pos, replace_old):
         """Sets the word at a given position.
 
@@ -258,4 +273,14 @@ class PluginManager():
 
         """
 
-        return self.parent.get_project_folder_path()
\ No newline at end of file
+        return self.parent.get_project_folder_path()
+
+    def get_segmentation(self):
+        """Get the voiced segments which the VAD has found during the creation of the current project.
+
+        Returns:
+          The Segmentation or None if the project has no segments.
+
+        """
+
+        return Segmentation.load(self.get_project_folder_path())
\ No newline at end of file
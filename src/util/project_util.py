@@ -0,0 +1,147 @@
+import os
+import shutil
+import time
+import src.util.const as c
+from src.util.file_util import write_text_file, append_text_file, save_to_shelve, get_value_from_shelve, \
+    remove_from_shelve
+from src.util.word_timings import WordTimings
+
+def copy_source(project_folder_path, file_path):
+    """Copies the source material into the project folder.
+
+    Args:
+      project_folder_path: The project folder.
+      file_path: The path of the source material.
+
+    Returns:
+      The path of the copy.
+    """
+
+    new_file_name = os.path.basename(file_path).replace(".", c.ORIGNAL_POSTFIX)
+    new_file_path = os.path.join(project_folder_path, new_file_name)
+    shutil.copyfile(file_path, new_file_path)
+    return new_file_path
+
+def save_transcription(project_folder_path, text, transcription_list):
+    """Saves the transcription and its meta_data in the project folder.
+
+    Args:
+      project_folder_path: The project folder.
+      text: The transcription.
+      transcription_list: The meta_data of the words, as list of dicts or WordTimings.
+
+    """
+
+    write_text_file(project_folder_path, text, c.TRANSCRIPTION)
+    if not isinstance(transcription_list, WordTimings):
+        transcription_list = WordTimings.from_meta_data(transcription_list)
+    transcription_list.save(project_folder_path)
+
+def get_checkpoint(project_folder_path):
+    """Returns the checkpoint of a project whose transcription was interrupted.
+
+    Args:
+      project_folder_path: The project folder.
+
+    Returns:
+      The checkpoint as dict or None if the folder does not exist or the transcription is finished.
+    """
+
+    if not os.path.isdir(project_folder_path):
+        return None
+    if not any(f.startswith("persistent") for f in os.listdir(project_folder_path)):
+        return None
+    return get_value_from_shelve(project_folder_path, c.TRANSCRIPTION_CHECKPOINT)
+
+def is_other_source(checkpoint, file_path):
+    """Checks whether an interrupted transcription was started with another source file.
+
+    Args:
+      checkpoint: The checkpoint of the project.
+      file_path: The path of the source material.
+
+    Returns:
+      True if the checkpoint belongs to another file, so it must not be resumed with this file.
+    """
+
+    return checkpoint["source"] is not None and os.path.abspath(checkpoint["source"]) != os.path.abspath(file_path)
+
+class ProjectCheckpoint():
+    """Saves the finished segments of a transcription in the project, so an interrupted transcription can be resumed.
+
+    The text is appended with every segment, the meta_data is rewritten at most every interval seconds.
+    The checkpoint contains the end time of the last saved segment and the size of the text and the meta_data
+    at this point, so anything which was written afterwards is dropped when the transcription is resumed.
+
+    """
+
+    def __init__(self, project_folder_path, source_path = None, interval = 5):
+        self.project_folder_path = project_folder_path
+        self.transcription_path = os.path.join(project_folder_path, c.TRANSCRIPTION + ".txt")
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+        checkpoint = get_checkpoint(project_folder_path)
+        if checkpoint is None:
+            checkpoint = {"source": source_path, "offset": 0.0, "text_size": 0, "words": 0}
+        self.source_path = checkpoint["source"]
+        self.offset = checkpoint["offset"]
+        self.resumed = self.offset > 0
+
+        with open(self.transcription_path, "ab") as f:
+            f.truncate(checkpoint["text_size"])
+        transcription_list = WordTimings.load(project_folder_path, mmap=False) if checkpoint["words"] > 0 else WordTimings()
+        transcription_list.consolidate()
+        self.transcription_list = WordTimings(transcription_list.records[:checkpoint["words"]], transcription_list.words)
+        self.save(self.offset)
+
+    def is_resumed(self):
+        """Returns true if a part of the transcription was already saved before this run."""
+
+        return self.resumed
+
+    def add(self, text, meta_data, end_time):
+        """Appends a finished segment.
+
+        Segments without words only move the offset of the next checkpoint.
+
+        Args:
+          text: The text of the segment.
+          meta_data: The meta_data of the words in the segment.
+          end_time: The end time of the segment.
+
+        """
+
+        if text:
+            append_text_file(self.project_folder_path, text, c.TRANSCRIPTION)
+            self.transcription_list.extend(meta_data)
+        if time.monotonic() - self.last_save > self.interval:
+            self.save(end_time)
+
+    def save(self, offset):
+        """Saves the meta_data and the checkpoint.
+
+        Args:
+          offset: The end time of the last added segment.
+
+        """
+
+        self.offset = offset
+        self.transcription_list.save(self.project_folder_path)
+        checkpoint = {"source": self.source_path, "offset": offset, "text_size": os.path.getsize(self.transcription_path),
+                      "words": len(self.transcription_list)}
+        save_to_shelve(self.project_folder_path, c.TRANSCRIPTION_CHECKPOINT, checkpoint)
+        self.last_save = time.monotonic()
+
+    def finish(self, segmentation = None):
+        """Saves the meta_data and removes the checkpoint, because the transcription is complete.
+
+        Args:
+          segmentation: The Segmentation of the VAD, it is only saved if it covers the whole audio. (Default value = None)
+
+        """
+
+        self.transcription_list.save(self.project_folder_path)
+        if segmentation is not None and not self.resumed:
+            segmentation.save(self.project_folder_path)
+        remove_from_shelve(self.project_folder_path, c.TRANSCRIPTION_CHECKPOINT)
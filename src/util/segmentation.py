@@ -0,0 +1,193 @@
+import json
+import os
+import numpy as np
+import src.util.const as c
+
+class Segmentation():
+    """The voiced segments which the VAD has found in the audio of a project.
+
+    The segments are stored as start and end sample together with the parameters of the VAD,
+    so later passes can reuse them instead of running the VAD again, as long as the parameters match.
+
+    """
+
+    def __init__(self, sample_rate, aggressiveness, padding_duration_ms = 300, frame_duration_ms = 30, bounds = None):
+        self.sample_rate = sample_rate
+        self.aggressiveness = aggressiveness
+        self.padding_duration_ms = padding_duration_ms
+        self.frame_duration_ms = frame_duration_ms
+        self.bounds = bounds if bounds is not None else np.zeros((0, 2), dtype=np.int64)
+        self.pending = []
+
+    def __len__(self):
+        return len(self.bounds) + len(self.pending)
+
+    def add(self, start, end):
+        """Appends a segment.
+
+        Args:
+          start: The first sample of the segment.
+          end: The sample after the last sample of the segment.
+
+        """
+
+        self.pending.append((start, end))
+
+    def consolidate(self):
+        """Converts the appended segments into the bounds."""
+
+        if not self.pending:
+            return
+        self.bounds = np.concatenate([self.bounds, np.array(self.pending, dtype=np.int64).reshape(-1, 2)])
+        self.pending = []
+
+    def get_times(self):
+        """Returns the start and end times of the segments in seconds.
+
+        Returns:
+          The start times and the end times as arrays.
+        """
+
+        self.consolidate()
+        return self.bounds[:, 0] / float(self.sample_rate), self.bounds[:, 1] / float(self.sample_rate)
+
+    def matches(self, sample_rate, aggressiveness, padding_duration_ms = 300, frame_duration_ms = 30):
+        """Checks whether the segments were found with the given parameters.
+
+        Args:
+          sample_rate: The sample rate of the audio.
+          aggressiveness: Voice-activation aggressiveness.
+          padding_duration_ms: The padding of the VAD window in milliseconds. (Default value = 300)
+          frame_duration_ms: The frame duration in milliseconds. (Default value = 30)
+
+        Returns:
+          True if all parameters are the same.
+        """
+
+        return (self.sample_rate == sample_rate and self.aggressiveness == int(aggressiveness)
+                and self.padding_duration_ms == padding_duration_ms and self.frame_duration_ms == frame_duration_ms)
+
+    def find(self, time):
+        """Returns the index of the segment which contains the given time.
+
+        Args:
+          time: The time in seconds.
+
+        Returns:
+          The index or -1 if the time is not voiced.
+        """
+
+        self.consolidate()
+        sample = int(round(time * self.sample_rate))
+        index = int(np.searchsorted(self.bounds[:, 1], sample, "right"))
+        if index < len(self.bounds) and self.bounds[index, 0] <= sample:
+            return index
+        return -1
+
+    def get_range(self, start_time, end_time):
+        """Returns the segments which overlap a time range, clipped to the range.
+
+        Args:
+          start_time: Start of the range in seconds.
+          end_time: End of the range in seconds.
+
+        Returns:
+          The Segmentation of the range.
+        """
+
+        self.consolidate()
+        start = int(round(start_time * self.sample_rate))
+        end = int(round(end_time * self.sample_rate))
+        first = int(np.searchsorted(self.bounds[:, 1], start, "right"))
+        last = int(np.searchsorted(self.bounds[:, 0], end, "left"))
+        bounds = np.clip(self.bounds[first:max(first, last)], start, end)
+        return self.copy(bounds[bounds[:, 1] > bounds[:, 0]])
+
+    def merge(self, max_gap):
+        """Merges consecutive segments whose gap is at most max_gap.
+
+        Args:
+          max_gap: The longest gap in seconds which is merged.
+
+        Returns:
+          The merged Segmentation.
+        """
+
+        self.consolidate()
+        if len(self.bounds) == 0:
+            return self.copy(self.bounds)
+        gaps = self.bounds[1:, 0] - self.bounds[:-1, 1]
+        # a new segment starts after every gap which is too large
+        starts = np.concatenate([[0], np.flatnonzero(gaps > max_gap * self.sample_rate) + 1])
+        ends = np.concatenate([starts[1:] - 1, [len(self.bounds) - 1]])
+        return self.copy(np.stack([self.bounds[starts, 0], self.bounds[ends, 1]], axis=1))
+
+    def split(self, max_duration):
+        """Splits the segments which are longer than max_duration into equal parts on the frame grid.
+
+        Args:
+          max_duration: The longest duration of a segment in seconds.
+
+        Returns:
+          The split Segmentation.
+        """
+
+        self.consolidate()
+        frame = int(self.sample_rate * self.frame_duration_ms / 1000)
+        max_length = max(int(max_duration * self.sample_rate) // frame, 1) * frame
+        bounds = []
+        for start, end in self.bounds.tolist():
+            parts = -(-(end - start) // max_length)
+            part_length = -(-(end - start) // (parts * frame)) * frame
+            for i in range(parts):
+                bounds.append((start + i * part_length, min(start + (i + 1) * part_length, end)))
+        return self.copy(np.array(bounds, dtype=np.int64).reshape(-1, 2))
+
+    def copy(self, bounds):
+        """Returns a Segmentation with the same parameters and other bounds.
+
+        Args:
+          bounds: The start and end samples of the segments.
+
+        Returns:
+          The Segmentation.
+        """
+
+        return Segmentation(self.sample_rate, self.aggressiveness, self.padding_duration_ms, self.frame_duration_ms,
+                            np.array(bounds, dtype=np.int64).reshape(-1, 2))
+
+    def save(self, project_folder_path):
+        """Saves the segments and their parameters as .json file, which is replaced atomically.
+
+        Args:
+          project_folder_path: The project folder.
+
+        """
+
+        self.consolidate()
+        file_path = os.path.join(project_folder_path, c.VAD_SEGMENTATION + ".json")
+        value = {"sample_rate": self.sample_rate, "aggressiveness": self.aggressiveness,
+                 "padding_duration_ms": self.padding_duration_ms, "frame_duration_ms": self.frame_duration_ms,
+                 "bounds": self.bounds.tolist()}
+        with open(file_path + ".tmp", "w") as f:
+            json.dump(value, f)
+        os.replace(file_path + ".tmp", file_path)
+
+    @classmethod
+    def load(cls, project_folder_path):
+        """Loads the segments of a project.
+
+        Args:
+          project_folder_path: The project folder.
+
+        Returns:
+          The Segmentation or None if the project has no segments.
+        """
+
+        file_path = os.path.join(project_folder_path, c.VAD_SEGMENTATION + ".json")
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, "r") as f:
+            value = json.load(f)
+        return cls(value["sample_rate"], value["aggressiveness"], value["padding_duration_ms"],
+                   value["frame_duration_ms"], np.array(value["bounds"], dtype=np.int64).reshape(-1, 2))
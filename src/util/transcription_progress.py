@@ -0,0 +1,112 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+import src.util.const as c
+from src.util.time_util import create_time_string
+
+class TranscriptionProgress():
+    """Measures the progress of a transcription from the processed audio duration.
+
+    The real-time factor is the processing time divided by the processed audio duration,
+    the finish time is estimated with it from the remaining audio.
+    Every update is written to the log file of the project.
+
+    """
+
+    def __init__(self, project_folder_path, duration, start_time = 0.0, workers = 1):
+        self.duration = duration
+        self.start_time = start_time
+        self.workers = workers
+        self.started = time.monotonic()
+        self.processed = start_time
+        self.real_time_factor = None
+
+        self.logger = logging.getLogger("lazytranscript." + project_folder_path)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = logging.FileHandler(os.path.join(project_folder_path, c.TRANSCRIPTION_LOG + ".log"))
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+        self.logger.info("started at %.1fs of %s s audio with %d workers", start_time,
+                         "%.1f" % duration if duration else "unknown", workers)
+
+    def update(self, end_time):
+        """Updates the progress with the end time of a finished segment.
+
+        Args:
+          end_time: The end time of the segment in seconds.
+
+        """
+
+        self.processed = max(self.processed, end_time)
+        processed_audio = self.processed - self.start_time
+        if processed_audio > 0:
+            self.real_time_factor = (time.monotonic() - self.started) / processed_audio
+        self.logger.info("%s", self.get_text())
+
+    def get_fraction(self):
+        """Returns the processed part of the audio.
+
+        Returns:
+          The part between 0 and 1 or None if the duration is unknown.
+        """
+
+        if not self.duration:
+            return None
+        return min(self.processed / self.duration, 1.0)
+
+    def get_finish_time(self):
+        """Returns the estimated finish time.
+
+        Returns:
+          The datetime or None if there is no estimate yet.
+        """
+
+        if not self.duration or self.real_time_factor is None:
+            return None
+        remaining = max(self.duration - self.processed, 0) * self.real_time_factor
+        return datetime.now() + timedelta(seconds=remaining)
+
+    def get_text(self):
+        """Returns the progress as readable text.
+
+        E.g. 12:30/01:02:00h, 0.35x real time, done at 14:05:10
+
+        Returns:
+          The text.
+        """
+
+        text = create_time_string(self.processed * 1000, (self.duration or 0) * 1000)
+        if self.real_time_factor is not None:
+            text += ", {:.2f}x real time".format(self.real_time_factor)
+        finish_time = self.get_finish_time()
+        if finish_time is not None:
+            text += ", done at " + finish_time.strftime("%H:%M:%S")
+        return text
+
+    def finish(self, interrupted = False):
+        """Logs the summary of the transcription and closes the log file.
+
+        Args:
+          interrupted: True if the transcription was stopped before the end of the audio. (Default value = False)
+
+        """
+
+        elapsed = time.monotonic() - self.started
+        if interrupted:
+            self.logger.info("interrupted at %.1fs after %.1fs", self.processed, elapsed)
+            self.close()
+            return
+        audio = (self.duration or self.processed) - self.start_time
+        self.logger.info("finished %.1fs audio in %.1fs (%s x real time, %d workers)", audio, elapsed,
+                         "%.2f" % (elapsed / audio) if audio > 0 else "-", self.workers)
+        self.close()
+
+    def close(self):
+        """Closes the log file."""
+
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
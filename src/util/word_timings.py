@@ -0,0 +1,257 @@
+import json
+import os
+from collections.abc import Sequence
+import numpy as np
+import src.util.const as c
+from src.util.file_util import get_value_from_shelve
+
+RECORD_TYPE = np.dtype([(c.START_TIME, "<f4"), (c.END_TIME, "<f4"), (c.WORD, "<i4")])
+
+class WordTimings(Sequence):
+    """Stores the meta_data of the transcribed words in columns.
+
+    The start and end times are float32 arrays and the words are ids into an interned word table.
+    The class behaves like the old list of dicts: every item is a dict with the start_time, end_time and word,
+    which is only created when it is accessed.
+
+    """
+
+    def __init__(self, records = None, words = None):
+        self.records = records if records is not None else np.zeros(0, dtype=RECORD_TYPE)
+        self.words = words if words is not None else []
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+        self.pending = []
+        self.occurrences = None
+
+    @classmethod
+    def from_meta_data(cls, meta_data):
+        """Creates the columns from a list of word dicts.
+
+        Args:
+          meta_data: List of dicts with the start_time, end_time and word.
+
+        Returns:
+          The WordTimings.
+        """
+
+        word_timings = cls()
+        word_timings.extend(meta_data)
+        return word_timings
+
+    def __len__(self):
+        return len(self.records) + len(self.pending)
+
+    def __getitem__(self, index):
+        self.consolidate()
+        if isinstance(index, slice):
+            return [self.get_dict(i) for i in range(*index.indices(len(self.records)))]
+        if index < 0:
+            index += len(self.records)
+        if index < 0 or index >= len(self.records):
+            raise IndexError("word index out of range")
+        return self.get_dict(index)
+
+    def __iter__(self):
+        self.consolidate()
+        for i in range(len(self.records)):
+            yield self.get_dict(i)
+
+    def get_dict(self, index):
+        """Returns the word at the index as dict.
+
+        Args:
+          index: Index of the word.
+
+        Returns:
+          Dict with the start_time, end_time and word.
+        """
+
+        record = self.records[index]
+        return {c.START_TIME: float(record[c.START_TIME]), c.END_TIME: float(record[c.END_TIME]),
+                c.WORD: self.words[record[c.WORD]]}
+
+    def intern(self, word):
+        """Returns the id of the word in the word table and adds it if necessary.
+
+        Args:
+          word: The word.
+
+        Returns:
+          The id of the word.
+        """
+
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.words.append(word)
+            self.word_ids[word] = word_id
+        return word_id
+
+    def extend(self, meta_data):
+        """Appends words. They are converted into the columns with the next access.
+
+        Args:
+          meta_data: List of dicts with the start_time, end_time and word.
+
+        """
+
+        self.pending.extend(meta_data)
+
+    def consolidate(self):
+        """Converts the appended words into the columns."""
+
+        if not self.pending:
+            return
+        self.records = np.concatenate([self.records, self.to_records(self.pending)])
+        self.pending = []
+        self.occurrences = None
+
+    def to_records(self, meta_data):
+        """Converts word dicts into records and interns their words.
+
+        Args:
+          meta_data: List of dicts with the start_time, end_time and word.
+
+        Returns:
+          The records as structured array.
+        """
+
+        records = np.empty(len(meta_data), dtype=RECORD_TYPE)
+        records[c.START_TIME] = [m[c.START_TIME] for m in meta_data]
+        records[c.END_TIME] = [m[c.END_TIME] for m in meta_data]
+        records[c.WORD] = [self.intern(m[c.WORD]) for m in meta_data]
+        return records
+
+    def replace_range(self, start_time, end_time, meta_data):
+        """Replaces the words which start in a time range, e.g. with a new transcription of the range.
+
+        Args:
+          start_time: Start of the range in seconds.
+          end_time: End of the range in seconds.
+          meta_data: List of dicts with the start_time, end_time and word of the new words.
+
+        Returns:
+          The index of the first replaced word and the index after the last replaced word.
+        """
+
+        self.consolidate()
+        starts = self.records[c.START_TIME]
+        first = int(np.searchsorted(starts, start_time, "left"))
+        last = max(int(np.searchsorted(starts, end_time, "left")), first)
+        self.records = np.concatenate([self.records[:first], self.to_records(meta_data), self.records[last:]])
+        self.occurrences = None
+        return first, last
+
+    def get_next_start(self, time):
+        """Returns the start time of the first word which starts after a time.
+
+        Args:
+          time: The time in seconds.
+
+        Returns:
+          The start time or None if no word starts after the time.
+        """
+
+        self.consolidate()
+        starts = self.records[c.START_TIME]
+        index = int(np.searchsorted(starts, time, "right"))
+        return float(starts[index]) if index < len(starts) else None
+
+    def build_index(self):
+        """Builds the index from the lowercase word to the sorted positions of its occurrences."""
+
+        self.consolidate()
+        lower_ids = {}
+        id_map = np.array([lower_ids.setdefault(word.lower(), len(lower_ids)) for word in self.words], dtype=np.int32)
+        mapped = id_map[self.records[c.WORD]] if len(self.records) > 0 else np.zeros(0, dtype=np.int32)
+        order = np.argsort(mapped, kind="stable")
+        bounds = np.searchsorted(mapped[order], np.arange(len(lower_ids) + 1))
+        self.occurrences = {word: order[bounds[i]:bounds[i + 1]] for word, i in lower_ids.items()}
+
+    def find(self, word, near = None, limit = None):
+        """Returns the meta_data of the occurrences of a word.
+
+        Args:
+          word: The word, the search ignores the case.
+          near: Position in the meta_data around which the occurrences are searched, None for all. (Default value = None)
+          limit: Maximum number of occurrences around near, None for all. (Default value = None)
+
+        Returns:
+          List of dicts with the start_time, end_time and word, sorted by time.
+        """
+
+        self.consolidate()
+        if self.occurrences is None:
+            self.build_index()
+        positions = self.occurrences.get(word.lower())
+        if positions is None:
+            return []
+
+        if near is not None and limit is not None and len(positions) > limit:
+            # the limit positions closest to near are a window around its insertion point
+            center = int(np.searchsorted(positions, near))
+            start = max(min(center - limit // 2, len(positions) - limit), 0)
+            while start > 0 and near - positions[start - 1] < positions[start + limit - 1] - near:
+                start -= 1
+            while start + limit < len(positions) and positions[start + limit] - near < near - positions[start]:
+                start += 1
+            positions = positions[start:start + limit]
+
+        return [self.get_dict(int(i)) for i in positions]
+
+    def save(self, project_folder_path):
+        """Saves the columns as a memory-mappable .npy file and the word table as .json file.
+
+        Both files are replaced atomically, so a crash does not leave a broken file behind.
+        Memory-mapped columns are read into memory first, because Windows can not replace a mapped file.
+
+        Args:
+          project_folder_path: The project folder.
+
+        """
+
+        self.consolidate()
+        records_path = os.path.join(project_folder_path, c.TRANSCRIPTION_META_DATA + ".npy")
+        words_path = os.path.join(project_folder_path, c.TRANSCRIPTION_WORDS + ".json")
+        with open(words_path + ".tmp", "w") as f:
+            json.dump(self.words, f)
+        with open(records_path + ".tmp", "wb") as f:
+            np.save(f, self.records)
+        self.release()
+        os.replace(words_path + ".tmp", words_path)
+        os.replace(records_path + ".tmp", records_path)
+
+    def release(self):
+        """Reads memory-mapped columns into memory and drops the mapping of their file."""
+
+        if isinstance(self.records, np.memmap):
+            self.records = np.array(self.records)
+
+    @classmethod
+    def load(cls, project_folder_path, mmap = True):
+        """Loads the word timings of a project.
+
+        Projects which were created before the columnar store get their list of dicts converted.
+
+        Args:
+          project_folder_path: The project folder.
+          mmap: If true, the columns are memory-mapped instead of read. A mapped file can not be replaced on Windows,
+            so it should be false while another process can still write the project. (Default value = True)
+
+        Returns:
+          The WordTimings, which are empty if the project has no meta_data.
+        """
+
+        records_path = os.path.join(project_folder_path, c.TRANSCRIPTION_META_DATA + ".npy")
+        words_path = os.path.join(project_folder_path, c.TRANSCRIPTION_WORDS + ".json")
+        if not os.path.isfile(records_path) or not os.path.isfile(words_path):
+            return cls.from_meta_data(get_value_from_shelve(project_folder_path, c.TRANSCRIPTION_META_DATA, []))
+
+        with open(words_path, "r") as f:
+            words = json.load(f)
+        try:
+            records = np.load(records_path, mmap_mode="r" if mmap else None)
+        except ValueError:
+            # older numpy versions can not map an empty array
+            records = np.load(records_path)
+        return cls(records, words)
@@ -1,8 +1,11 @@
 import os
 
+from PySide2.QtCore import Qt, QSettings
 from PySide2.QtGui import QIcon
 from PySide2.QtWidgets import *
 from src.threads.create_new_project_thread import CreateThread
+from src.util.file_util import get_value_from_shelve
+from src.util.project_util import get_checkpoint
 import src.util.const as c
 
 class CreateNewProjectWidget(QWidget):
@@ -12,7 +15,9 @@ class CreateNewProjectWidget(QWidget):
         super().__init__()
         self.file_name = None
         self.folder_path = None
+        self.streamed_project_path = None
         self.window_handler = window_handler
+        self.settings = QSettings(c.SETTINGS_PATH, QSettings.IniFormat)
 
         self.v_box = QVBoxLayout()
         self.choose_file_btn = QPushButton(c.CHOOSE_FILE)
@@ -21,6 +26,12 @@ class CreateNewProjectWidget(QWidget):
         self.choose_lang_combo = QComboBox()
         self.get_languages(self.choose_lang_combo)
 
+        self.choose_preset_combo = QComboBox()
+        for preset in [c.PRESET_FAST, c.PRESET_BALANCED, c.PRESET_ACCURATE]:
+            self.choose_preset_combo.addItem(preset)
+        self.choose_preset_combo.setCurrentText(c.PRESET_BALANCED)
+        self.choose_preset_combo.setToolTip("fast: small model without scorer, accurate: scorer and wide beam")
+
         self.project_name_edit = QLineEdit()
         self.project_name_edit.setPlaceholderText(c.PROJECT_NAME)
 
@@ -29,16 +40,39 @@ class CreateNewProjectWidget(QWidget):
 
         self.open_btn = QPushButton("Open")
         self.open_btn.clicked.connect(self.create_new_project)
+        self.queue_btn = QPushButton("Add to Queue")
+        self.queue_btn.clicked.connect(self.add_to_queue)
+        self.open_h_box = QHBoxLayout()
+        self.open_h_box.addWidget(self.open_btn)
+        self.open_h_box.addWidget(self.queue_btn)
 
         self.progress_bar = QProgressBar()
         self.progress_bar.hide()
 
+        self.status_label = QLabel()
+        self.status_label.hide()
+
+        self.job_scheduler = window_handler.job_scheduler
+        self.job_scheduler.signal.changed.connect(self.update_queue)
+        self.queue_list = QListWidget()
+        self.queue_list.itemDoubleClicked.connect(self.open_job)
+        self.queue_h_box = QHBoxLayout()
+        for text, slot in [("Pause", self.pause_job), ("Resume", self.resume_job), ("Cancel", self.cancel_job),
+                           ("Up", self.move_job_up), ("Down", self.move_job_down)]:
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            self.queue_h_box.addWidget(button)
+
         self.v_box.addWidget(self.choose_file_btn)
         self.v_box.addWidget(self.choose_lang_combo)
+        self.v_box.addWidget(self.choose_preset_combo)
         self.v_box.addWidget(self.project_name_edit)
         self.v_box.addWidget(self.choose_project_folder_btn)
-        self.v_box.addWidget(self.open_btn)
+        self.v_box.addLayout(self.open_h_box)
         self.v_box.addWidget(self.progress_bar)
+        self.v_box.addWidget(self.status_label)
+        self.v_box.addWidget(self.queue_list)
+        self.v_box.addLayout(self.queue_h_box)
 
         self.setLayout(self.v_box)
 
@@ -46,13 +80,135 @@ class CreateNewProjectWidget(QWidget):
         """Starts the creation of the new project."""
 
         if self.file_name is not None and self.project_name_edit.text() != "" and self.folder_path is not None:
+            if self.job_scheduler.is_used(os.path.join(self.folder_path, self.project_name_edit.text())):
+                self.on_new_project_status("The project is being created already")
+                return
             self.open_btn.setEnabled(False)
             self.progress_bar.show()
-            self.worker = CreateThread(self.file_name, self.folder_path, self.project_name_edit.text(), self.choose_lang_combo.currentText())
+            self.remember_model()
+            self.worker = CreateThread(self.file_name, self.folder_path, self.project_name_edit.text(), self.choose_lang_combo.currentText(),
+                                       preset=self.choose_preset_combo.currentText())
             self.worker.signal.progress.connect(self.on_new_project_progress)
+            self.worker.signal.status.connect(self.on_new_project_status)
             self.worker.signal.done.connect(self.on_new_project_done)
+            self.worker.signal.started.connect(self.on_new_project_started)
+            self.streamed_project_path = None
+            # the queued jobs wait while the worker processes of this creation use the cpu budget
+            self.job_scheduler.add_external(self.worker)
             self.worker.start()
 
+    def add_to_queue(self):
+        """Adds the new project to the queue, which creates it in the background."""
+
+        if self.file_name is not None and self.project_name_edit.text() != "" and self.folder_path is not None:
+            self.remember_model()
+            if self.job_scheduler.add_job(self.file_name, self.folder_path, self.project_name_edit.text(),
+                                          self.choose_lang_combo.currentText(), self.choose_preset_combo.currentText()) is None:
+                self.on_new_project_status("The project exists already or is being created")
+                return
+            self.file_name = None
+            self.choose_file_btn.setText(c.CHOOSE_FILE)
+            self.project_name_edit.setText("")
+
+    def remember_model(self):
+        """Saves the chosen language and preset, so their model is loaded in advance at the next start."""
+
+        self.settings.setValue(c.LAST_LANGUAGE, self.choose_lang_combo.currentText())
+        self.settings.setValue(c.LAST_PRESET, self.choose_preset_combo.currentText())
+
+    def update_queue(self):
+        """Shows the jobs of the queue with their state and progress."""
+
+        selected = self.get_selected_job()
+        self.queue_list.clear()
+        for job in self.job_scheduler.queue.jobs:
+            item = QListWidgetItem(self.job_scheduler.get_text(job))
+            item.setData(Qt.UserRole, job["id"])
+            self.queue_list.addItem(item)
+            if job["id"] == selected:
+                self.queue_list.setCurrentItem(item)
+
+    def get_selected_job(self):
+        """Returns the id of the selected job.
+
+        Returns:
+          The id or None if no job is selected.
+        """
+
+        item = self.queue_list.currentItem()
+        return item.data(Qt.UserRole) if item is not None else None
+
+    def pause_job(self):
+        """Pauses the selected job."""
+
+        if self.get_selected_job() is not None:
+            self.job_scheduler.pause(self.get_selected_job())
+
+    def resume_job(self):
+        """Resumes the selected job."""
+
+        if self.get_selected_job() is not None:
+            self.job_scheduler.resume(self.get_selected_job())
+
+    def cancel_job(self):
+        """Cancels the selected job."""
+
+        if self.get_selected_job() is not None:
+            self.job_scheduler.cancel(self.get_selected_job())
+
+    def move_job_up(self):
+        """Raises the priority of the selected job."""
+
+        if self.get_selected_job() is not None:
+            self.job_scheduler.move(self.get_selected_job(), -1)
+
+    def move_job_down(self):
+        """Lowers the priority of the selected job."""
+
+        if self.get_selected_job() is not None:
+            self.job_scheduler.move(self.get_selected_job(), 1)
+
+    def open_job(self, item):
+        """Opens the project of a finished job and removes the job from the queue.
+
+        Args:
+          item: The double clicked item of the queue list.
+
+        """
+
+        job = self.job_scheduler.queue.get(item.data(Qt.UserRole))
+        if job is None or job["state"] != c.JOB_DONE:
+            return
+        self.job_scheduler.cancel(job["id"])
+        self.window_handler.switch_to_editor(os.path.join(job["folder_path"], job["project_name"]))
+
+    def resume_project(self, project_folder_path):
+        """Resumes the interrupted transcription of a project with the values from its checkpoint.
+
+        Args:
+          project_folder_path: The project folder path.
+
+        """
+
+        checkpoint = get_checkpoint(project_folder_path)
+        if checkpoint is None:
+            return
+        self.file_name = checkpoint["source"]
+        self.folder_path = os.path.dirname(project_folder_path)
+        self.choose_file_btn.setText(os.path.basename(self.file_name))
+        self.choose_project_folder_btn.setText(self.folder_path)
+        self.project_name_edit.setText(os.path.basename(project_folder_path))
+        self.choose_lang_combo.setCurrentText(get_value_from_shelve(project_folder_path, c.LANGUAGE))
+        self.choose_preset_combo.setCurrentText(get_value_from_shelve(project_folder_path, c.PRESET, c.PRESET_BALANCED))
+        self.create_new_project()
+
+    def stop(self):
+        """Stops a running creation after the current segment, it is resumed when the project is opened again."""
+
+        if getattr(self, "worker", None) is not None and self.worker.isRunning():
+            self.worker.interrupt()
+            self.worker.wait()
+
     def on_new_project_progress(self, value):
         """Updates the progressbar with the given value from the signal.
 
@@ -63,6 +219,33 @@ class CreateNewProjectWidget(QWidget):
 
         self.progress_bar.setValue(value)
 
+    def on_new_project_status(self, status):
+        """Shows the processed duration, the real-time factor and the estimated finish time.
+
+        Args:
+          status: The status text.
+
+        """
+
+        self.status_label.setText(status)
+        self.status_label.show()
+        if self.streamed_project_path is not None:
+            self.window_handler.editor_window.set_hint_text(status)
+
+    def on_new_project_started(self, project_folder_path):
+        """Is executed in the streaming mode when the project can be opened while the transcription is running.
+
+        Args:
+          project_folder_path: The project folder path.
+
+        """
+
+        self.streamed_project_path = project_folder_path
+        self.window_handler.switch_to_editor(project_folder_path)
+        # the editor drops the connection when it opens another project
+        self.window_handler.editor_window.connect_transcription(self.worker)
+        self.worker.editor_ready.set()
+
     def on_new_project_done(self, project_folder_path):
         """Is executed when the creation is done (or not).
 
@@ -71,7 +254,7 @@ class CreateNewProjectWidget(QWidget):
 
         """
 
-        if project_folder_path is not None:
+        if project_folder_path is not None and project_folder_path != self.streamed_project_path:
             self.window_handler.switch_to_editor(project_folder_path)
 
     def choose_file(self):
@@ -111,8 +294,11 @@ class CreateNewProjectWidget(QWidget):
         self.project_name_edit.setText("")
         self.choose_project_folder_btn.setText(c.CHOOSE_FOLDER)
         self.progress_bar.hide()
+        self.status_label.setText("")
+        self.status_label.hide()
         self.file_name = None
         self.folder_path = None
+        self.update_queue()
         self.resize(self.minimumSize())
 
 
@@ -5,9 +5,15 @@ from PySide2.QtWidgets import *
 from PySide2.QtGui import *
 from src.util import file_util
 from src.util.plugin_manager import PluginManager
+from src.util.word_timings import WordTimings
+from src.util.project_util import get_checkpoint
+from src.util.alignment import Alignment
+from src.util.segmentation import Segmentation
 from src.windows.text_module import TextModuleWindow
 from src.windows.settings import SettingsWindow
 from src.windows.licence import LicenceWindow
+from src.windows.retranscribe import RetranscribeDialog
+from src.threads.retranscribe_thread import RetranscribeThread
 from src.util.time_util import create_time_string
 from src.util.time_util import convert_ms
 from src.util.highlighted_qplaintextedit import HighlightedQTextEdit
@@ -59,6 +65,7 @@ class EditorWidget(QWidget):
         self.text = HighlightedQTextEdit()
         self.text.setFont(self.font)
         self.text.textChanged.connect(self.on_text_changed)
+        self.text.document().contentsChange.connect(self.on_contents_change)
         self.text.setFocusPolicy(Qt.StrongFocus)
 
         # the number text widget to show the row numbers
@@ -225,6 +232,10 @@ class EditorWidget(QWidget):
         self.text_option_off = QTextOption()
 
         self.transcription_meta_data = None
+        self.alignment = None
+        self.meta_data_changed = False
+        # number of hear again buttons around the position of the selected word
+        self.max_hear_again = 3
         self.word_pos = -1
         self.word_start_time = None
         self.word_end_time = None
@@ -330,6 +341,33 @@ class EditorWidget(QWidget):
 
         self.media_player.setPosition(self.media_player.position() - self.rewind_time * 1000)
 
+    def on_contents_change(self, position, removed, added):
+        """Is executed when the document changes, updates the alignment of the changed words.
+
+        Args:
+          position: Position of the change.
+          removed: Number of removed characters.
+          added: Number of added characters.
+
+        """
+
+        if self.alignment is not None:
+            self.alignment.update(self.text.toPlainText(), position, removed, added)
+
+    def get_word_timing(self, pos):
+        """Returns the meta_data of the word at the given position.
+
+        Args:
+          pos: The position of the word, like in get_word_at.
+
+        Returns:
+          Dict with the start_time, end_time and word or None if the word has no timing.
+        """
+
+        if self.alignment is None:
+            return None
+        return self.alignment.get_timing(pos)
+
     def on_text_changed(self):
         """Is executed when the text changed
 
@@ -391,9 +429,110 @@ class EditorWidget(QWidget):
             return
         with open(self.transcription_path, 'r') as f:
             text = f.read()
+        self.alignment = None
+        self.meta_data_changed = False
         self.text.setPlainText(text)
-        self.transcription_meta_data = file_util.get_value_from_shelve(self.project_folder_path, c.TRANSCRIPTION_META_DATA)
-        print(self.transcription_meta_data)
+        # the running transcription of a project replaces the meta_data file, which is not possible while it is mapped
+        self.transcription_meta_data = WordTimings.load(self.project_folder_path,
+                                                        mmap=get_checkpoint(self.project_folder_path) is None)
+        self.alignment = Alignment.load(self.project_folder_path, self.transcription_meta_data, self.text.toPlainText())
+
+    def add_transcription_segment(self, text, meta_data):
+        """Appends a segment which was transcribed after the project was opened.
+
+        The text is inserted at the end of the document without moving the cursor of the user.
+
+        Args:
+          text: The text of the segment.
+          meta_data: The meta_data of the words in the segment.
+
+        """
+
+        if self.transcription_meta_data is None:
+            self.transcription_meta_data = WordTimings()
+        if self.alignment is None:
+            self.alignment = Alignment(self.transcription_meta_data, self.text.toPlainText())
+        # the meta_data has to be extended first, so the inserted words are aligned with it
+        self.transcription_meta_data.extend(meta_data)
+
+        cursor = QTextCursor(self.text.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText((" " if not self.text.document().isEmpty() else "") + text)
+
+    def get_selection_time_range(self, around = 15, end_margin = 1.0):
+        """Returns the time range of the selected words.
+
+        The end time of a word is the start of its last character, so the range ends at the start
+        of the next word, but at most the margin after the last selected word.
+
+        Args:
+          around: Seconds before and after the current position, if the selection has no timings. (Default value = 15)
+          end_margin: Seconds after the end time of the last selected word. (Default value = 1.0)
+
+        Returns:
+          The start and end time in seconds.
+        """
+
+        cursor = self.text.textCursor()
+        timings = []
+        if self.alignment is not None and cursor.hasSelection():
+            first, last = self.alignment.get_word_range(cursor.selectionStart(), cursor.selectionEnd())
+            timings = [t for t in map(self.alignment.get_timing, range(first, last)) if t is not None]
+        if len(timings) == 0:
+            position = self.media_player.position() / 1000
+            return max(position - around, 0), position + around
+        end_time = max(t[c.END_TIME] for t in timings)
+        next_start = self.transcription_meta_data.get_next_start(end_time)
+        if next_start is None or next_start > end_time + end_margin:
+            next_start = end_time + end_margin
+        return min(t[c.START_TIME] for t in timings), next_start
+
+    def replace_time_range(self, start_time, end_time, text, meta_data):
+        """Replaces the words of a time range with a new transcription of the range.
+
+        The meta_data of the words which start in the range is replaced and the text of the words which are
+        aligned with them is replaced by the new text. If none of them is left in the text, the new text is
+        inserted after the last word before the range.
+
+        Args:
+          start_time: Start of the range in seconds.
+          end_time: End of the range in seconds.
+          text: The new transcription of the range.
+          meta_data: The meta_data of the new words.
+
+        """
+
+        if self.transcription_meta_data is None:
+            self.transcription_meta_data = WordTimings()
+        if self.alignment is None:
+            self.alignment = Alignment(self.transcription_meta_data, self.text.toPlainText())
+
+        self.alignment.update_meta_keys()
+        first, last = self.transcription_meta_data.replace_range(start_time, end_time, meta_data)
+        start, end = self.alignment.get_text_range(first, last)
+        self.alignment.replace_meta(first, last, len(meta_data))
+        if start == end and text:
+            text = " " + text if start > 0 else text + " "
+
+        cursor = QTextCursor(self.text.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        cursor.insertText(text)
+        self.alignment.realign_characters(start, start + len(text))
+        self.meta_data_changed = True
+
+    def save_meta_data(self):
+        """Saves the meta_data, if it was changed by a new transcription of a time range."""
+
+        if self.meta_data_changed and self.transcription_meta_data is not None:
+            self.transcription_meta_data.save(self.project_folder_path)
+            self.meta_data_changed = False
+
+    def save_alignment(self):
+        """Saves the alignment of the words, so it is not computed again when the project is opened."""
+
+        if self.alignment is not None and self.transcription_meta_data is not None:
+            self.alignment.save(self.project_folder_path, self.text.toPlainText())
 
     def change_font(self, new_font, new_size):
         """Changes the font.
@@ -440,7 +579,8 @@ class EditorWidget(QWidget):
         #if self.media_player.state() == QMediaPlayer.PlayingState:
         #    return
 
-        if self.word_pos > len(self.text.toPlainText().split()) - 1:
+        word_count = self.get_word_count()
+        if self.word_pos > word_count - 1:
             self.reset_word_by_word()
             return
 
@@ -465,7 +605,7 @@ class EditorWidget(QWidget):
             return
 
         # change to find all meta data
-        meta_data_with_word = self.find_meta_data(selected_word)
+        meta_data_with_word = self.find_meta_data(selected_word, self.word_pos, word_count, cursor.selectionStart())
 
         self.populate_word_actions(selected_word, meta_data_with_word)
 
@@ -489,6 +629,19 @@ class EditorWidget(QWidget):
         self.text.setTextCursor(cursor)
         self.on_word_by_word()
 
+    def get_word_count(self):
+        """Returns the number of words in the text.
+
+        The alignment is updated with every change, so the text does not have to be split again for every word.
+
+        Returns:
+          The number of words.
+        """
+
+        if self.alignment is not None:
+            return len(self.alignment.keys)
+        return len(self.text.toPlainText().split())
+
     def reset_word_by_word(self):
         """Resets the word by word editing mode and goes back to the normal editing."""
 
@@ -510,7 +663,7 @@ class EditorWidget(QWidget):
         """
 
         self.word_by_word_actions.clear()
-        if self.word_pos == len(self.text.toPlainText().split()):
+        if self.word_pos == self.get_word_count():
             return
 
         self.plugin_manager.get_word_by_word_actions(selected, word_meta_data, self.word_pos)
@@ -557,23 +710,36 @@ class EditorWidget(QWidget):
             self.word_by_word_actions.addItem(item)
             self.word_by_word_actions.setItemWidget(item, btn)
 
-    def find_meta_data(self, word):
-        """Gets all the meta_data for the given word.
+    def find_meta_data(self, word, word_pos = None, word_count = None, position = None):
+        """Gets the meta_data for the given word.
+
+        If the character position of the word is given and the word is aligned, its exact meta_data is returned.
+        Otherwise, if the position of the word is given, only the few occurrences closest to the
+        corresponding place in the transcription are returned.
 
         Args:
           word: The word for which the meta_data should be found.
+          word_pos: Position of the word in the document. (Default value = None)
+          word_count: Number of words in the document. (Default value = None)
+          position: Character position of the word in the document. (Default value = None)
 
         Returns:
           The meta_data
         """
 
-        meta_data_with_word = []
+        if self.transcription_meta_data is None:
+            return []
+
+        if position is not None and self.alignment is not None:
+            timing = self.alignment.get_timing(self.alignment.get_word_pos(position))
+            if timing is not None:
+                return [timing]
 
-        for m_d in self.transcription_meta_data:
-            if m_d.get(c.WORD) == word.lower():
-                meta_data_with_word.append(m_d)
+        if word_pos is None or not word_count:
+            return self.transcription_meta_data.find(word)
 
-        return meta_data_with_word
+        near = word_pos * len(self.transcription_meta_data) / word_count
+        return self.transcription_meta_data.find(word, near, self.max_hear_again)
 
     def replace_selection(self, new_word):
         """Replace the selection with the given word
@@ -775,6 +941,9 @@ class EditorWindow(QMainWindow):
         self.window_handler = window_handler
 
         self.last_saved = None
+        self.project_folder_path = None
+        # the CreateThread of a running transcription in the streaming mode
+        self.transcription_thread = None
 
     def init_menu_and_toolbar(self):
         """Initialize the menu- and toolbar"""
@@ -872,6 +1041,10 @@ class EditorWindow(QMainWindow):
         self.time_stamp.triggered.connect(self.insert_time_stamp)
         self.toolbar.addAction(self.time_stamp)
 
+        self.retranscribe_action = QAction(QIcon(os.path.join(c.ICON_PATH, self.theme, "time.png")), "Transcribe selection again", self)
+        self.retranscribe_action.triggered.connect(self.retranscribe)
+        self.toolbar.addAction(self.retranscribe_action)
+
         for action in self.plugin_manager.get_toolbar_actions(self):
             self.toolbar.addAction(action)
 
@@ -938,21 +1111,76 @@ class EditorWindow(QMainWindow):
 
         """
 
+        if project_folder_path != self.project_folder_path:
+            self.disconnect_transcription()
         self.project_folder_path = project_folder_path
         self.widget.open_project(self.project_folder_path)
         self.project_folder_path_label.setText(self.project_folder_path)
         self.language = file_util.get_value_from_shelve(self.project_folder_path, c.LANGUAGE)
         self.language_label.setText(self.language)
         self.setWindowTitle(os.path.basename(self.project_folder_path))
+        self.update_project_actions()
         self.plugin_manager.project_loaded()
 
     def save_project(self):
         """Saves the current transcription."""
 
         file_util.write_text_file(self.project_folder_path, self.widget.text.toPlainText(), c.TRANSCRIPTION)
+        self.widget.save_meta_data()
+        self.widget.save_alignment()
         self.last_saved = datetime.now().strftime("%H:%M:%S")
         self.setWindowTitle(os.path.basename(self.project_folder_path) + " - last saved on: " + self.last_saved)
 
+    def retranscribe(self):
+        """Transcribes the time range of the selected words again, e.g. with another aggressiveness or model."""
+
+        start_time, end_time = self.widget.get_selection_time_range()
+        duration = max(self.widget.media_player.duration() / 1000, end_time)
+        preset = file_util.get_value_from_shelve(self.project_folder_path, c.PRESET, c.PRESET_BALANCED)
+        values = RetranscribeDialog(duration, self.language, preset).get_values(start_time, end_time)
+        if values is None:
+            return
+
+        start_time, end_time, aggressiveness, language, preset = values
+        wav_file_path = file_util.get_file(self.project_folder_path, c.CON_COPY_POSTFIX)
+        if wav_file_path is None:
+            self.set_hint_text("No converted file found")
+            return
+
+        self.retranscribe_action.setEnabled(False)
+        self.set_hint_text("Transcribing " + convert_ms(start_time * 1000) + " - " + convert_ms(end_time * 1000))
+        self.retranscribe_thread = RetranscribeThread(wav_file_path, language, start_time, end_time, aggressiveness,
+                                                      Segmentation.load(self.project_folder_path), preset)
+        self.retranscribe_thread.signal.done.connect(self.on_retranscribe_done)
+        self.retranscribe_thread.signal.failed.connect(self.on_retranscribe_failed)
+        self.retranscribe_thread.start()
+
+    def on_retranscribe_done(self, start_time, end_time, text, meta_data):
+        """Replaces the time range with its new transcription.
+
+        Args:
+          start_time: Start of the range in seconds.
+          end_time: End of the range in seconds.
+          text: The new transcription.
+          meta_data: The meta_data of the new words.
+
+        """
+
+        self.widget.replace_time_range(start_time, end_time, text, meta_data)
+        self.update_project_actions()
+        self.set_hint_text("")
+
+    def on_retranscribe_failed(self, reason):
+        """Shows why the time range could not be transcribed.
+
+        Args:
+          reason: The reason.
+
+        """
+
+        self.update_project_actions()
+        self.set_hint_text(reason)
+
     def undo(self):
         self.widget.text.undo()
 
@@ -1068,6 +1296,19 @@ class EditorWindow(QMainWindow):
 
         return self.widget.get_word_at(pos)
 
+    def get_word_timing(self, pos):
+        """Gets the meta_data of the word at a specific position.
+
+        Args:
+          pos: The position of the word.
+
+        Returns:
+         Dict with the start_time, end_time and word or None if the word has no timing.
+
+        """
+
+        return self.widget.get_word_timing(pos)
+
     def set_word_at(self, word, pos, replace_old):
         """Sets the word at the given position.
 
@@ -1111,6 +1352,69 @@ class EditorWindow(QMainWindow):
 
         return self.language
 
+    def connect_transcription(self, thread):
+        """Receives the segments of a running transcription of the current project.
+
+        Args:
+          thread: The CreateThread of the transcription.
+
+        """
+
+        self.disconnect_transcription()
+        self.transcription_thread = thread
+        self.transcription_thread.signal.segment.connect(self.add_transcription_segment)
+        self.transcription_thread.finished.connect(self.on_transcription_finished)
+        self.update_project_actions()
+
+    def disconnect_transcription(self):
+        """Stops receiving the segments of a running transcription, e.g. because another project is opened."""
+
+        if self.transcription_thread is None:
+            return
+        try:
+            self.transcription_thread.signal.segment.disconnect(self.add_transcription_segment)
+            self.transcription_thread.finished.disconnect(self.on_transcription_finished)
+        except RuntimeError:
+            # the thread has finished and its signal is already gone
+            pass
+        self.transcription_thread = None
+
+    def on_transcription_finished(self):
+        """Enables saving again when the transcription of the project has finished."""
+
+        self.disconnect_transcription()
+        self.update_project_actions()
+
+    def update_project_actions(self):
+        """Disables saving and the re-transcription while the transcription of the project is not finished.
+
+        The worker still appends to the project files, and an interrupted transcription is resumed
+        by truncating them to its checkpoint, which would cut off the changes of the editor.
+
+        """
+
+        finished = self.project_folder_path is None or get_checkpoint(self.project_folder_path) is None
+        self.file_menu_save.setEnabled(finished)
+        self.retranscribe_action.setEnabled(finished)
+        if not finished and self.transcription_thread is None:
+            self.set_hint_text("The transcription of the project is not finished, it can not be saved yet")
+
+    def add_transcription_segment(self, project_folder_path, text, meta_data):
+        """Appends a segment which is delivered while the transcription is still running.
+
+        Segments of another project than the opened one are dropped.
+
+        Args:
+          project_folder_path: The project folder of the transcription.
+          text: The text of the segment.
+          meta_data: The meta_data of the words in the segment.
+
+        """
+
+        if project_folder_path != self.project_folder_path:
+            return
+        self.widget.add_transcription_segment(text, meta_data)
+
     def keyPressEvent(self, key_event: QKeyEvent):
         """Catches the Keypress-Events.
 
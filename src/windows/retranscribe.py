@@ -0,0 +1,67 @@
+import os
+
+from PySide2.QtGui import QIcon
+from PySide2.QtWidgets import QDialog, QDialogButtonBox, QFormLayout, QDoubleSpinBox, QSpinBox, QComboBox
+import src.util.const as c
+
+class RetranscribeDialog(QDialog):
+    """Dialog to choose the time range, the aggressiveness, the model and the preset for a new transcription of a passage."""
+
+    def __init__(self, duration, language, preset = c.PRESET_BALANCED):
+        super(RetranscribeDialog, self).__init__()
+
+        self.start_value = QDoubleSpinBox()
+        self.end_value = QDoubleSpinBox()
+        for value in [self.start_value, self.end_value]:
+            value.setRange(0, max(duration, 0))
+            value.setDecimals(2)
+            value.setSuffix(" s")
+
+        self.aggressiveness_value = QSpinBox()
+        self.aggressiveness_value.setRange(0, 3)
+        self.aggressiveness_value.setValue(3)
+
+        self.language_combo = QComboBox()
+        for dir in os.listdir(c.MODEL_PATH):
+            self.language_combo.addItem(dir)
+        if language is not None:
+            self.language_combo.setCurrentText(language)
+
+        self.preset_combo = QComboBox()
+        for item in [c.PRESET_FAST, c.PRESET_BALANCED, c.PRESET_ACCURATE]:
+            self.preset_combo.addItem(item)
+        self.preset_combo.setCurrentText(preset)
+
+        self.buttonBox = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+
+        self.layout = QFormLayout()
+        self.layout.addRow("Start", self.start_value)
+        self.layout.addRow("End", self.end_value)
+        self.layout.addRow("Voice-activation aggressiveness", self.aggressiveness_value)
+        self.layout.addRow("Model", self.language_combo)
+        self.layout.addRow("Preset", self.preset_combo)
+        self.layout.addRow(self.buttonBox)
+
+        self.setWindowIcon(QIcon(os.path.join(c.ICON_PATH, c.THEME_NEUTRAL, "quote.png")))
+        self.setWindowTitle("Transcribe again")
+        self.setLayout(self.layout)
+
+    def get_values(self, start_time, end_time):
+        """Shows the dialog with the given range.
+
+        Args:
+          start_time: The suggested start of the range in seconds.
+          end_time: The suggested end of the range in seconds.
+
+        Returns:
+          The start time, the end time, the aggressiveness, the language and the preset or None if the dialog was cancelled.
+        """
+
+        self.start_value.setValue(start_time)
+        self.end_value.setValue(end_time)
+        if self.exec_() != QDialog.Accepted or self.end_value.value() <= self.start_value.value():
+            return None
+        return (self.start_value.value(), self.end_value.value(), self.aggressiveness_value.value(),
+                self.language_combo.currentText(), self.preset_combo.currentText())
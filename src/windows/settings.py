@@ -3,7 +3,7 @@ import os
 from PySide2.QtCore import QSettings
 from PySide2.QtGui import QIcon
 from PySide2.QtWidgets import QWidget, QMainWindow, QApplication, QGroupBox, QFormLayout, QVBoxLayout, \
-    QLabel, QComboBox, QPushButton, QLineEdit, QCheckBox
+    QLabel, QComboBox, QPushButton, QLineEdit, QCheckBox, QSpinBox
 import src.util.const as c
 import re
 
@@ -55,6 +55,59 @@ class SettingsWidget(QWidget):
         self.value_dict_settings[c.SHOW_EMPTY_BUTTONS] = show_empty_buttons_check
         plugins.setLayout(plugins_layout)
 
+        transcription = QGroupBox("Transcription")
+        transcription_layout = QFormLayout()
+        workers_value = QSpinBox()
+        workers_value.setRange(1, os.cpu_count() or 1)
+        workers_value.setValue(self.settings.value(c.TRANSCRIPTION_WORKERS, defaultValue=1, type=int))
+        transcription_layout.addRow(QLabel("Worker processes"), workers_value)
+        self.value_dict_settings[c.TRANSCRIPTION_WORKERS] = workers_value
+        memory_value = QSpinBox()
+        memory_value.setRange(0, 65536)
+        memory_value.setSuffix(" MB")
+        memory_value.setSpecialValueText("No limit")
+        memory_value.setValue(self.settings.value(c.TRANSCRIPTION_MEMORY_LIMIT, defaultValue=0, type=int))
+        transcription_layout.addRow(QLabel("Audio memory limit"), memory_value)
+        self.value_dict_settings[c.TRANSCRIPTION_MEMORY_LIMIT] = memory_value
+        cache_size_value = QSpinBox()
+        cache_size_value.setRange(0, 1048576)
+        cache_size_value.setSuffix(" MB")
+        cache_size_value.setSpecialValueText("Disabled")
+        cache_size_value.setValue(self.settings.value(c.TRANSCRIPTION_CACHE_SIZE, defaultValue=1024, type=int))
+        transcription_layout.addRow(QLabel("Transcription cache"), cache_size_value)
+        self.value_dict_settings[c.TRANSCRIPTION_CACHE_SIZE] = cache_size_value
+        cache_folder_value = QLineEdit()
+        cache_folder_value.setPlaceholderText(c.CACHE_PATH)
+        cache_folder_value.setText(self.settings.value(c.TRANSCRIPTION_CACHE_FOLDER, defaultValue=""))
+        transcription_layout.addRow(QLabel("Cache folder"), cache_folder_value)
+        self.value_dict_settings[c.TRANSCRIPTION_CACHE_FOLDER] = cache_folder_value
+        model_budget_value = QSpinBox()
+        model_budget_value.setRange(0, 1048576)
+        model_budget_value.setSuffix(" MB")
+        model_budget_value.setSpecialValueText("No limit")
+        model_budget_value.setValue(self.settings.value(c.MODEL_MEMORY_BUDGET, defaultValue=4096, type=int))
+        transcription_layout.addRow(QLabel("Memory for loaded models"), model_budget_value)
+        self.value_dict_settings[c.MODEL_MEMORY_BUDGET] = model_budget_value
+        queue_jobs_value = QSpinBox()
+        queue_jobs_value.setRange(1, os.cpu_count() or 1)
+        queue_jobs_value.setValue(self.settings.value(c.QUEUE_JOBS, defaultValue=1, type=int))
+        transcription_layout.addRow(QLabel("Parallel queued projects"), queue_jobs_value)
+        self.value_dict_settings[c.QUEUE_JOBS] = queue_jobs_value
+        cpu_budget_value = QSpinBox()
+        cpu_budget_value.setRange(1, os.cpu_count() or 1)
+        cpu_budget_value.setValue(self.settings.value(c.QUEUE_CPU_BUDGET, defaultValue=os.cpu_count() or 1, type=int))
+        transcription_layout.addRow(QLabel("CPU budget of the queue"), cpu_budget_value)
+        self.value_dict_settings[c.QUEUE_CPU_BUDGET] = cpu_budget_value
+        warm_up_check = QCheckBox("Load the model of the last used language at the start")
+        warm_up_check.setChecked(self.settings.value(c.MODEL_WARM_UP, defaultValue=True, type=bool))
+        transcription_layout.addRow(warm_up_check)
+        self.value_dict_settings[c.MODEL_WARM_UP] = warm_up_check
+        stream_check = QCheckBox("Open the editor while the transcription is running")
+        stream_check.setChecked(self.settings.value(c.STREAM_TRANSCRIPTION, defaultValue=False, type=bool))
+        transcription_layout.addRow(stream_check)
+        self.value_dict_settings[c.STREAM_TRANSCRIPTION] = stream_check
+        transcription.setLayout(transcription_layout)
+
         self.note = QLabel("Settings will be applied after restart")
 
         save = QPushButton("Save")
@@ -63,6 +116,7 @@ class SettingsWidget(QWidget):
         v_box.addWidget(theme)
         v_box.addWidget(keyboard)
         v_box.addWidget(plugins)
+        v_box.addWidget(transcription)
         v_box.addWidget(self.note)
         v_box.addWidget(save)
 
@@ -80,6 +134,8 @@ class SettingsWidget(QWidget):
                 self.settings.setValue(key, widget.currentText().strip())
             if isinstance(widget, QCheckBox):
                 self.settings.setValue(key, widget.isChecked())
+            if isinstance(widget, QSpinBox):
+                self.settings.setValue(key, widget.value())
 
         occupied = []
         self.keyboard_settings.clear()
@@ -1,5 +1,6 @@
 import os
 import src.util.const as c
+from src.util.project_util import get_checkpoint
 from PySide2.QtCore import Qt, QSettings
 from PySide2.QtGui import QIcon
 from PySide2.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel, QHBoxLayout
@@ -41,12 +42,19 @@ class StartWidget(QWidget):
         self.setLayout(self.v_box)
 
     def open_project(self):
-        """Opens a folder dialog to open an existing project."""
+        """Opens a folder dialog to open an existing project.
+
+        If the transcription of the project was interrupted, it is resumed first.
+
+        """
 
         folder_path = QFileDialog.getExistingDirectory(self, "Choose a Project Folder")
         if folder_path == "":
             return
         self.folder_path = os.path.normpath(folder_path)
+        if get_checkpoint(self.folder_path) is not None:
+            self.window_handler.resume_project(self.folder_path)
+            return
         self.window_handler.switch_to_editor(folder_path)
 
     def open_help(self):
@@ -0,0 +1,79 @@
+from src.util.alignment import Alignment, align_words
+from src.util.word_timings import WordTimings
+import src.util.const as c
+
+WORDS = ["the", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog"]
+
+def make_alignment(text = " ".join(WORDS)):
+    meta_data = WordTimings.from_meta_data([{c.START_TIME: float(i), c.END_TIME: i + 0.5, c.WORD: word}
+                                            for i, word in enumerate(WORDS)])
+    return Alignment(meta_data, text), text
+
+def edit(alignment, text, position, removed, inserted):
+    text = text[:position] + inserted + text[position + removed:]
+    alignment.update(text, position, removed, len(inserted))
+    return text
+
+def test_unedited_text_is_aligned_one_to_one():
+    alignment, text = make_alignment()
+
+    assert list(alignment.mapping) == list(range(len(WORDS)))
+    assert alignment.get_word_pos(text.index("fox")) == 3
+
+def test_update_keeps_the_timings_around_a_replaced_word():
+    alignment, text = make_alignment()
+
+    text = edit(alignment, text, text.index("brown"), len("brown"), "red")
+
+    assert text.split()[2] == "red"
+    # the substituted word keeps the timing of the word it replaces
+    assert list(alignment.mapping) == list(range(len(WORDS)))
+    assert alignment.get_timing(2)[c.START_TIME] == 2.0
+
+def test_update_after_an_inserted_word():
+    alignment, text = make_alignment()
+
+    text = edit(alignment, text, text.index("fox"), 0, "sly ")
+
+    assert len(alignment.keys) == len(WORDS) + 1
+    assert alignment.get_meta_index(3) == -1
+    assert alignment.get_meta_index(4) == 3
+    assert alignment.get_meta_index(len(WORDS)) == len(WORDS) - 1
+    assert alignment.starts[4] == text.index("fox")
+
+def test_update_after_a_deleted_word():
+    alignment, text = make_alignment()
+
+    text = edit(alignment, text, text.index("lazy"), len("lazy "), "")
+
+    assert text.split() == ["the", "quick", "brown", "fox", "jumps", "over", "the", "dog"]
+    assert list(alignment.mapping) == [0, 1, 2, 3, 4, 5, 6, 8]
+
+def test_update_matches_a_new_alignment():
+    alignment, text = make_alignment()
+    text = edit(alignment, text, 0, len("the quick"), "a slow")
+    text = edit(alignment, text, len(text), 0, " today")
+
+    fresh = Alignment(alignment.meta_data, text)
+
+    assert list(alignment.mapping) == list(fresh.mapping)
+
+def test_save_and_load(tmp_path):
+    alignment, text = make_alignment()
+    text = edit(alignment, text, text.index("fox"), 0, "sly ")
+    alignment.save(str(tmp_path), text)
+
+    loaded = Alignment.load(str(tmp_path), alignment.meta_data, text)
+    other = Alignment.load(str(tmp_path), alignment.meta_data, text + " more")
+
+    assert list(loaded.mapping) == list(alignment.mapping)
+    assert len(other.mapping) == len(WORDS) + 2
+
+def test_align_words_skips_the_common_ends():
+    doc_keys = ["a", "b", "x", "c", "d"]
+    meta_keys = ["a", "b", "c", "d"]
+
+    pairs = align_words(doc_keys, meta_keys)
+
+    assert (0, 0) in pairs and (1, 1) in pairs and (3, 2) in pairs and (4, 3) in pairs
+    assert all(i != 2 for i, j in pairs)
@@ -0,0 +1,76 @@
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip("moviepy")
+webrtcvad = pytest.importorskip("webrtcvad")
+
+from benchmarks.synthetic_audio import generate_pcm
+from src.transcription.deepspeech_transcriber import DeepSpeechTranscriber, MemoryWindow, Segment
+import src.util.const as c
+
+SAMPLE_RATE = 16000
+FRAME_DURATION_MS = 30
+PADDING_DURATION_MS = 300
+
+def get_chunks(pcm, size):
+    for position in range(0, len(pcm), size):
+        yield pcm[position:position + size]
+
+def get_segments(segments):
+    return [(segment.offset, bytes(segment.bytes), segment.keep_from, segment.keep_until) for segment in segments]
+
+@pytest.mark.parametrize("pattern", ["speech", "dead_air"])
+@pytest.mark.parametrize("chunk_size", [4800, 1 << 16])
+def test_vad_collector_batch_matches_vad_collector(pattern, chunk_size):
+    transcriber = DeepSpeechTranscriber()
+    pcm = generate_pcm(120, SAMPLE_RATE, pattern, 1)
+    window = MemoryWindow(None, 1, SAMPLE_RATE, FRAME_DURATION_MS, max_segment_duration=5)
+    limits = (window.max_segment_frames, window.overlap_frames, window.search_frames)
+
+    serial = transcriber.vad_collector(SAMPLE_RATE, FRAME_DURATION_MS, PADDING_DURATION_MS, webrtcvad.Vad(3),
+                                       transcriber.frame_generator(FRAME_DURATION_MS, pcm + b"\0\0", SAMPLE_RATE),
+                                       *limits)
+    # without the energy pre-pass every frame is checked by the VAD, like in vad_collector
+    chunks = transcriber.speech_chunk_generator(FRAME_DURATION_MS, get_chunks(pcm, chunk_size), SAMPLE_RATE,
+                                                webrtcvad.Vad(3), silence_rms=0)
+    batch = transcriber.vad_collector_batch(SAMPLE_RATE, FRAME_DURATION_MS, PADDING_DURATION_MS, chunks, *limits)
+
+    expected = get_segments(serial)
+    assert len(expected) > 1
+    assert get_segments(batch) == expected
+
+class BlockModel():
+    """Recognizes one word for every block of constant samples, like a model which hears every word."""
+
+    def sttWithMetadata(self, audio, num_results = 1):
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(audio)) + 1])
+        tokens = []
+        for start in starts.tolist():
+            for character in "w{}".format(audio[start]):
+                tokens.append(types.SimpleNamespace(text=character, start_time=start / float(SAMPLE_RATE)))
+            tokens.append(types.SimpleNamespace(text=" ", start_time=start / float(SAMPLE_RATE)))
+        return types.SimpleNamespace(transcripts=[types.SimpleNamespace(tokens=tokens)])
+
+def split_segments(transcriber, frames, max_segment_frames, overlap_frames, search_frames):
+    voiced_frames = []
+    keep_from = yield from transcriber.split_voiced_frames(voiced_frames, frames, max_segment_frames, SAMPLE_RATE,
+                                                           None, overlap_frames, search_frames)
+    yield Segment.from_frames(voiced_frames, SAMPLE_RATE, keep_from)
+
+def test_cut_voiced_frames_keeps_each_word_once():
+    transcriber = DeepSpeechTranscriber()
+    transcriber.model = BlockModel()
+    # 40 words of 0.25 seconds, the later words are louder
+    samples = np.repeat(np.arange(1, 41, dtype=np.int16) * 100, SAMPLE_RATE // 4)
+    frames = list(transcriber.frame_generator(FRAME_DURATION_MS, samples.tobytes() + b"\0\0", SAMPLE_RATE))
+
+    segments = list(split_segments(transcriber, frames, 150, 20, 50))
+    words = [word for segment in segments for word in transcriber.decode_segment(segment)[1]]
+
+    assert len(segments) > 2
+    assert all(a.keep_until == b.keep_from for a, b in zip(segments, segments[1:]))
+    # the overlaps are decoded twice
+    assert sum(len(segment.bytes) for segment in segments) > len(frames) * len(frames[0].bytes)
+    assert [m[c.WORD] for m in words] == ["w{}".format(i * 100) for i in range(1, 41)]
+    assert [m[c.START_TIME] for m in words] == pytest.approx([i * 0.25 for i in range(40)], abs=0.031)
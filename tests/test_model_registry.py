@@ -0,0 +1,42 @@
+import threading
+import time
+from src.util.model_registry import ModelRegistry
+
+def test_acquire_loads_a_model_once_for_concurrent_threads():
+    registry = ModelRegistry()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return object()
+
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.acquire("a", loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert len(set(map(id, models))) == 1
+    assert registry.models["a"][2] == 4
+
+def test_evict_keeps_the_checked_out_models():
+    registry = ModelRegistry(memory_budget=100)
+    registry.acquire("a", lambda: "a", 60)
+    with registry.use("b", lambda: "b", 30) as model:
+        assert model == "b"
+    assert list(registry.models) == ["a", "b"]
+
+    registry.acquire("c", lambda: "c", 60)
+
+    assert list(registry.models) == ["a", "c"]
+
+def test_get_lock_is_shared_by_the_users_of_a_model():
+    registry = ModelRegistry()
+    registry.acquire("a", lambda: "a")
+    registry.acquire("a", lambda: "a")
+
+    assert registry.get_lock("a") is registry.get_lock("a")
+    assert registry.get_lock("b") is None
@@ -0,0 +1,50 @@
+import os
+from src.util.project_util import ProjectCheckpoint, get_checkpoint, is_other_source
+from src.util.word_timings import WordTimings
+import src.util.const as c
+
+def make_meta_data(words, start):
+    return [{c.START_TIME: start + i, c.END_TIME: start + i + 0.5, c.WORD: word} for i, word in enumerate(words)]
+
+def read_text(project_folder_path):
+    with open(os.path.join(project_folder_path, c.TRANSCRIPTION + ".txt")) as f:
+        return f.read()
+
+def test_resume_drops_everything_after_the_last_checkpoint(tmp_path):
+    project_folder_path = str(tmp_path)
+    checkpoint = ProjectCheckpoint(project_folder_path, "source.mp3", interval=1000)
+    assert not checkpoint.is_resumed()
+    checkpoint.add("hello world ", make_meta_data(["hello", "world"], 0), 2.0)
+    checkpoint.save(2.0)
+    # written after the checkpoint, e.g. before a crash
+    checkpoint.add("lost words ", make_meta_data(["lost", "words"], 2), 4.0)
+    checkpoint.transcription_list.save(project_folder_path)
+
+    resumed = ProjectCheckpoint(project_folder_path, interval=1000)
+
+    assert resumed.is_resumed()
+    assert resumed.offset == 2.0
+    assert resumed.source_path == "source.mp3"
+    assert read_text(project_folder_path) == "hello world "
+    assert [m[c.WORD] for m in resumed.transcription_list] == ["hello", "world"]
+
+def test_finish_removes_the_checkpoint(tmp_path):
+    project_folder_path = str(tmp_path)
+    checkpoint = ProjectCheckpoint(project_folder_path, "source.mp3", interval=1000)
+    checkpoint.add("hello ", make_meta_data(["hello"], 0), 1.0)
+    assert get_checkpoint(project_folder_path) is not None
+
+    checkpoint.finish()
+
+    assert get_checkpoint(project_folder_path) is None
+    assert [m[c.WORD] for m in WordTimings.load(project_folder_path, mmap=False)] == ["hello"]
+
+def test_checkpoint_is_only_resumed_with_its_source(tmp_path):
+    project_folder_path = str(tmp_path / "project")
+    os.mkdir(project_folder_path)
+    source_path = str(tmp_path / "source.mp3")
+    ProjectCheckpoint(project_folder_path, source_path, interval=1000).save(0.0)
+    checkpoint = get_checkpoint(project_folder_path)
+
+    assert not is_other_source(checkpoint, os.path.join(str(tmp_path), ".", "source.mp3"))
+    assert is_other_source(checkpoint, str(tmp_path / "other.mp3"))
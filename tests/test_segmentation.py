@@ -0,0 +1,56 @@
+import numpy as np
+from src.util.segmentation import Segmentation
+
+def make_segmentation(bounds):
+    segmentation = Segmentation(16000, 3)
+    for start, end in bounds:
+        segmentation.add(start, end)
+    return segmentation
+
+def test_merge_joins_short_gaps():
+    segmentation = make_segmentation([(0, 16000), (20000, 32000), (64000, 80000)])
+
+    merged = segmentation.merge(0.5)
+
+    assert merged.bounds.tolist() == [[0, 32000], [64000, 80000]]
+    assert merged.matches(16000, 3)
+
+def test_merge_of_no_segments():
+    assert len(make_segmentation([]).merge(1)) == 0
+
+def test_split_keeps_the_parts_on_the_frame_grid():
+    segmentation = make_segmentation([(0, 16000 * 25), (16000 * 30, 16000 * 31)])
+
+    split = segmentation.split(10)
+
+    bounds = split.bounds
+    assert len(bounds) == 4
+    assert bounds[0, 0] == 0 and bounds[2, 1] == 16000 * 25
+    assert np.all(bounds[:2, 1] == bounds[1:3, 0])
+    assert np.all((bounds[:3, 1] - bounds[:3, 0]) <= 16000 * 10)
+    assert np.all(bounds[:2, 1] % 480 == 0)
+    assert bounds[3].tolist() == [16000 * 30, 16000 * 31]
+
+def test_get_range_clips_the_overlapping_segments():
+    segmentation = make_segmentation([(0, 16000), (32000, 48000), (64000, 80000)])
+
+    part = segmentation.get_range(0.5, 2.5)
+
+    assert part.bounds.tolist() == [[8000, 16000], [32000, 40000]]
+    assert len(segmentation.get_range(1.2, 1.8)) == 0
+
+def test_find():
+    segmentation = make_segmentation([(0, 16000), (32000, 48000)])
+
+    assert segmentation.find(2.5) == 1
+    assert segmentation.find(1.5) == -1
+
+def test_save_and_load(tmp_path):
+    segmentation = make_segmentation([(0, 16000), (32000, 48000)])
+    segmentation.save(str(tmp_path))
+
+    loaded = Segmentation.load(str(tmp_path))
+
+    assert loaded.bounds.tolist() == segmentation.bounds.tolist()
+    assert loaded.matches(16000, 3, 300, 30)
+    assert Segmentation.load(str(tmp_path / "missing")) is None
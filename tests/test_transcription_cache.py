@@ -0,0 +1,70 @@
+import os
+from src.transcription import transcription_cache
+from src.transcription.transcription_cache import TranscriptionCache
+import src.util.const as c
+
+PARAMETERS = {"preset": c.PRESET_BALANCED, "aggressiveness": 3}
+
+def make_model_files(tmp_path):
+    model_file = tmp_path / "model.pbmm"
+    model_file.write_bytes(b"model")
+    return str(model_file), None
+
+def make_meta_data(words):
+    return [{c.START_TIME: float(i), c.END_TIME: i + 0.5, c.WORD: word} for i, word in enumerate(words)]
+
+def test_key_depends_on_the_audio_the_model_and_the_parameters(tmp_path, monkeypatch):
+    cache = TranscriptionCache(str(tmp_path / "cache"))
+    model_files = make_model_files(tmp_path)
+    key = cache.get_key("audio", model_files, PARAMETERS)
+
+    assert cache.get_key("audio", model_files, dict(PARAMETERS)) == key
+    assert cache.get_key("other audio", model_files, PARAMETERS) != key
+    assert cache.get_key("audio", (model_files[0], str(tmp_path / "model.pbmm")), PARAMETERS) != key
+    assert cache.get_key("audio", model_files, dict(PARAMETERS, aggressiveness=2)) != key
+
+    (tmp_path / "model.pbmm").write_bytes(b"retrained model")
+    changed_model = cache.get_key("audio", model_files, PARAMETERS)
+    assert changed_model != key
+
+    monkeypatch.setattr(transcription_cache, "PIPELINE_VERSION", transcription_cache.PIPELINE_VERSION + 1)
+    assert cache.get_key("audio", model_files, PARAMETERS) != changed_model
+
+def test_put_and_get_with_alias(tmp_path):
+    cache = TranscriptionCache(str(tmp_path))
+
+    cache.put("key", "hello world", make_meta_data(["hello", "world"]), alias="source")
+
+    text, transcription_list = cache.get("key")
+    assert text == "hello world"
+    assert [m[c.WORD] for m in transcription_list] == ["hello", "world"]
+    assert cache.get_alias("source") == "key"
+    assert cache.get("missing") is None
+    assert cache.get_alias("missing") is None
+
+def test_evict_removes_the_least_recently_used_entries_and_their_aliases(tmp_path):
+    cache = TranscriptionCache(str(tmp_path), max_size=1 << 30)
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put(key, "text " * 100, make_meta_data(["text"] * 100), alias=key + "_source")
+        os.utime(os.path.join(str(tmp_path), key), (1000 + i, 1000 + i))
+    # a lookup marks an entry as used
+    cache.get("used")
+    entry_size = sum(os.path.getsize(os.path.join(str(tmp_path), "new", f)) for f in os.listdir(os.path.join(str(tmp_path), "new")))
+
+    cache.max_size = 2 * entry_size
+    cache.evict()
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
+    assert cache.get("new") is not None
+    assert cache.get_alias("old_source") is None
+    assert cache.get_alias("used_source") == "used"
+
+def test_hash_file(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache"))
+    (tmp_path / "a").write_bytes(b"same")
+    (tmp_path / "b").write_bytes(b"same")
+    (tmp_path / "c").write_bytes(b"other")
+
+    assert cache.hash_file(str(tmp_path / "a")) == cache.hash_file(str(tmp_path / "b"))
+    assert cache.hash_file(str(tmp_path / "a")) != cache.hash_file(str(tmp_path / "c"))
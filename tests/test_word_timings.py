@@ -0,0 +1,66 @@
+import numpy as np
+from src.util.word_timings import WordTimings
+import src.util.const as c
+
+def make_meta_data(words, start = 0.0, step = 0.5):
+    return [{c.START_TIME: start + i * step, c.END_TIME: start + i * step + 0.3, c.WORD: word} for i, word in enumerate(words)]
+
+def test_find_ignores_the_case():
+    timings = WordTimings.from_meta_data(make_meta_data(["The", "cat", "sat", "on", "the", "mat"]))
+
+    assert [m[c.START_TIME] for m in timings.find("the")] == [0.0, 2.0]
+    assert timings.find("dog") == []
+
+def test_find_returns_the_occurrences_closest_to_near():
+    timings = WordTimings.from_meta_data(make_meta_data(["a", "b"] * 10))
+
+    found = timings.find("a", near=10, limit=3)
+
+    assert [m[c.START_TIME] for m in found] == [4.0, 5.0, 6.0]
+
+def test_find_sees_appended_words():
+    timings = WordTimings.from_meta_data(make_meta_data(["one"]))
+    timings.find("one")
+    timings.extend(make_meta_data(["one"], start=1.0))
+
+    assert len(timings.find("one")) == 2
+
+def test_replace_range_replaces_the_words_which_start_in_the_range():
+    timings = WordTimings.from_meta_data(make_meta_data(["a", "b", "c", "d"]))
+
+    first, last = timings.replace_range(0.5, 1.5, make_meta_data(["x", "y", "z"], start=0.5, step=0.3))
+
+    assert (first, last) == (1, 3)
+    assert [m[c.WORD] for m in timings] == ["a", "x", "y", "z", "d"]
+
+def test_replace_range_inserts_into_an_empty_range():
+    timings = WordTimings.from_meta_data(make_meta_data(["a", "b"]))
+
+    assert timings.replace_range(0.2, 0.4, make_meta_data(["x"], start=0.25)) == (1, 1)
+    assert [m[c.WORD] for m in timings] == ["a", "x", "b"]
+
+def test_save_and_load(tmp_path):
+    meta_data = make_meta_data(["hello", "world", "hello"])
+    WordTimings.from_meta_data(meta_data).save(str(tmp_path))
+
+    for mmap in [True, False]:
+        loaded = WordTimings.load(str(tmp_path), mmap=mmap)
+        assert len(loaded) == 3
+        assert [m[c.WORD] for m in loaded] == ["hello", "world", "hello"]
+        assert np.allclose([m[c.START_TIME] for m in loaded], [m[c.START_TIME] for m in meta_data])
+        loaded.release()
+
+def test_save_replaces_a_memory_mapped_file(tmp_path):
+    WordTimings.from_meta_data(make_meta_data(["a", "b"])).save(str(tmp_path))
+    loaded = WordTimings.load(str(tmp_path))
+    loaded.extend(make_meta_data(["c"], start=1.0))
+
+    loaded.save(str(tmp_path))
+
+    assert [m[c.WORD] for m in WordTimings.load(str(tmp_path), mmap=False)] == ["a", "b", "c"]
+
+def test_get_next_start():
+    timings = WordTimings.from_meta_data(make_meta_data(["a", "b"]))
+
+    assert timings.get_next_start(0.3) == 0.5
+    assert timings.get_next_start(0.5) is None